@@ -0,0 +1,79 @@
+"""Latency of the data API and the upstream traffic it causes.
+
+Starts core.api against the stand-in server and times, over one keep-alive
+connection, each kind of request a polling client makes: the first request
+for a table, the same query again (its encoded body is kept), a revalidation
+with If-None-Match (a 304), and a new query on a table already loaded. Then
+reports how many pages were fetched upstream for all of it: one per table.
+
+Usage:
+    python -m benchmarks.bench_api --requests 500 --scale 10
+"""
+import argparse
+import http.client
+import time
+
+import numpy as np
+
+from benchmarks.common import standin_environment
+
+ENCODINGS = {"identity": "identity", "gzip": "gzip", "zstd": "zstd"}
+
+
+def _get(connection, path, headers):
+    start = time.perf_counter()
+    connection.request("GET", path, headers=headers)
+    response = connection.getresponse()
+    body = response.read()
+    return time.perf_counter() - start, response, body
+
+
+def _report(label, latencies, size=None):
+    p50, p99 = np.percentile(latencies, [50, 99]) * 1000
+    size = f"{size:>10,} B" if size is not None else ""
+    print(f"{label:<34} p50 {p50:7.3f} ms   p99 {p99:7.3f} ms {size}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=500, help="timed requests per kind")
+    parser.add_argument("--scale", type=int, default=1, help="row multiplier for the synthetic pages")
+    args = parser.parse_args()
+
+    with standin_environment(scale=args.scale) as upstream:
+        from core import api
+
+        server = api.serve(0)
+        connection = http.client.HTTPConnection(*server.server_address)
+        _, response, body = _get(connection, "/", {})
+        paths = [table["path"] for table in api.json.loads(body)["tables"]]
+
+        cold = [_get(connection, path, {})[0] for path in paths]
+        _report(f"first request ({len(paths)} tables)", cold)
+
+        for name, encoding in ENCODINGS.items():
+            headers = {"Accept-Encoding": encoding}
+            for fmt in ("json", "arrow"):
+                path = f"{paths[0]}?format={fmt}"
+                _get(connection, path, headers)
+                timed = [_get(connection, path, headers) for _ in range(args.requests)]
+                _report(f"repeat, {fmt}, {name}", [seconds for seconds, _, _ in timed], len(timed[-1][2]))
+
+        _, response, _ = _get(connection, paths[0], {})
+        etag = response.getheader("ETag")
+        revalidated = [_get(connection, paths[0], {"If-None-Match": etag}) for _ in range(args.requests)]
+        assert all(response.status == 304 for _, response, _ in revalidated)
+        _report("If-None-Match (304)", [seconds for seconds, _, _ in revalidated])
+
+        fresh = [_get(connection, f"{paths[0]}?where=Squad!=x{i}&columns=Squad", {})[0]
+                 for i in range(args.requests)]
+        _report("new query, table loaded", fresh)
+
+        connection.close()
+        server.shutdown()
+        print(f"\nupstream fetches: {sum(upstream.counts.values())} for {len(paths)} tables; "
+              f"api counters: {dict(api.stats)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""Server time and bytes per rerun with matplotlib PNGs vs Plotly specs.
+
+Each page is run headless with AppTest, once per chart backend (selected with
+the ?charts= query parameter, see views.ui.chart_backend). For each it reports
+the first rerun after the render cache is emptied (where matplotlib draws and
+encodes every chart), the median warm rerun and the bytes handed to the
+browser per rerun, by kind.
+
+Usage:
+    python -m benchmarks.bench_backends --reruns 10
+"""
+import argparse
+import statistics
+import time
+
+from benchmarks.common import APP_PATH, standin_environment
+
+PAGES = ("League Passing Profiles", "League Shooting Profiles", "Goals", "Club Profiles")
+
+
+def measure(page, backend, reruns):
+    from streamlit.testing.v1 import AppTest
+
+    from core import metrics, render_cache
+
+    app = AppTest.from_file(str(APP_PATH), default_timeout=300)
+    app.query_params["charts"] = backend
+    app.run()
+    app.sidebar.selectbox[0].select(page).run()
+
+    render_cache.clear()
+    start = time.perf_counter()
+    app.run()
+    cold = time.perf_counter() - start
+
+    before = metrics.bytes_sent()
+    times = []
+    for _ in range(reruns):
+        start = time.perf_counter()
+        app.run()
+        times.append(time.perf_counter() - start)
+    after = metrics.bytes_sent()
+    sent = {kind: (total - before.get(kind, 0)) // reruns for kind, total in after.items()
+            if total > before.get(kind, 0)}
+    return cold, statistics.median(times), sent
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--reruns", type=int, default=10)
+    args = parser.parse_args()
+
+    with standin_environment():
+        print(f"{'page':<26} {'backend':<11} {'cold ms':>8} {'warm ms':>8} {'KiB/rerun':>10}  by kind")
+        for page in PAGES:
+            for backend in ("matplotlib", "plotly"):
+                cold, warm, sent = measure(page, backend, args.reruns)
+                kinds = ", ".join(f"{kind} {size / 1024:.1f}" for kind, size in sorted(sent.items()))
+                print(f"{page:<26} {backend:<11} {cold * 1000:>8.0f} {warm * 1000:>8.0f} "
+                      f"{sum(sent.values()) / 1024:>10.1f}  {kinds}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""Label placement cost at squad, league-player and multi-league scale.
+
+For each point count, a 12x8 scatter of synthetic goals/xG values is labelled
+with core.labels: once for every point and once for the top-k outliers by
+distance from the xG = Gls diagonal. layout is the placement alone; draw
+includes creating the Text artists and rendering the PNG. If adjustText is
+installed, it is timed on the same chart for comparison (skipped above
+--adjust-max points, since it grows roughly quadratically).
+
+Usage:
+    python -m benchmarks.bench_labels --points 20 500 5000 --top-k 50
+"""
+import argparse
+import time
+
+import matplotlib
+
+matplotlib.use("Agg")
+
+import numpy as np  # noqa: E402
+
+from core import figures, labels, render_cache  # noqa: E402
+
+
+def synthetic_points(count, seed=0):
+    rng = np.random.default_rng(seed)
+    xg = rng.gamma(2.0, 4.0, count)
+    goals = np.clip(xg + rng.normal(0, 2.0, count), 0, None)
+    names = [f"Player {i:04d}" for i in range(count)]
+    return xg, goals, names
+
+
+def _scatter(xg, goals):
+    fig, ax = figures.subplots(figsize=(12, 8))
+    ax.scatter(xg, goals, s=36, alpha=0.6)
+    fig.tight_layout()
+    return fig, ax
+
+
+def time_core(xg, goals, names, top_k):
+    with figures.rendering():
+        fig, ax = _scatter(xg, goals)
+        start = time.perf_counter()
+        placed = labels.place_labels(ax, xg, goals, names, priority=labels.diagonal_distance(xg, goals),
+                                     max_labels=top_k, fontsize=9)
+        layout_seconds = time.perf_counter() - start
+        render_cache.to_png(fig)
+        return layout_seconds, time.perf_counter() - start, len(placed)
+
+
+def time_adjust_text(xg, goals, names):
+    from adjustText import adjust_text
+
+    with figures.rendering():
+        fig, ax = _scatter(xg, goals)
+        start = time.perf_counter()
+        texts = [ax.text(x, y, name, fontsize=9) for x, y, name in zip(xg, goals, names)]
+        adjust_text(texts, ax=ax)
+        render_cache.to_png(fig)
+        return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--points", type=int, nargs="+", default=[20, 500, 5000])
+    parser.add_argument("--top-k", type=int, default=50)
+    parser.add_argument("--adjust-max", type=int, default=200)
+    args = parser.parse_args()
+
+    try:
+        import adjustText  # noqa: F401
+        have_adjust = True
+    except ImportError:
+        have_adjust = False
+
+    print(f"{'points':>7} {'labels':>8} {'placed':>7} {'layout ms':>10} {'draw ms':>9} {'adjustText ms':>14}")
+    for count in args.points:
+        xg, goals, names = synthetic_points(count)
+        for top_k in (None, args.top_k):
+            if top_k is not None and top_k >= count:
+                continue
+            layout_seconds, total, placed = time_core(xg, goals, names, top_k)
+            adjusted = "-"
+            if top_k is None and have_adjust and count <= args.adjust_max:
+                adjusted = f"{time_adjust_text(xg, goals, names) * 1000:.0f}"
+            wanted = "all" if top_k is None else f"top {top_k}"
+            print(f"{count:>7} {wanted:>8} {placed:>7} {layout_seconds * 1000:>10.1f} {total * 1000:>9.0f} {adjusted:>14}")
+
+
+if __name__ == "__main__":
+    main()
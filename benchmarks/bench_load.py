@@ -0,0 +1,182 @@
+"""Load test: how many concurrent viewers one app node takes.
+
+Each worker process stands for one app process: it runs --sessions simulated
+viewers at once, each a headless session of streamlit_football_app.py
+(Streamlit's AppTest) on its own thread. A viewer clicks through the app the
+way a person does: a random page from the sidebar, then a random league on it,
+with the script rerun after every click and --think seconds between clicks.
+
+All workers share one local stand-in for fbref (see benchmarks.common) that
+answers with --delay seconds of latency and fails a share --error-rate of
+requests with a 503. Pages are synthetic at --scale, or recorded ones with
+--fixtures (see tools.record_fbref). Every --sessions level starts from empty
+caches.
+
+For each level it reports reruns per second across all workers, p50/p95/p99
+rerun latency, reruns that showed an error or raised (the exceptions are
+listed below the row), the upstream requests made (and how many of them the
+stand-in failed), and each worker's peak RSS. Latency that climbs steeply
+from one level to the next is the point where the node stops keeping up.
+
+Usage:
+    python -m benchmarks.bench_load --sessions 1 2 4 8 --seconds 60
+    python -m benchmarks.bench_load --workers 2 --sessions 4 --delay 0.5 --error-rate 0.1 --prefetch
+"""
+import argparse
+import json
+import os
+import random
+import re
+import resource
+import subprocess
+import sys
+import threading
+import time
+from collections import Counter
+
+import numpy as np
+
+from benchmarks.common import APP_PATH, ROOT_DIR, standin_environment
+
+# Pages a viewer picks from, by their name in the app's sidebar
+PAGES = ("League Passing Profiles", "League Shooting Profiles", "Goals", "Club Profiles", "Cross-League Rankings",
+         "Season Trends")
+
+# Labels of the league menus across the pages
+LEAGUE_MENUS = ("Select a League", "Choose a League")
+
+# A rerun slower than this counts as failed
+RERUN_TIMEOUT = 300
+
+
+def peak_rss_mib():
+    # ru_maxrss is in KiB on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def _click(app, label, select, reruns, raised):
+    """One user action: change a widget and rerun the script, recording how it went.
+
+    Returns False when the test client itself failed (AppTest does not always
+    recover from a run that raised while other sessions run), so the viewer
+    reloads the app.
+    """
+    start = time.perf_counter()
+    try:
+        select().run()
+    except Exception as exc:
+        raised[f"test client, session restarted: {type(exc).__name__}"] += 1
+        return False
+    reruns.append((time.perf_counter() - start, "exception" if app.exception else "error" if app.error else "ok"))
+    if app.exception:
+        # Counted by message, with numbers (ports, countdowns) left out so repeats group together
+        message = app.exception[0].value.splitlines()[0]
+        raised[f"{label}: {re.sub(r'[0-9]+', '#', message)}"] += 1
+    return True
+
+
+def _open(reruns, raised):
+    from streamlit.testing.v1 import AppTest
+
+    app = AppTest.from_file(str(APP_PATH), default_timeout=RERUN_TIMEOUT)
+    _click(app, "start", lambda: app, reruns, raised)
+    return app
+
+
+def _session(seed, deadline, think, reruns, raised):
+    rng = random.Random(seed)
+    app = _open(reruns, raised)
+    while time.perf_counter() < deadline:
+        page = rng.choice(PAGES)
+        if not app.sidebar.selectbox or not _click(app, page, lambda: app.sidebar.selectbox[0].select(page),
+                                                   reruns, raised):
+            app = _open(reruns, raised)
+            continue
+        menus = [menu for menu in app.get("selectbox") if menu.label in LEAGUE_MENUS]
+        if menus and len(menus[0].options) > 1:
+            league = rng.choice(menus[0].options)
+            if not _click(app, page, lambda: menus[0].select(league), reruns, raised):
+                app = _open(reruns, raised)
+                continue
+        time.sleep(think)
+
+
+def _child(sessions, seconds, think, seed):
+    deadline = time.perf_counter() + seconds
+    reruns, raised = [], Counter()
+    threads = [threading.Thread(target=_session, args=(seed * 1000 + i, deadline, think, reruns, raised),
+                                daemon=True)
+               for i in range(sessions)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    print(json.dumps({
+        "seconds": time.perf_counter() - start,
+        "reruns": reruns,
+        "raised": raised,
+        "peak_rss_mib": peak_rss_mib(),
+    }))
+
+
+def run_level(args, sessions):
+    """Run every worker at one number of sessions; returns their results and the stand-in's counts."""
+    with standin_environment(scale=args.scale, delay=args.delay, fixtures=args.fixtures,
+                             error_rate=args.error_rate) as upstream:
+        env = dict(os.environ, EPL_PREFETCH="1" if args.prefetch else "0")
+        workers = []
+        for worker in range(args.workers):
+            command = [sys.executable, "-m", "benchmarks.bench_load", "--child", "--sessions", str(sessions),
+                       "--seconds", str(args.seconds), "--think", str(args.think), "--seed", str(worker + 1)]
+            workers.append(subprocess.Popen(command, cwd=ROOT_DIR, env=env, stdout=subprocess.PIPE,
+                                            stderr=subprocess.PIPE, text=True))
+        results = []
+        for process in workers:
+            output, errors = process.communicate()
+            if process.returncode:
+                raise RuntimeError(f"worker exited with status {process.returncode}:\n{errors}")
+            results.append(json.loads(output.strip().splitlines()[-1]))
+        return results, sum(upstream.counts.values()), sum(upstream.errors.values())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sessions", type=int, nargs="+", default=[1, 2, 4, 8],
+                        help="concurrent sessions per worker, one run per value")
+    parser.add_argument("--workers", type=int, default=1, help="app processes")
+    parser.add_argument("--seconds", type=float, default=30, help="how long each run clicks through the app")
+    parser.add_argument("--think", type=float, default=1.0, help="seconds a viewer waits between clicks")
+    parser.add_argument("--delay", type=float, default=0, help="stand-in latency per request, in seconds")
+    parser.add_argument("--error-rate", type=float, default=0, help="share of upstream requests failed with a 503")
+    parser.add_argument("--scale", type=int, default=1, help="row multiplier for the synthetic pages")
+    parser.add_argument("--fixtures", default=None, help="directory of recorded pages (see tools.record_fbref)")
+    parser.add_argument("--prefetch", action="store_true", help="run the background prefetcher, as deployed")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--seed", type=int, default=1, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        _child(args.sessions[0], args.seconds, args.think, args.seed)
+        return
+
+    print(f"{'sessions':>8} {'workers':>7} {'reruns/s':>9} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} "
+          f"{'errors':>7} {'failed':>7} {'upstream':>9} {'503s':>5}  peak RSS MiB per worker")
+    for sessions in args.sessions:
+        results, upstream, injected = run_level(args, sessions)
+        reruns = [rerun for result in results for rerun in result["reruns"]]
+        latencies = np.array([seconds for seconds, _ in reruns]) * 1000
+        p50, p95, p99 = np.percentile(latencies, [50, 95, 99])
+        throughput = len(reruns) / max(result["seconds"] for result in results)
+        errors = sum(outcome == "error" for _, outcome in reruns)
+        failed = sum(outcome == "exception" for _, outcome in reruns)
+        rss = " ".join(f"{result['peak_rss_mib']:.0f}" for result in results)
+        print(f"{sessions:>8} {args.workers:>7} {throughput:>9.2f} {p50:>8.0f} {p95:>8.0f} {p99:>8.0f} "
+              f"{errors:>7} {failed:>7} {upstream:>9} {injected:>5}  {rss}")
+        raised = sum((Counter(result["raised"]) for result in results), Counter())
+        for message, count in raised.most_common():
+            print(f"{'':>8} {count:>5} x {message}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""Compare pd.read_html against the targeted fbref extractor.
+
+Runs both parsers over saved HTML pages and reports median wall time and
+peak traced memory per page. Without --fixtures it uses synthetic fbref-shaped
+pages from tools.synth_fbref; with --fixtures it walks a directory of recorded
+pages laid out like tools.fbref_standin expects (en/comps/..., en/squads/...).
+
+Usage:
+    python -m benchmarks.bench_parse
+    python -m benchmarks.bench_parse --fixtures fixtures/fbref --repeat 20
+"""
+import argparse
+import statistics
+import time
+import tracemalloc
+from io import StringIO
+from pathlib import Path
+
+import pandas as pd
+
+from core import fbref
+from tools import synth_fbref
+
+
+def table_id_for_path(path):
+    """Best guess at the wanted table id from a fixture's URL path."""
+    parts = Path(path).with_suffix("").parts
+    if "squads" in parts:
+        return "stats_standard"
+    if "passing" in parts:
+        return "stats_squads_passing_for"
+    if "shooting" in parts:
+        return "stats_squads_shooting_for"
+    return "stats_standard"
+
+
+def synthetic_pages(scale):
+    return {
+        f"synthetic/passing x{scale}": (synth_fbref.league_page("passing", scale=scale), "stats_squads_passing_for"),
+        f"synthetic/shooting x{scale}": (synth_fbref.league_page("shooting", scale=scale), "stats_squads_shooting_for"),
+        f"synthetic/club x{scale}": (synth_fbref.squad_page(scale=scale), "stats_standard"),
+    }
+
+
+def recorded_pages(root):
+    root = Path(root)
+    return {
+        str(path.relative_to(root)): (path.read_text(encoding="utf-8"), table_id_for_path(path.relative_to(root)))
+        for path in sorted(root.rglob("*.html"))
+    }
+
+
+def measure(func, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    tracemalloc.start()
+    func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return statistics.median(times), peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--fixtures", help="directory of recorded fbref pages")
+    parser.add_argument("--scale", type=int, default=1, help="row multiplier for synthetic pages")
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+
+    pages = recorded_pages(args.fixtures) if args.fixtures else synthetic_pages(args.scale)
+
+    print(f"{'page':<45}{'read_html ms':>14}{'fbref ms':>10}{'speedup':>9}{'read_html MiB':>15}{'fbref MiB':>11}")
+    for name, (html, table_id) in pages.items():
+        old_time, old_peak = measure(lambda: pd.read_html(StringIO(html), header=1)[0], args.repeat)
+        new_time, new_peak = measure(lambda: fbref.read_table(html, table_id), args.repeat)
+        print(
+            f"{name:<45}{old_time * 1000:>14.1f}{new_time * 1000:>10.1f}{old_time / new_time:>8.1f}x"
+            f"{old_peak / 2**20:>15.2f}{new_peak / 2**20:>11.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
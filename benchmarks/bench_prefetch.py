@@ -0,0 +1,41 @@
+"""Warm-up time of the prefetcher against a slow stand-in server.
+
+Every configured source is served by the stand-in with a fixed latency per
+request. Each run starts from empty caches and warms everything with a given
+number of workers; with the per-host rate limit lifted, warm-up time should
+fall with the worker count instead of growing with the number of sources.
+
+Usage:
+    python -m benchmarks.bench_prefetch --delay 0.5 --workers 1 2 4 8
+"""
+import argparse
+import time
+
+from benchmarks.common import standin_environment
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--delay", type=float, default=0.5, help="stand-in latency per request (seconds)")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--scale", type=int, default=1)
+    args = parser.parse_args()
+
+    with standin_environment(scale=args.scale, delay=args.delay):
+        # Imported here so settings pick up the stand-in environment
+        from core import datasets, fetch, prefetch, sources
+
+        count = len(sources.all_sources())
+        print(f"{count} sources, {args.delay:.2f}s latency per request")
+        for workers in args.workers:
+            datasets.clear()
+            fetch.clear(disk=True)
+            start = time.perf_counter()
+            results = prefetch.warm(workers=workers)
+            elapsed = time.perf_counter() - start
+            failed = sum(isinstance(result, Exception) for result in results.values())
+            print(f"workers {workers:>3}   warm-up {elapsed:7.2f} s   failed {failed}")
+
+
+if __name__ == "__main__":
+    main()
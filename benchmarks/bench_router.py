@@ -0,0 +1,78 @@
+"""Cold-start and per-rerun cost of the page router.
+
+cold start: a fresh interpreter runs the app once (imports + first render of
+            the default page), measured in a subprocess per sample
+rerun:      an already-warm app is rerun in place, as happens on every widget click
+
+Data comes from synthetic fixtures on a local stand-in server (see
+benchmarks.common), so the numbers reflect routing and rendering, not fbref.
+
+Usage:
+    python -m benchmarks.bench_router --samples 5 --reruns 20
+"""
+import argparse
+import statistics
+import subprocess
+import sys
+import time
+
+from benchmarks.common import APP_PATH, ROOT_DIR, standin_environment
+
+
+def _first_run_seconds():
+    from streamlit.testing.v1 import AppTest
+
+    start = time.perf_counter()
+    AppTest.from_file(str(APP_PATH), default_timeout=300).run()
+    return time.perf_counter() - start
+
+
+def cold_start(samples):
+    times = []
+    for _ in range(samples):
+        output = subprocess.run(
+            [sys.executable, "-m", "benchmarks.bench_router", "--child"],
+            cwd=ROOT_DIR, capture_output=True, text=True, check=True,
+        ).stdout
+        times.append(float(output.strip().splitlines()[-1]))
+    return times
+
+
+def reruns(count, page=None):
+    from streamlit.testing.v1 import AppTest
+
+    app = AppTest.from_file(str(APP_PATH), default_timeout=300)
+    app.run()
+    if page:
+        app.sidebar.selectbox[0].select(page).run()
+    times = []
+    for _ in range(count):
+        start = time.perf_counter()
+        app.run()
+        times.append(time.perf_counter() - start)
+    return times
+
+
+def _report(label, times):
+    print(f"{label:<34} median {statistics.median(times) * 1000:8.1f} ms   min {min(times) * 1000:8.1f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--samples", type=int, default=5)
+    parser.add_argument("--reruns", type=int, default=20)
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(_first_run_seconds())
+        return
+
+    with standin_environment():
+        _report("cold start (default page)", cold_start(args.samples))
+        for page in ("League Passing Profiles", "Goals", "Club Profiles"):
+            _report(f"rerun: {page}", reruns(args.reruns, page))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""Memory and start-up cost of app processes with and without shared tables.
+
+Starts --workers processes one after another against the same stand-in
+server, as a multi-process deployment would, and has each load every table in
+core.sources through the dataset registry. For each it reports the time to a
+full set of tables, how many pages it had to fetch, and how much private
+memory (not shared with other processes) loading them cost, read from
+/proc/self/smaps_rollup.
+
+With EPL_SHARED_TABLES=1 only the first process fetches and parses; the others
+attach to the tables it published. With 0 every process loads its own copies.
+
+Usage:
+    python -m benchmarks.bench_shared --workers 4 --scale 10
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+from benchmarks.common import ROOT_DIR, standin_environment
+
+
+def private_kib():
+    """This process's private memory in KiB (Linux only)."""
+    total = 0
+    with open("/proc/self/smaps_rollup", encoding="ascii") as rollup:
+        for line in rollup:
+            if line.startswith(("Private_Clean:", "Private_Dirty:")):
+                total += int(line.split()[1])
+    return total
+
+
+def _child():
+    import pandas  # noqa: F401  (imported before the baseline reading, like the app does)
+
+    from core import datasets, sources
+
+    before = private_kib()
+    start = time.perf_counter()
+    for source in sources.all_sources():
+        datasets.get_source(source, stale_ok=False)
+    seconds = time.perf_counter() - start
+    print(json.dumps({
+        "seconds": seconds,
+        "private_mib": (private_kib() - before) / 1024,
+        "fetched": datasets.stats["loads"],
+        "attached": datasets.stats["shared_hits"],
+    }))
+
+
+def run_workers(workers, shared):
+    env = dict(os.environ, EPL_SHARED_TABLES="1" if shared else "0")
+    command = [sys.executable, "-m", "benchmarks.bench_shared", "--child"]
+    results = []
+    for _ in range(workers):
+        output = subprocess.run(command, cwd=ROOT_DIR, env=env, capture_output=True, text=True, check=True).stdout
+        results.append(json.loads(output.strip().splitlines()[-1]))
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--scale", type=int, default=1, help="row multiplier for the synthetic pages")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        _child()
+        return
+
+    print(f"{'shared':<7} {'worker':>6} {'load ms':>9} {'private MiB':>12} {'fetched':>8} {'attached':>9}")
+    for shared in (False, True):
+        # A fresh environment per mode, so no cache or published table carries over
+        with standin_environment(scale=args.scale):
+            results = run_workers(args.workers, shared)
+        for worker, result in enumerate(results, 1):
+            print(f"{'yes' if shared else 'no':<7} {worker:>6} {result['seconds'] * 1000:>9.0f} "
+                  f"{result['private_mib']:>12.1f} {result['fetched']:>8} {result['attached']:>9}")
+
+
+if __name__ == "__main__":
+    main()
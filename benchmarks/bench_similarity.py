@@ -0,0 +1,83 @@
+"""Query and rebuild cost of the similar-players index at larger scales.
+
+For each --scales row multiplier, every league's player table is loaded from
+the stand-in at that scale and core.similarity.index() is built. It reports
+the ranked players in the index, the time of a full build, of the rebuild
+after one league's table changed (only that league's block is built again)
+and of a no-op index() call, then p50/p99 of --queries similar() calls for
+random players. The request's target is a query under 10 ms across tens of
+thousands of player-seasons.
+
+Each scale runs in a child process, since core.settings is read once per process.
+
+Usage:
+    python -m benchmarks.bench_similarity --scales 10 100 --queries 1000
+"""
+import argparse
+import json
+import random
+import subprocess
+import sys
+import time
+from dataclasses import replace
+
+import numpy as np
+
+from benchmarks.common import ROOT_DIR, standin_environment
+
+
+def _timed(func):
+    start = time.perf_counter()
+    result = func()
+    return time.perf_counter() - start, result
+
+
+def _child(scale, queries, k):
+    with standin_environment(scale=scale):
+        # Imported here so settings pick up the stand-in environment
+        from core import datasets, sources, similarity
+
+        for league in sources.PLAYER_URLS:
+            datasets.get_source(sources.players(league))
+
+        full, built = _timed(similarity.index)
+        unchanged, _ = _timed(similarity.index)
+        # As if the first league's table had been refreshed with new content
+        league = next(iter(built.blocks))
+        similarity._index = replace(built, blocks={**built.blocks, league: replace(built.blocks[league], digest="")})
+        one_league, built = _timed(similarity.index)
+
+        rng = random.Random(0)
+        names = list(built.rows)
+        latencies = [_timed(lambda: built.similar(rng.choice(names), k))[0] for _ in range(queries)]
+        print(json.dumps({
+            "players": len(built.table), "full": full, "one_league": one_league, "unchanged": unchanged,
+            "p50": float(np.percentile(latencies, 50)), "p99": float(np.percentile(latencies, 99)),
+        }))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scales", type=int, nargs="+", default=[10, 100], help="row multipliers, one run each")
+    parser.add_argument("--queries", type=int, default=1000, help="timed similar() calls per scale")
+    parser.add_argument("--k", type=int, default=10, help="neighbours per query")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        _child(args.scales[0], args.queries, args.k)
+        return
+
+    print(f"{'scale':>6} {'players':>8} {'build ms':>9} {'1 league ms':>12} {'no-op ms':>9} "
+          f"{'query p50 ms':>13} {'p99 ms':>8}")
+    for scale in args.scales:
+        command = [sys.executable, "-m", "benchmarks.bench_similarity", "--child", "--scales", str(scale),
+                   "--queries", str(args.queries), "--k", str(args.k)]
+        output = subprocess.run(command, cwd=ROOT_DIR, check=True, capture_output=True, text=True).stdout
+        result = json.loads(output.strip().splitlines()[-1])
+        print(f"x{scale:>5} {result['players']:>8} {result['full'] * 1000:>9.1f} {result['one_league'] * 1000:>12.1f} "
+              f"{result['unchanged'] * 1000:>9.2f} {result['p50'] * 1000:>13.2f} {result['p99'] * 1000:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
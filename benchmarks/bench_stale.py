@@ -0,0 +1,68 @@
+"""Read latency while upstream is slow, then while it is down.
+
+Tables are warmed once, then given a 1 second TTL so that nearly every read
+finds them expired. Reads are timed against a stand-in with --delay latency,
+and again after the stand-in is shut down. With stale-while-revalidate, read
+latency should stay at local-read time in both phases while upstream fetch
+time (and, in the second phase, the circuit breaker) shows in the metrics.
+
+Usage:
+    python -m benchmarks.bench_stale --delay 2 --seconds 10
+"""
+import argparse
+import os
+import random
+import time
+
+import numpy as np
+
+from benchmarks.common import standin_environment
+
+
+def _read_phase(datasets, sources, seconds):
+    latencies = []
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        source = random.choice(sources)
+        start = time.perf_counter()
+        datasets.get_source(source)
+        latencies.append(time.perf_counter() - start)
+        time.sleep(0.01)
+    return np.array(latencies)
+
+
+def _report(label, latencies):
+    p50, p95, p99 = np.percentile(latencies, [50, 95, 99]) * 1000
+    print(f"{label:<22} reads {len(latencies):>6}   p50 {p50:7.2f} ms   p95 {p95:7.2f} ms   p99 {p99:7.2f} ms"
+          f"   max {latencies.max() * 1000:8.2f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--delay", type=float, default=2.0, help="stand-in latency per request (seconds)")
+    parser.add_argument("--seconds", type=float, default=10.0, help="length of each read phase")
+    args = parser.parse_args()
+
+    with standin_environment(delay=args.delay) as server:
+        os.environ.update({"EPL_TTL_COMPS": "1", "EPL_TTL_SQUADS": "1", "EPL_BREAKER_COOLDOWN": "5"})
+        # Imported here so settings pick up the stand-in environment
+        from core import datasets, metrics, prefetch, sources
+
+        all_sources = sources.all_sources()
+        prefetch.warm(all_sources, workers=len(all_sources))
+        metrics.clear()
+
+        _report("upstream slow", _read_phase(datasets, all_sources, args.seconds))
+        server.shutdown()
+        server.server_close()
+        _report("upstream down", _read_phase(datasets, all_sources, args.seconds))
+
+        fetch_times = [summary["p50"] for summary in metrics.summary("fetch_seconds").values()]
+        print(f"upstream fetch p50 across sources: {np.median(fetch_times):.2f} s")
+        print("counters:", {name: value for name, value in datasets.counters().items()
+                            if name.split("_", 1)[1] in ("stale", "refreshes", "errors", "failures",
+                                                         "breaker_opened", "breaker_rejected")})
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,295 @@
+"""Fetch-parse-transform-render benchmarks for every view, compared with a saved baseline.
+
+Every table in core.sources is taken through the same stages as in the app,
+and each stage is timed on its own:
+
+parse   core.fbref.read_table on the full page (the app's replacement for
+        pd.read_html; benchmarks.bench_parse compares the two)
+schema  schemas.apply: renames, validation and dtype compaction
+enrich  core.players.enrich on league player tables
+plot    every plot_* function of the views, with the render cache emptied
+        before each call so the chart is really drawn and encoded
+page    the whole page script run headless with Streamlit's AppTest against
+        a local stand-in server: the first run (cold caches) and warm reruns.
+        Runs in a child process per scale, since core.settings is read once per process.
+
+For each stage it reports the median wall time, the peak traced memory of one
+call, and the memory blocks the call left allocated (a leak shows up as a
+count that grows with every call).
+
+Pages come from tools.synth_fbref at each --scales row multiplier (x10 = ten
+times the squads, so ten times the rows in every table), or from recorded
+pages with --fixtures (see tools.record_fbref), which run at x1 only.
+Larger scales repeat each stage fewer times.
+
+Timings depend on the machine, so no baseline ships with the repo: save one
+with --save-baseline on the machine that will run the checks. Results are
+compared with the baseline file when it exists. A stage is a regression when
+it is more than --tolerance slower than the baseline and at least 2 ms slower
+in absolute terms; with --check the exit status is 1 if any stage regressed,
+and --check without a baseline file is an error.
+
+Usage:
+    python -m benchmarks.bench_suite --save-baseline
+    python -m benchmarks.bench_suite --scales 1 10 100 --check
+    python -m benchmarks.bench_suite --fixtures fixtures/fbref --page-scales 1
+"""
+import argparse
+import importlib
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+from urllib.parse import urldefrag
+
+import matplotlib
+
+matplotlib.use("Agg")
+
+from benchmarks.common import APP_PATH, ROOT_DIR, standin_environment, view_urls  # noqa: E402
+from tools import record_fbref, synth_fbref  # noqa: E402
+
+DEFAULT_BASELINE = Path(__file__).resolve().parent / "baseline.json"
+
+# Pages timed with AppTest, by their name in the app's sidebar
+PAGES = ("League Passing Profiles", "League Shooting Profiles", "Goals", "Club Profiles", "Cross-League Rankings",
+         "Season Trends")
+
+# Chart functions by source kind (the second element of Source.snapshot_key)
+SQUAD_CHARTS = {
+    "passing": ("views.passing_stats", ("plot_team_passes", "plot_passing_types",
+                                        "plot_progressive_passes", "plot_missed_passes")),
+    "shooting": ("views.shooting_stats", ("plot_team_shots", "plot_team_acc",
+                                          "plot_shots_per_90_vs_sot_per_90", "plot_team_sot")),
+    "goals": ("views.goals", ("plot_team_goals", "plot_team_goals_scatter")),
+}
+
+# Below this, a slowdown is treated as timer noise whatever its ratio
+NOISE_SECONDS = 0.002
+
+
+def measure(func, repeat, setup=None):
+    """Median and best wall time over repeat calls, then peak memory and retained blocks of one more."""
+    times = []
+    for _ in range(repeat):
+        if setup:
+            setup()
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    if setup:
+        setup()
+    blocks = sys.getallocatedblocks()
+    tracemalloc.start()
+    func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {
+        "seconds": statistics.median(times),
+        "min_seconds": min(times),
+        "peak_mib": peak / 2**20,
+        "blocks": sys.getallocatedblocks() - blocks,
+    }
+
+
+def pages_for(scale, fixtures):
+    """{url: html} for every configured URL, synthetic at scale or recorded."""
+    if fixtures:
+        return {url: record_fbref.fixture_path(fixtures, url).read_text(encoding="utf-8") for url in view_urls()}
+    # Same seeds as synth_fbref.write_fixtures, so the page stage sees the same data
+    return {url: synth_fbref.page_for_url(url, scale=scale, seed=seed) for seed, url in enumerate(view_urls())}
+
+
+def _chart_cases(kind, frame):
+    """(label, call) for every chart drawn from a table of this kind."""
+    from core import players
+
+    cases = []
+    if kind == "players":
+        from views import player_profiles
+
+        league = players.enrich(frame)
+        team = league["Squad"].iloc[0]
+        club = league[league["Squad"] == team]
+        cases += [
+            ("plot_metric_distribution", lambda: player_profiles.plot_metric_distribution(club, team, "Gls", "Goals")),
+            ("plot_minutes_distribution", lambda: player_profiles.plot_minutes_distribution(club, team)),
+            ("plot_goals_assists_per_90", lambda: player_profiles.plot_goals_assists_per_90(club, team)),
+        ]
+    for chart_kind in (kind, "goals") if kind == "shooting" else (kind,):
+        if chart_kind not in SQUAD_CHARTS:
+            continue
+        module_name, names = SQUAD_CHARTS[chart_kind]
+        module = importlib.import_module(module_name)
+        cases += [(name, lambda plot=getattr(module, name): plot(frame)) for name in names]
+    return cases
+
+
+def stage_results(scale, fixtures, repeat):
+    """Time parse, schema, enrich and plot for every source at one scale."""
+    from core import derived, fbref, players, render_cache, schemas, sources
+
+    pages = pages_for(scale, fixtures)
+    results = {}
+    charted = set()
+    for source in sources.all_sources():
+        league, kind = source.snapshot_key
+        html = pages[urldefrag(source.url)[0]]
+        label = f"{kind} / {league}"
+
+        raw = fbref.read_table(html, source.table_id)
+        results[("parse", label)] = measure(lambda: fbref.read_table(html, source.table_id), repeat)
+        frame = schemas.apply(raw, source.schema)
+        results[("schema", label)] = measure(lambda: schemas.apply(raw, source.schema), repeat)
+        if kind == "players":
+            # Emptying the derived-column memo each time, so enrich really computes
+            results[("enrich", label)] = measure(lambda: players.enrich(frame), repeat, setup=derived.clear)
+
+        # Charts only depend on the table's shape, so one league per kind is enough
+        if kind in charted:
+            continue
+        charted.add(kind)
+        for name, call in _chart_cases(kind, frame):
+            results[("plot", name)] = measure(call, repeat, setup=render_cache.clear)
+    return results
+
+
+def page_results(repeat):
+    """Time each page with AppTest; expects the environment from standin_environment()."""
+    from streamlit.testing.v1 import AppTest
+
+    from core import datasets, fetch, players, render_cache, shared
+
+    results = {}
+    for page in PAGES:
+        app = AppTest.from_file(str(APP_PATH), default_timeout=600)
+        app.run()
+        # The selected page starts from cold caches: fetch, registry, shared tables, player tables and charts
+        fetch.clear(disk=True)
+        datasets.clear()
+        shared.clear()
+        players.clear()
+        render_cache.clear()
+        start = time.perf_counter()
+        app.sidebar.selectbox[0].select(page).run()
+        first = time.perf_counter() - start
+        if app.exception:
+            raise RuntimeError(f"{page}: {app.exception[0].value}")
+        warm = measure(app.run, repeat)
+        results[("page", f"{page} (first run)")] = {
+            "seconds": first, "min_seconds": first, "peak_mib": None, "blocks": None,
+        }
+        results[("page", f"{page} (rerun)")] = warm
+    return results
+
+
+def _child_pages(scale, fixtures, repeat):
+    with standin_environment(scale=scale, fixtures=fixtures):
+        results = page_results(repeat)
+    print(json.dumps([[stage, label, values] for (stage, label), values in results.items()]))
+
+
+def run_pages(scale, fixtures, repeat):
+    command = [sys.executable, "-m", "benchmarks.bench_suite", "--child-pages",
+               "--scale", str(scale), "--repeat", str(repeat)]
+    if fixtures:
+        command += ["--fixtures", str(fixtures)]
+    output = subprocess.run(command, cwd=ROOT_DIR, capture_output=True, text=True, check=True).stdout
+    return {(stage, label): values for stage, label, values in json.loads(output.strip().splitlines()[-1])}
+
+
+def result_key(stage, label, scale):
+    return f"{stage} | {label} | x{scale}"
+
+
+def load_baseline(path):
+    path = Path(path)
+    if not path.exists():
+        return {}
+    return json.loads(path.read_text(encoding="utf-8"))["results"]
+
+
+def save_baseline(path, results):
+    payload = {
+        "python": platform.python_version(),
+        "machine": platform.platform(),
+        "saved_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "results": results,
+    }
+    Path(path).write_text(json.dumps(payload, indent=1, sort_keys=True) + "\n", encoding="utf-8")
+
+
+def compare(values, baseline, tolerance):
+    """(text for the change column, regressed?) against the baseline entry, if any."""
+    if baseline is None:
+        return "new", False
+    ratio = values["seconds"] / baseline["seconds"] if baseline["seconds"] else float("inf")
+    regressed = ratio > 1 + tolerance and values["seconds"] - baseline["seconds"] > NOISE_SECONDS
+    return f"{(ratio - 1) * 100:+.0f}%{'  REGRESSED' if regressed else ''}", regressed
+
+
+def _format(value, width, spec):
+    return f"{'-':>{width}}" if value is None else f"{value:>{width}{spec}}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--fixtures", help="directory of recorded fbref pages (see tools.record_fbref)")
+    parser.add_argument("--scales", type=int, nargs="+", default=[1, 10], help="row multipliers for synthetic pages")
+    parser.add_argument("--page-scales", type=int, nargs="*", default=[1],
+                        help="scales at which whole pages are run with AppTest (none to skip)")
+    parser.add_argument("--repeat", type=int, default=10, help="calls per stage at x1")
+    parser.add_argument("--baseline", default=str(DEFAULT_BASELINE))
+    parser.add_argument("--save-baseline", action="store_true", help="store this run as the new baseline")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed slowdown before a stage regresses")
+    parser.add_argument("--check", action="store_true", help="exit with status 1 if any stage regressed")
+    parser.add_argument("--child-pages", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--scale", type=int, default=1, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child_pages:
+        _child_pages(args.scale, args.fixtures, args.repeat)
+        return
+
+    scales = [1] if args.fixtures else args.scales
+    page_scales = [scale for scale in args.page_scales if not args.fixtures or scale == 1]
+    baseline = load_baseline(args.baseline)
+    if args.check and not baseline:
+        # Every stage would read "new" and nothing could regress
+        parser.error(f"--check needs a baseline; none at {args.baseline} (save one with --save-baseline)")
+
+    results = {}
+    regressions = 0
+    print(f"{'stage':<7} {'label':<46} {'scale':>5} {'median ms':>10} {'min ms':>9} {'peak MiB':>9} "
+          f"{'blocks':>8}  vs baseline")
+    for scale in sorted(set(scales) | set(page_scales)):
+        repeat = max(1, args.repeat // scale)
+        measured = {}
+        if scale in scales:
+            measured.update(stage_results(scale, args.fixtures, repeat))
+        if scale in page_scales:
+            measured.update(run_pages(scale, args.fixtures, repeat))
+        for (stage, label), values in measured.items():
+            key = result_key(stage, label, scale)
+            change, regressed = compare(values, baseline.get(key), args.tolerance)
+            regressions += regressed
+            results[key] = values
+            print(f"{stage:<7} {label:<46} {'x' + str(scale):>5} {values['seconds'] * 1000:>10.1f} "
+                  f"{values['min_seconds'] * 1000:>9.1f} {_format(values['peak_mib'], 9, '.2f')} "
+                  f"{_format(values['blocks'], 8, 'd')}  {change}")
+
+    if args.save_baseline:
+        save_baseline(args.baseline, results)
+        print(f"Saved {len(results)} results to {args.baseline}")
+    elif regressions:
+        print(f"{regressions} stage(s) regressed by more than {args.tolerance:.0%} against {args.baseline}")
+        if args.check:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""Shared setup for benchmarks: synthetic fbref fixtures behind a local stand-in server."""
+import os
+import shutil
+import tempfile
+from contextlib import contextmanager
+from pathlib import Path
+
+from tools import fbref_standin, record_fbref, synth_fbref
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+APP_PATH = ROOT_DIR / "streamlit_football_app.py"
+
+
+def view_urls():
+    """Every fbref URL the app can request (see core.sources)."""
+    # Only core.sources is imported, not core.settings, so the environment set
+    # up by standin_environment() still applies when the app modules are imported later
+    return record_fbref.source_urls()
+
+
+@contextmanager
+def standin_environment(urls=None, scale=1, delay=0, fixtures=None, error_rate=0):
+    """Serve synthetic pages for urls from a stand-in server and point the app at it.
+
+    With fixtures (a directory of recorded pages, see tools.record_fbref) those
+    pages are served instead of synthetic ones, and urls and scale are ignored.
+
+    Cache and snapshot directories are redirected to a temporary directory so
+    benchmark runs never touch the real ones, the per-host rate limit is lifted
+    and the background prefetcher is off. delay is the stand-in's latency per
+    request and error_rate the share of requests it fails with a 503. Yields
+    the server, whose .counts record the upstream requests made (and .errors
+    the failed ones).
+    """
+    workdir = Path(tempfile.mkdtemp(prefix="epl-bench-"))
+    if fixtures is None:
+        fixtures = workdir / "fbref"
+        synth_fbref.write_fixtures(fixtures, urls or view_urls(), scale=scale)
+    server = fbref_standin.serve(fixtures, delay=delay, error_rate=error_rate)
+    overrides = {
+        "EPL_FBREF_BASE_URL": fbref_standin.base_url(server),
+        "EPL_CACHE_DIR": str(workdir / "cache"),
+        "EPL_SNAPSHOT_DIR": str(workdir / "snapshots"),
+        "EPL_SHARED_DIR": str(workdir / "shared"),
+        "EPL_HISTORY_DIR": str(workdir / "history"),
+        "EPL_SNAPSHOT_ON_FETCH": "0",
+        "EPL_HOST_INTERVAL": "0",
+        "EPL_PREFETCH": "0",
+    }
+    saved = {name: os.environ.get(name) for name in overrides}
+    os.environ.update(overrides)
+    try:
+        yield server
+    finally:
+        server.shutdown()
+        for name, value in saved.items():
+            if value is None:
+                os.environ.pop(name, None)
+            else:
+                os.environ[name] = value
+        shutil.rmtree(workdir, ignore_errors=True)
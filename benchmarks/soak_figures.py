@@ -0,0 +1,83 @@
+"""Soak test for figure memory: render every chart thousands of times and watch RSS.
+
+Each iteration draws all passing/shooting/goals charts from synthetic data and
+serializes them, the same work a rerun does on a render-cache miss. With the
+figure manager, RSS and the live-figure count should stay flat. --pyplot runs
+the same loop but also creates an unclosed figure through pyplot each time,
+like the charts used to, for comparison.
+
+Usage:
+    python -u -m benchmarks.soak_figures --iterations 2000   # ~0.5s per chart, so expect hours
+    python -m benchmarks.soak_figures --iterations 500 --pyplot
+"""
+import argparse
+import os
+import time
+
+import matplotlib
+
+matplotlib.use("Agg")
+
+from core import fbref, figures, render_cache, schemas  # noqa: E402
+from tools import synth_fbref  # noqa: E402
+from views import goals, passing_stats, shooting_stats  # noqa: E402
+
+
+def rss_mib():
+    # Current resident set size; Linux only, falls back to the peak elsewhere
+    try:
+        with open("/proc/self/statm") as statm:
+            return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+    except OSError:
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def chart_inputs():
+    passing = fbref.read_table(synth_fbref.league_page("passing"), "stats_squads_passing_for")
+    passing = schemas.apply(passing, schemas.PASSING)
+    shooting = fbref.read_table(synth_fbref.league_page("shooting"), "stats_squads_shooting_for")
+    shooting = schemas.apply(shooting, schemas.SHOOTING)
+
+    missed = passing.set_index("Squad")[["passes_Cmp", "passes_Att"]]
+    missed = missed.assign(passes_Missed=missed["passes_Att"] - missed["passes_Cmp"])
+    return [
+        (passing_stats.draw_team_passes, passing[["Squad", "passes_Cmp", "passes_Att"]]),
+        (passing_stats.draw_passing_types, passing[["Squad", "s_passes_Cmp", "m_passes_Cmp", "l_passes_Cmp"]]),
+        (passing_stats.draw_progressive_passes, passing[["Squad", "PrgP"]]),
+        (passing_stats.draw_missed_passes, missed),
+        (shooting_stats.draw_team_shots, shooting[["Squad", "SoT", "Sh"]]),
+        (shooting_stats.draw_team_acc, shooting[["Squad", "Gls", "SoT"]]),
+        (shooting_stats.draw_shots_per_90_vs_sot_per_90, shooting[["Squad", "Sh/90", "SoT/90"]]),
+        (shooting_stats.draw_team_sot, shooting[["Squad", "SoT%"]]),
+        (goals.draw_team_goals, shooting[["Squad", "Gls"]]),
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=2000)
+    parser.add_argument("--report-every", type=int, default=100)
+    parser.add_argument("--pyplot", action="store_true", help="also leak one pyplot figure per iteration")
+    args = parser.parse_args()
+
+    inputs = chart_inputs()
+    start = time.perf_counter()
+    print(f"{'iteration':>10}{'rss MiB':>10}{'live figures':>14}{'pyplot figures':>16}")
+    for iteration in range(1, args.iterations + 1):
+        for draw, frame in inputs:
+            with figures.rendering():
+                render_cache.to_png(draw(frame))
+        if args.pyplot:
+            import matplotlib.pyplot as plt
+            plt.figure(dpi=150).add_subplot(111).bar(range(20), range(20))
+
+        if iteration % args.report_every == 0 or iteration == 1:
+            import matplotlib.pyplot as plt
+            print(f"{iteration:>10}{rss_mib():>10.1f}{figures.live_figures():>14}{len(plt.get_fignums()):>16}")
+
+    print(f"{args.iterations} iterations in {time.perf_counter() - start:.1f}s; figure stats: {dict(figures.stats)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,369 @@
+"""Read-only HTTP API over the league and club tables the app shows.
+
+Other tools read the same normalized tables the pages use, from the same
+dataset registry, instead of scraping fbref themselves. Every request is served
+from the registry (stale-while-revalidate, single flight), so upstream traffic
+stays at one fetch per refresh however many clients poll.
+
+    GET /                                 the tables available, with their paths
+    GET /tables/<stat_type>/<league>      a league table (passing, shooting or players)
+    GET /clubs/<league>/<squad>           one club's players, with the columns core.players adds
+
+Leagues and squads are named by slug (premier-league, manchester-utd). Query
+parameters:
+
+    columns=Squad,passes_Cmp     only these columns, in this order
+    where=passes_Cmp>=5000       a row filter (==, !=, >=, <=, >, <); repeat it to combine filters
+    format=json|arrow            JSON records (the default) or an Arrow IPC stream; also
+                                 picked from the Accept header
+
+Bodies are compressed with zstd or gzip when the client accepts either. The
+ETag of a response is derived from the table's content digest and the query,
+so revalidating with If-None-Match is answered with a 304 before anything is
+filtered or encoded. Encoded bodies are kept in an LRU bounded by
+settings.API_CACHE_BYTES, so a repeated query is a dictionary lookup until the
+table changes.
+
+With settings.API_PORT set, start() serves the API from a background thread
+of the app process; python -m core.api runs it on its own.
+
+Usage:
+    python -m core.api --port 8502
+"""
+import argparse
+import gzip
+import hashlib
+import json
+import logging
+import operator
+import re
+import threading
+import time
+from collections import Counter, OrderedDict
+from email.utils import formatdate
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+from core import datasets, metrics, players, prefetch, settings, sources
+
+logger = logging.getLogger(__name__)
+
+# requests:     API requests handled
+# not_modified: answered with a 304 (If-None-Match)
+# cache_hits:   served an encoded body kept from an earlier request
+# encodes:      bodies filtered, encoded and compressed
+# errors:       4xx/5xx responses
+stats = Counter()
+
+# League tables by stat type: the configured leagues and the source of each
+TABLES = {
+    "passing": (sources.PASSING_URLS, sources.passing),
+    "shooting": (sources.SHOOTING_URLS, sources.shooting),
+    "players": (sources.PLAYER_URLS, sources.players),
+}
+
+FORMATS = {"json": "application/json", "arrow": "application/vnd.apache.arrow.stream"}
+
+# Content encodings offered, preferred first
+ENCODINGS = ("zstd", "gzip")
+
+# Bodies smaller than this are sent uncompressed
+MIN_COMPRESS_BYTES = 1024
+
+# Digits kept for floats in JSON (float32 columns would otherwise print as 0.1000000015)
+JSON_PRECISION = 6
+
+_FILTER = re.compile(r"^(.+?)(==|!=|>=|<=|>|<)(.*)$")
+_OPERATORS = {"==": operator.eq, "!=": operator.ne, ">=": operator.ge,
+              "<=": operator.le, ">": operator.gt, "<": operator.lt}
+
+_zstd = pa.Codec("zstd")
+
+_bodies = OrderedDict()   # (etag, accepted encoding) -> (body, encoding used)
+_bytes = 0
+_lock = threading.Lock()
+
+_started = False
+_start_lock = threading.Lock()
+
+
+class ApiError(Exception):
+    """A request the API cannot answer, with the HTTP status to answer it with."""
+
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+def _slug(value):
+    return re.sub(r"[^a-z0-9]+", "-", str(value).lower()).strip("-")
+
+
+def _find(names, slug, what):
+    for name in names:
+        if _slug(name) == slug:
+            return name
+    raise ApiError(404, f"no {what} {slug!r}")
+
+
+def index():
+    """The tables served, with the path of each."""
+    tables = [{"stat_type": stat_type, "league": league, "path": f"/tables/{stat_type}/{_slug(league)}"}
+              for stat_type, (urls, _) in TABLES.items() for league in urls]
+    clubs = [{"league": league, "path": f"/clubs/{_slug(league)}/<squad>"} for league in sources.PLAYER_URLS]
+    return {"tables": tables, "clubs": clubs, "formats": list(FORMATS)}
+
+
+def resolve(parts):
+    """(Dataset, frame) named by a path split into its parts."""
+    if len(parts) == 3 and parts[0] == "tables":
+        if parts[1] not in TABLES:
+            raise ApiError(404, f"no stat type {parts[1]!r}")
+        urls, source = TABLES[parts[1]]
+        dataset = datasets.get_source(source(_find(urls, parts[2], "league")))
+        return dataset, dataset.frame
+    if len(parts) == 3 and parts[0] == "clubs":
+        table = players.league_players(_find(sources.PLAYER_URLS, parts[1], "league"))
+        return table.dataset, table.club(_find(table.squads(), parts[2], "club"))
+    raise ApiError(404, "no such path; GET / lists the tables")
+
+
+def parse_query(params, accept=""):
+    """(columns, filters, format) of a parsed query string."""
+    columns = tuple(name for value in params.get("columns", []) for name in value.split(",") if name)
+    filters = []
+    for value in params.get("where", []):
+        match = _FILTER.match(value)
+        if match is None:
+            raise ApiError(400, f"bad filter {value!r}, expected e.g. Gls>=5")
+        filters.append(match.groups())
+    default = "arrow" if FORMATS["arrow"] in accept else "json"
+    fmt = params.get("format", [default])[-1]
+    if fmt not in FORMATS:
+        raise ApiError(400, f"unknown format {fmt!r}, expected one of {', '.join(FORMATS)}")
+    return columns, tuple(filters), fmt
+
+
+def _condition(values, op, value):
+    if pd.api.types.is_bool_dtype(values):
+        target = value.lower() in ("1", "true", "yes")
+    elif pd.api.types.is_numeric_dtype(values):
+        try:
+            target = float(value)
+        except ValueError:
+            raise ApiError(400, f"{values.name} is numeric, got {value!r}") from None
+    else:
+        values, target = values.astype(str), value
+    return _OPERATORS[op](values, target).to_numpy(dtype=bool, na_value=False)
+
+
+def select(frame, columns=(), filters=()):
+    """The rows matching every filter, with only the given columns (all if none)."""
+    unknown = [name for name in (*columns, *(column for column, _, _ in filters)) if name not in frame.columns]
+    if unknown:
+        raise ApiError(400, f"unknown columns: {', '.join(unknown)}")
+    if filters:
+        keep = np.ones(len(frame), dtype=bool)
+        for column, op, value in filters:
+            keep &= _condition(frame[column], op, value)
+        frame = frame[keep]
+    return frame[list(columns)] if columns else frame
+
+
+def encode(frame, fmt):
+    if fmt == "arrow":
+        table = pa.Table.from_pandas(frame, preserve_index=False)
+        sink = pa.BufferOutputStream()
+        with pa.ipc.new_stream(sink, table.schema) as writer:
+            writer.write_table(table)
+        return sink.getvalue().to_pybytes()
+    return frame.to_json(orient="records", double_precision=JSON_PRECISION).encode("utf-8")
+
+
+def _compress(body, encoding):
+    if encoding == "zstd":
+        return _zstd.compress(body).to_pybytes()
+    return gzip.compress(body, compresslevel=6)
+
+
+def _accepted_encoding(header):
+    # The preferred encoding the client accepts (q > 0), or None
+    accepted = set()
+    for part in header.split(","):
+        name, _, params = part.partition(";")
+        quality = params.strip()
+        try:
+            if quality.startswith("q=") and float(quality[2:]) <= 0:
+                continue
+        except ValueError:
+            continue
+        accepted.add(name.strip().lower())
+    return next((encoding for encoding in ENCODINGS if encoding in accepted), None)
+
+
+def _etag(dataset, parts, query):
+    digest = hashlib.sha1(repr((dataset.digest, parts, query)).encode("utf-8")).hexdigest()[:20]
+    return f'"{digest}"'
+
+
+def _encoded_etag(etag, encoding):
+    # Each content encoding is its own representation, with its own tag
+    return f'{etag[:-1]}-{encoding}"' if encoding else etag
+
+
+def _matching_tag(header, etag):
+    # The tag of If-None-Match that names this table version and query, in any encoding
+    for tag in (header or "").split(","):
+        tag = tag.strip().removeprefix("W/")
+        if tag == "*" or tag == etag or any(tag == _encoded_etag(etag, encoding) for encoding in ENCODINGS):
+            return tag
+    return None
+
+
+def _cached(key):
+    with _lock:
+        entry = _bodies.get(key)
+        if entry is not None:
+            _bodies.move_to_end(key)
+        return entry
+
+
+def _keep(key, entry):
+    global _bytes
+    with _lock:
+        old = _bodies.pop(key, None)
+        _bytes += len(entry[0]) - (len(old[0]) if old is not None else 0)
+        _bodies[key] = entry
+        while _bytes > settings.API_CACHE_BYTES and len(_bodies) > 1:
+            _, evicted = _bodies.popitem(last=False)
+            _bytes -= len(evicted[0])
+
+
+def _body(frame, query, etag, encoding):
+    # (body, encoding actually used), encoded once per table version, query and accepted encoding
+    key = (etag, encoding)
+    cached = _cached(key)
+    if cached is not None:
+        stats["cache_hits"] += 1
+        return cached
+    stats["encodes"] += 1
+    columns, filters, fmt = query
+    body = encode(select(frame, columns, filters), fmt)
+    if encoding and len(body) >= MIN_COMPRESS_BYTES:
+        body = _compress(body, encoding)
+    else:
+        encoding = None
+    _keep(key, (body, encoding))
+    return body, encoding
+
+
+class _ApiHandler(BaseHTTPRequestHandler):
+    # Keep-alive, so a client polling the API reuses its connection; without
+    # Nagle, a body written after its headers is not held back for the client's ACK
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        started = time.perf_counter()
+        url = urlsplit(self.path)
+        parts = tuple(part for part in url.path.split("/") if part)
+        stats["requests"] += 1
+        try:
+            if parts:
+                self._table(parts, parse_qs(url.query))
+            else:
+                self._send(200, json.dumps(index()).encode("utf-8"), {"Content-Type": FORMATS["json"]})
+        except ApiError as exc:
+            self._error(exc.status, str(exc))
+        except Exception as exc:
+            # Nothing stored to serve and the fetch failed
+            logger.warning("could not serve %s: %s", self.path, exc)
+            self._error(503, f"table unavailable: {exc}")
+        finally:
+            metrics.observe("api_seconds", parts[0] if parts else "index", time.perf_counter() - started)
+
+    def _table(self, parts, params):
+        dataset, frame = resolve(parts)
+        query = parse_query(params, self.headers.get("Accept", ""))
+        etag = _etag(dataset, parts, query)
+        headers = {
+            "Cache-Control": f"max-age={max(0, int(dataset.expires_at - time.time()))}",
+            "Last-Modified": formatdate(dataset.fetched_at, usegmt=True),
+            "Vary": "Accept, Accept-Encoding",
+        }
+        matched = _matching_tag(self.headers.get("If-None-Match"), etag)
+        if matched is not None:
+            stats["not_modified"] += 1
+            self._send(304, b"", {"ETag": etag if matched == "*" else matched, **headers})
+            return
+        body, encoding = _body(frame, query, etag, _accepted_encoding(self.headers.get("Accept-Encoding", "")))
+        headers.update({"Content-Type": FORMATS[query[2]], "ETag": _encoded_etag(etag, encoding)})
+        if encoding:
+            headers["Content-Encoding"] = encoding
+        self._send(200, body, headers)
+
+    def _error(self, status, message):
+        stats["errors"] += 1
+        self._send(status, json.dumps({"error": message}).encode("utf-8"), {"Content-Type": FORMATS["json"]})
+
+    def _send(self, status, body, headers):
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        if status != 304:
+            self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def serve(port, host="127.0.0.1"):
+    """Serve the API on a background thread and return the server."""
+    server = ThreadingHTTPServer((host, port), _ApiHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="epl-api", daemon=True).start()
+    return server
+
+
+def start():
+    """Serve the API on settings.API_PORT, once per process; does nothing when it is 0."""
+    global _started
+    with _start_lock:
+        if _started or not settings.API_PORT:
+            return None
+        _started = True
+    return serve(settings.API_PORT, settings.API_HOST)
+
+
+def clear():
+    global _bytes
+    with _lock:
+        _bodies.clear()
+        _bytes = 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default=settings.API_HOST)
+    parser.add_argument("--port", type=int, default=settings.API_PORT or 8502)
+    args = parser.parse_args()
+
+    # Keep the tables warm between requests, as the app does
+    prefetch.start()
+    server = ThreadingHTTPServer((args.host, args.port), _ApiHandler)
+    server.daemon_threads = True
+    print(f"Serving the data API on http://{args.host}:{server.server_address[1]}/")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
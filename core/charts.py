@@ -0,0 +1,89 @@
+"""Squad bar charts declared as data and drawn by one renderer.
+
+The league pages' bar charts only differ in their columns, sort key, colours
+and labels, so each is declared as a BarChart and drawn by draw() (a PNG
+through matplotlib) or spec() (a Plotly spec), instead of a hand-written
+function per chart. A new metric is a new declaration in the view.
+
+draw() places all bars of a series with one ax.bar call and labels them with
+one ax.bar_label call, instead of DataFrame.plot and a Python loop of
+ax.annotate over the patches. Fonts and sizes are set up once here and shared
+by every chart.
+"""
+from dataclasses import dataclass
+
+import numpy as np
+
+from core import derived, figures, interactive
+
+# Shared styling
+DPI = 150
+TITLE_SIZE = 12
+TICK_ROTATION = 45
+LABEL_PADDING = 2
+
+
+@dataclass(frozen=True)
+class BarChart:
+    name: str                 # also the chart's name for per-chart backends (settings.CHART_BACKENDS)
+    header: str               # section header above the chart
+    title: str
+    y: tuple                  # one series of bars per column
+    sort: str                 # column the bars are sorted by, largest first
+    colors: tuple
+    names: tuple = None       # legend names of the series (default: the column names)
+    x: str = "Squad"
+    xlabel: str = "Squad"
+    ylabel: str = ""
+    labels: str = None        # printf-style format of the value printed on each bar, e.g. "%d"
+    label_size: int = 8
+    tick_size: int = 9
+    width: float = 0.5        # width of a group of bars
+
+    @property
+    def series_names(self):
+        return list(self.names or self.y)
+
+
+def prepare(frame, chart):
+    """The chart's columns, sorted; derived columns (see core.derived) are added if the frame lacks them."""
+    frame = derived.derive(frame, chart.y)
+    return frame[[chart.x, *chart.y]].sort_values(by=chart.sort, ascending=False)
+
+
+def _labels(values, fmt):
+    # Formatted in one call; missing values get no label
+    missing = np.isnan(values)
+    return np.where(missing, "", np.char.mod(fmt, np.where(missing, 0, values)))
+
+
+def draw(frame, chart):
+    """Matplotlib figure of a prepared frame (see prepare())."""
+    fig = figures.new_figure(dpi=DPI)
+    ax = fig.add_subplot(111)
+
+    positions = np.arange(len(frame))
+    step = chart.width / len(chart.y)
+    for i, (column, name) in enumerate(zip(chart.y, chart.series_names)):
+        values = frame[column].to_numpy(dtype=np.float64)
+        offset = (i - (len(chart.y) - 1) / 2) * step
+        bars = ax.bar(positions + offset, values, step, color=chart.colors[i], label=name)
+        if chart.labels:
+            ax.bar_label(bars, labels=_labels(values, chart.labels), fontsize=chart.label_size, padding=LABEL_PADDING)
+
+    ax.set_xticks(positions, frame[chart.x].astype(str), rotation=TICK_ROTATION, ha="right",
+                  fontsize=chart.tick_size)
+    ax.set_xlim(-0.5, len(frame) - 0.5)
+    ax.set_title(chart.title, fontsize=TITLE_SIZE)
+    ax.set_xlabel(chart.xlabel)
+    ax.set_ylabel(chart.ylabel)
+    ax.legend(loc="upper right")
+    # No tight_layout(): the PNG is saved with bbox_inches='tight', which already
+    # fits the rotated tick labels, so laying the text out twice is wasted work
+    return fig
+
+
+def spec(frame, chart):
+    """Plotly spec of a prepared frame (see prepare())."""
+    return interactive.bar(frame, chart.x, list(chart.y), chart.title, xlabel=chart.xlabel,
+                           ylabel=chart.ylabel, colors=list(chart.colors), names=chart.series_names)
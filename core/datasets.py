@@ -0,0 +1,331 @@
+"""Process-wide registry of parsed league tables.
+
+Every page and every Streamlit session asks the registry for a table instead of
+parsing it itself. Concurrent requests for the same table are coalesced into a
+single fetch + parse (single flight), and every caller gets the same DataFrame
+back. Callers must treat the returned frame as read-only: rename/assign into a
+new frame rather than modifying it in place.
+
+Tables requested with a schema are renamed, validated and downcast once here
+(see core.schemas), before they are cached or snapshotted.
+
+Tables requested with a snapshot_key=(league, stat_type) are also written to the
+snapshot store after each fetch, and in offline mode are served from it.
+
+Reads never wait on fbref when there is something to show: an expired table
+is served as is (stale-while-revalidate) while a background thread refreshes
+it, and a table not yet in memory is served the same way from its latest
+snapshot of the current season (an older season's table is never passed off as
+the current one). If the refresh fails, the last good table simply stays in
+place.
+
+Every parse of a table with a snapshot_key is added to its season history
+(core.history). Such tables are also published to core.shared, so the other
+app processes on the host attach to them instead of fetching and parsing
+their own copies. A process that has no table yet, or whose copy expired,
+first looks there for one another process already loaded.
+"""
+import hashlib
+import logging
+import threading
+import time
+from collections import Counter
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, replace
+from datetime import datetime
+
+import pandas as pd
+import pyarrow as pa
+
+from core import fbref, fetch, history, metrics, schemas, settings, shared, snapshots
+
+logger = logging.getLogger(__name__)
+
+# requests:  calls to get_dataset
+# hits:      served from the registry without any work
+# coalesced: waited on another caller's in-flight load instead of loading
+# stale:     served an expired table (or its snapshot) while it refreshes
+# refreshes: background refreshes that completed (refresh_skipped: host's breaker was open)
+# loads:     fetch + parse cycles actually run
+# parses:    loads where the page content changed and was parsed again
+# snapshot_reads / snapshot_writes: traffic to the snapshot store
+# shared_hits:     cold requests served by a fresh table another process published
+# shared_attaches / shared_publishes: traffic to the shared table store
+# history_ingests: parsed tables added to the season history
+stats = Counter()
+
+
+@dataclass
+class Dataset:
+    key: tuple
+    frame: pd.DataFrame
+    fetched_at: float
+    expires_at: float
+    version: int
+    digest: str
+    season: str = None   # season and matchweek of a table served from the snapshot store
+    week: int = None
+
+    @property
+    def stale(self):
+        return self.expires_at <= time.time()
+
+    @property
+    def as_of(self):
+        """When the data is from, for display: the fetch time, or a snapshot's season and matchweek."""
+        if self.week is not None:
+            return f"matchweek {self.week} of {self.season} (stored snapshot)"
+        return datetime.fromtimestamp(self.fetched_at).strftime("%Y-%m-%d %H:%M")
+
+
+_datasets = {}
+_inflight = {}
+_lock = threading.Lock()
+_refresher = ThreadPoolExecutor(max_workers=settings.REFRESH_WORKERS, thread_name_prefix="epl-refresh")
+
+
+def _load_snapshot(key, snapshot_key, schema, ttl, url, season=None):
+    # The latest snapshot, of any season unless one is given
+    league, stat_type = snapshot_key
+    entry = snapshots.latest(league, stat_type, season=season)
+    if entry is None:
+        raise LookupError(f"no snapshot stored for {league} / {stat_type}" + (f" in {season}" if season else ""))
+    stats["snapshot_reads"] += 1
+    with metrics.span("snapshot_read", stat_type):
+        frame = snapshots.read_entry(entry)
+    if schema is not None:
+        # Snapshots written before the schema layer still hold raw fbref columns
+        with metrics.span("schema", schema.name):
+            frame = schemas.apply(frame, schema)
+    now = time.time()
+    expires_at = now + (fetch.ttl_for(url) if ttl is None else ttl)
+    return Dataset(key, frame, entry["written_at"], expires_at, 1, entry["path"], entry["season"], entry["week"])
+
+
+def _shared_tag(schema):
+    # Published tables are only reused under the schema they were written with
+    return hashlib.sha1(repr(schema).encode("utf-8")).hexdigest()[:12]
+
+
+def _attach_shared(key, entry, previous):
+    if previous is not None and previous.digest == entry.digest:
+        frame = previous.frame
+    else:
+        stats["shared_attaches"] += 1
+        with metrics.span("shared_attach", key[1]):
+            frame = shared.attach(entry)
+    return Dataset(key, frame, entry.fetched_at, entry.expires_at, entry.version, entry.digest)
+
+
+def _shared_dataset(key, snapshot_key, schema, previous=None):
+    # The table as last published by any process, or None
+    entry = shared.current(*snapshot_key, _shared_tag(schema))
+    if entry is None:
+        return None
+    try:
+        return _attach_shared(key, entry, previous)
+    except (OSError, pa.ArrowException) as exc:
+        # Pruned or replaced between reading the pointer and opening the file
+        logger.warning("could not attach shared table %s: %s", entry.path, exc)
+        return None
+    except Exception as exc:
+        # A damaged table: fetch the page instead of failing the request
+        logger.warning("could not read shared table %s: %s", entry.path, exc)
+        return None
+
+
+def _publish_shared(key, frame, snapshot_key, schema, fetched_at, expires_at, digest):
+    try:
+        with metrics.span("shared_publish", key[1]):
+            entry = shared.publish(frame, *snapshot_key, fetched_at, expires_at, digest, _shared_tag(schema))
+            # Serve the mapped copy too, so this process shares the numeric columns as well
+            frame = shared.attach(entry)
+    except (OSError, pa.ArrowException) as exc:
+        logger.warning("could not publish %s / %s to the shared store: %s", *snapshot_key, exc)
+        return frame, None
+    stats["shared_publishes"] += 1
+    return frame, entry.version
+
+
+def _ingest_history(frame, snapshot_key):
+    try:
+        with metrics.span("history_ingest", snapshot_key[1]):
+            history.ingest(frame, *snapshot_key)
+    except Exception as exc:
+        # The history is a by-product; the fresh table is served either way
+        logger.warning("could not add %s / %s to the history: %s", *snapshot_key, exc)
+        return
+    stats["history_ingests"] += 1
+
+
+def _load(key, url, table_id, schema, ttl, previous, snapshot_key):
+    if settings.OFFLINE and snapshot_key is not None:
+        return _load_snapshot(key, snapshot_key, schema, ttl, url)
+
+    share = settings.SHARED_TABLES and snapshot_key is not None
+    entry = shared.current(*snapshot_key, _shared_tag(schema)) if share else None
+    if entry is not None and entry.expires_at > time.time():
+        # Another process refreshed it already
+        dataset = _shared_dataset(key, snapshot_key, schema, previous)
+        if dataset is not None:
+            return dataset
+
+    stats["loads"] += 1
+    html = fetch.fetch_html(url, ttl=ttl)
+    now = time.time()
+    expires_at = now + (fetch.ttl_for(url) if ttl is None else ttl)
+    digest = hashlib.sha1(html.encode("utf-8")).hexdigest()
+
+    # Unchanged since it was last published: extend it, and attach it if this process has no copy
+    if entry is not None and entry.digest == digest:
+        shared.touch(entry, now, expires_at)
+        dataset = _shared_dataset(key, snapshot_key, schema, previous)
+        if dataset is not None:
+            return replace(dataset, fetched_at=now, expires_at=expires_at)
+
+    # Unchanged page (e.g. revalidated with a 304): keep the parsed frame as is
+    if previous is not None and previous.digest == digest:
+        return Dataset(key, previous.frame, now, expires_at, previous.version, digest)
+
+    stats["parses"] += 1
+    with metrics.span("parse", table_id):
+        frame = fbref.read_table(html, table_id)
+    if schema is not None:
+        with metrics.span("schema", schema.name):
+            frame = schemas.apply(frame, schema)
+    if settings.SNAPSHOT_ON_FETCH and snapshot_key is not None:
+        with metrics.span("snapshot_write", table_id):
+            snapshots.write(frame, *snapshot_key)
+        stats["snapshot_writes"] += 1
+    if settings.HISTORY and snapshot_key is not None:
+        _ingest_history(frame, snapshot_key)
+    version = previous.version + 1 if previous is not None else 1
+    if share:
+        frame, published = _publish_shared(key, frame, snapshot_key, schema, now, expires_at, digest)
+        version = published or version
+    return Dataset(key, frame, now, expires_at, version, digest)
+
+
+def _complete(future, key, url, table_id, schema, ttl, previous, snapshot_key):
+    # Run the load this caller is leading and publish the result to everyone waiting on it
+    try:
+        with metrics.span("load", key[0]):
+            dataset = _load(key, url, table_id, schema, ttl, previous, snapshot_key)
+    except BaseException as exc:
+        stats["errors"] += 1
+        future.set_exception(exc)
+        raise
+    else:
+        future.set_result(dataset)
+        return dataset
+    finally:
+        with _lock:
+            if future.done() and not future.exception():
+                _datasets[key] = future.result()
+            _inflight.pop(key, None)
+
+
+def _refresh(*load):
+    try:
+        _complete(*load)
+        stats["refreshes"] += 1
+    except fetch.HostUnavailable:
+        # Already reported when the breaker opened; the stale table stays in place
+        stats["refresh_skipped"] += 1
+    except Exception as exc:
+        # The stale table stays in place and the next request tries again
+        logger.warning("background refresh of %s (%s) failed: %s", load[2], load[3], exc)
+
+
+def _stored_snapshot(key, snapshot_key, schema, ttl, url):
+    # The last stored copy of a table this season, marked stale so it is refreshed
+    # right away; an older season's table is not a stand-in for the current one
+    try:
+        dataset = _load_snapshot(key, snapshot_key, schema, ttl, url, season=snapshots.current_season())
+    except LookupError:
+        return None
+    except Exception as exc:
+        # e.g. a catalog entry whose file is gone, or an old snapshot the schema rejects:
+        # load the live table instead
+        logger.warning("could not read the stored snapshot of %s / %s: %s", *snapshot_key, exc)
+        return None
+    return replace(dataset, expires_at=0.0)
+
+
+def get_dataset(url, table_id, schema=None, ttl=None, snapshot_key=None, stale_ok=True):
+    """Return the shared Dataset for the table with id table_id on the page at url.
+
+    schema is an optional core.schemas.Schema applied at ingest. snapshot_key is
+    an optional (league, stat_type) pair naming the table in the snapshot store.
+
+    With stale_ok (the default), an expired table, or failing that its latest
+    snapshot, is returned at once and refreshed in the background; callers
+    only wait on the network when there is nothing stored to show. With
+    stale_ok=False the call waits for fresh data, as the prefetcher does.
+    """
+    key = (fetch.cache_key(url), table_id, schema.name if schema else None)
+    with _lock:
+        stats["requests"] += 1
+        current = _datasets.get(key)
+        if current is not None and not current.stale:
+            stats["hits"] += 1
+            return current
+        future = _inflight.get(key)
+        leader = future is None
+        if leader:
+            future = _inflight[key] = Future()
+
+    if current is None and leader and snapshot_key is not None and not settings.OFFLINE:
+        try:
+            if settings.SHARED_TABLES:
+                current = _shared_dataset(key, snapshot_key, schema)
+                if current is not None and not current.stale:
+                    # Already loaded by another process: attach to it instead of fetching
+                    stats["shared_hits"] += 1
+                    with _lock:
+                        _datasets[key] = current
+                        _inflight.pop(key, None)
+                    future.set_result(current)
+                    return current
+            if current is None and stale_ok:
+                current = _stored_snapshot(key, snapshot_key, schema, ttl, url)
+        except BaseException as exc:
+            # Never leave followers waiting on a load nobody leads
+            stats["errors"] += 1
+            with _lock:
+                _inflight.pop(key, None)
+            future.set_exception(exc)
+            raise
+        if current is not None:
+            with _lock:
+                _datasets.setdefault(key, current)
+
+    load = (future, key, url, table_id, schema, ttl, current, snapshot_key)
+    if stale_ok and current is not None:
+        stats["stale"] += 1
+        if leader:
+            _refresher.submit(_refresh, *load)
+        return current
+
+    if not leader:
+        stats["coalesced"] += 1
+        return future.result()
+    return _complete(*load)
+
+
+def get_source(source, stale_ok=True):
+    """Shared Dataset for a core.sources.Source."""
+    return get_dataset(source.url, source.table_id, schema=source.schema,
+                       snapshot_key=source.snapshot_key, stale_ok=stale_ok)
+
+
+def counters():
+    """Registry and fetch-layer counters in one flat dict, for diagnostics."""
+    merged = {f"datasets_{name}": value for name, value in stats.items()}
+    merged.update({f"fetch_{name}": value for name, value in fetch.stats.items()})
+    return merged
+
+
+def clear():
+    with _lock:
+        _datasets.clear()
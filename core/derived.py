@@ -0,0 +1,226 @@
+"""Derived columns, declared once with their inputs and computed on demand.
+
+Each derived column is registered with @derived(name, *inputs): the columns
+it is computed from (raw table columns or other derived columns) and a
+function of those columns as Series, returning one value per row. derive()
+adds the requested columns to a table, evaluating only what they need, in
+dependency order.
+
+Results are memoized per table. A caller that names its table with a key
+(e.g. a snapshot_key) gets, for a new version of that table, only the columns
+whose inputs changed recomputed: each input column is fingerprinted by its
+values, and a derived column whose inputs all have the same fingerprints as
+before is carried over. Asking again for the same version returns the same
+frame. Tables without a key are memoized by identity, for the last
+MEMO_TABLES of them.
+"""
+import hashlib
+import threading
+from collections import Counter, OrderedDict
+from dataclasses import dataclass, field
+
+import numpy as np
+import pandas as pd
+
+# hits:     a table version asked for the same columns again
+# computed: derived columns evaluated
+# reused:   derived columns carried over to a new table version, inputs unchanged
+stats = Counter()
+
+# Unkeyed tables memoized at once
+MEMO_TABLES = 64
+
+
+@dataclass(frozen=True)
+class Derived:
+    name: str
+    inputs: tuple
+    func: object
+
+
+REGISTRY = {}
+
+
+def derived(name, *inputs):
+    """Register the decorated function as the way to compute column name from inputs."""
+    def register(func):
+        REGISTRY[name] = Derived(name, inputs, func)
+        return func
+    return register
+
+
+@dataclass
+class _Table:
+    frame: pd.DataFrame
+    values: dict = field(default_factory=dict)        # derived name -> Series
+    fingerprints: dict = field(default_factory=dict)  # column name -> digest of its values (and inputs)
+    frames: dict = field(default_factory=dict)        # requested names -> frame returned for them
+
+    def fingerprint(self, name):
+        digest = self.fingerprints.get(name)
+        if digest is None:
+            if name in self.frame.columns:
+                hashed = pd.util.hash_pandas_object(self.frame[name], index=False).to_numpy()
+                digest = hashlib.sha1(hashed.tobytes()).hexdigest()
+            else:
+                parts = [name, *(self.fingerprint(source) for source in REGISTRY[name].inputs)]
+                digest = hashlib.sha1("|".join(parts).encode()).hexdigest()
+            self.fingerprints[name] = digest
+        return digest
+
+
+_tables = OrderedDict()
+_lock = threading.Lock()
+
+
+def _order(names, frame):
+    # Derived columns needed for names, each after its inputs
+    order, seen = [], set()
+
+    def visit(name, path):
+        if name in seen or name in frame.columns:
+            return
+        if name not in REGISTRY:
+            raise KeyError(f"{name} is neither a column of the table nor a derived column")
+        if name in path:
+            raise ValueError(f"derived column {name} depends on itself")
+        for source in REGISTRY[name].inputs:
+            visit(source, path | {name})
+        seen.add(name)
+        order.append(name)
+
+    for name in names:
+        visit(name, frozenset())
+    return order
+
+
+def _evaluate(table, previous, order):
+    frame = table.frame
+    for name in order:
+        if name in table.values:
+            continue
+        if previous is not None and name in previous.values and (
+                previous.fingerprint(name) == table.fingerprint(name)):
+            # Same inputs as in the previous version of the table
+            table.values[name] = previous.values[name].set_axis(frame.index)
+            stats["reused"] += 1
+            continue
+        definition = REGISTRY[name]
+        sources = [frame[source] if source in frame.columns else table.values[source]
+                   for source in definition.inputs]
+        table.values[name] = pd.Series(definition.func(*sources), index=frame.index, name=name)
+        stats["computed"] += 1
+
+
+def derive(frame, names, key=None):
+    """frame with the derived columns in names added; columns it already has are kept as they are.
+
+    key names the table across versions (see the module docstring); the
+    returned frame is shared and must be treated as read-only.
+    """
+    wanted = tuple(name for name in names if name not in frame.columns)
+    if not wanted:
+        return frame
+    memo_key = ("table", key) if key is not None else ("frame", id(frame))
+    with _lock:
+        table = _tables.get(memo_key)
+        if table is not None:
+            _tables.move_to_end(memo_key)
+    if table is not None and table.frame is frame:
+        result = table.frames.get(wanted)
+        if result is not None:
+            stats["hits"] += 1
+            return result
+        previous = None
+    else:
+        previous, table = table, _Table(frame)
+
+    _evaluate(table, previous, _order(wanted, frame))
+    result = frame.assign(**{name: table.values[name] for name in wanted})
+    table.frames[wanted] = result
+    with _lock:
+        _tables[memo_key] = table
+        unkeyed = [name for name in _tables if name[0] == "frame"]
+        for name in unkeyed[:-MEMO_TABLES]:
+            del _tables[name]
+    return result
+
+
+def clear():
+    with _lock:
+        _tables.clear()
+
+
+# --- Passing ---
+
+@derived("passes_Missed", "passes_Att", "passes_Cmp")
+def _passes_missed(attempted, completed):
+    return attempted - completed
+
+
+# --- Players ---
+
+STARTER_SHARE = 0.25   # share of the club's most starts that counts as a regular starter
+NEAR_MEDIAN = 0.8      # "just below the median" means above 80% of it
+
+# In the order np.select tries them
+CATEGORIES = ("well_rounded", "scorer", "creator", "near_scorer", "near_creator")
+
+
+def _per_90(values, nineties):
+    nineties = nineties.to_numpy(dtype=np.float32)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(nineties > 0, values.to_numpy(np.float32) / nineties, np.nan).astype(np.float32)
+
+
+@derived("Gls/90", "Gls", "90s")
+def _goals_per_90(goals, nineties):
+    return _per_90(goals, nineties)
+
+
+@derived("Ast/90", "Ast", "90s")
+def _assists_per_90(assists, nineties):
+    return _per_90(assists, nineties)
+
+
+@derived("max_starts", "Starts", "Squad")
+def _max_starts(starts, squad):
+    return starts.groupby(squad, observed=True).transform("max")
+
+
+@derived("Eligible", "Starts", "max_starts", "Gls", "Ast", "Min")
+def _eligible(starts, max_starts, goals, assists, minutes):
+    # Regular starters with goals and assists and at least 90 minutes
+    return ((starts.to_numpy() >= max_starts.to_numpy() * STARTER_SHARE)
+            & (goals.to_numpy() > 0) & (assists.to_numpy() > 0) & (minutes.to_numpy() >= 90))
+
+
+def _club_median(values, eligible, squad):
+    # Over eligible players only (NaN elsewhere is skipped by the median)
+    return values.where(eligible).groupby(squad, observed=True).transform("median")
+
+
+@derived("median_Gls/90", "Gls/90", "Eligible", "Squad")
+def _median_goals_per_90(goals_per_90, eligible, squad):
+    return _club_median(goals_per_90, eligible, squad)
+
+
+@derived("median_Ast/90", "Ast/90", "Eligible", "Squad")
+def _median_assists_per_90(assists_per_90, eligible, squad):
+    return _club_median(assists_per_90, eligible, squad)
+
+
+@derived("Category", "Eligible", "Gls/90", "Ast/90", "median_Gls/90", "median_Ast/90")
+def _category(eligible, gls90, ast90, median_g, median_a):
+    eligible, gls90, ast90 = eligible.to_numpy(), gls90.to_numpy(), ast90.to_numpy()
+    median_g, median_a = median_g.to_numpy(), median_a.to_numpy()
+    conditions = [
+        eligible & (gls90 > median_g) & (ast90 > median_a),
+        eligible & (gls90 > median_g) & (ast90 <= median_a * NEAR_MEDIAN),
+        eligible & (ast90 > median_a) & (gls90 <= median_g * NEAR_MEDIAN),
+        eligible & (gls90 > median_g * NEAR_MEDIAN) & (ast90 <= median_a),
+        eligible & (ast90 > median_a * NEAR_MEDIAN) & (gls90 <= median_g),
+    ]
+    # The first matching category wins
+    category = np.select(conditions, np.arange(len(CATEGORIES)), default=-1)
+    return pd.Categorical.from_codes(category, categories=CATEGORIES)
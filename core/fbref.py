@@ -0,0 +1,106 @@
+"""Targeted extractor for fbref stats tables.
+
+pd.read_html builds a DataFrame for every table on the page. fbref league pages
+carry a dozen tables (most of them hidden inside HTML comments) and we only ever
+want one, so this module slices out the single <table> we need by its id and
+streams its rows through lxml.
+
+Table ids look like:
+    stats_squads_passing_for   (league page, squad passing)
+    stats_squads_shooting_for  (league page, squad shooting)
+    stats_standard             (league page, players)
+    stats_standard_9           (club page, players; suffix is the competition id)
+"""
+import re
+from io import BytesIO
+
+from lxml import etree
+from pandas.io.parsers import TextParser
+
+# Summary rows at the bottom of club tables
+TOTAL_ROWS = ("Squad Total", "Opponent Total")
+
+# Rows fbref repeats inside long tables purely for display
+_SKIP_ROW_CLASSES = ("thead", "over_header", "spacer")
+
+
+def find_table(html, table_id):
+    """Return the raw markup of the table with the given id, or None.
+
+    Matches the exact id first, then ids that extend it with a suffix
+    (stats_standard -> stats_standard_9). Tables commented out by fbref are
+    found as well, since we search the raw text rather than a parsed tree.
+    """
+    match = re.search(r'<table\b[^>]*\bid="%s"' % re.escape(table_id), html)
+    if match is None:
+        match = re.search(r'<table\b[^>]*\bid="%s_[^"]*"' % re.escape(table_id), html)
+    if match is None:
+        return None
+    end = html.find("</table>", match.end())
+    if end == -1:
+        return None
+    return html[match.start():end + len("</table>")]
+
+
+def _cell_text(cell):
+    return "".join(cell.itertext()).strip()
+
+
+def _dedupe(names):
+    # Same naming as pd.read_html: Cmp, Cmp.1, Cmp.2 ...
+    seen = {}
+    result = []
+    for name in names:
+        count = seen.get(name, 0)
+        seen[name] = count + 1
+        result.append(name if count == 0 else f"{name}.{count}")
+    return result
+
+
+def parse_table(table_html, drop_totals=True):
+    """Parse the markup of one fbref stats table into a DataFrame.
+
+    The last header row gives the column names (the row above it holds the
+    group labels such as Short/Medium/Long). Repeated header rows inside the
+    body are skipped, and the Squad Total / Opponent Total footer rows are
+    dropped unless drop_totals is False.
+    """
+    header = None
+    rows = []
+    source = BytesIO(table_html.encode("utf-8"))
+    for _, row in etree.iterparse(source, events=("end",), tag="tr", html=True):
+        section = row.getparent().tag
+        cells = [_cell_text(cell) for cell in row if cell.tag in ("th", "td")]
+        css = row.get("class", "")
+
+        if section == "thead":
+            if "over_header" not in css:
+                header = cells
+        elif any(skip in css.split() for skip in _SKIP_ROW_CLASSES):
+            pass
+        elif drop_totals and (section == "tfoot" or (cells and cells[0] in TOTAL_ROWS)):
+            pass
+        else:
+            rows.append(cells)
+
+        # Free each row once read so memory stays flat on long tables
+        row.clear()
+        while row.getprevious() is not None:
+            del row.getparent()[0]
+
+    if header is None:
+        raise ValueError("Table has no header row")
+
+    columns = _dedupe(header)
+    width = len(columns)
+    rows = [(row + [""] * width)[:width] for row in rows]
+    # Same type inference as pd.read_html: "1,234" -> 1234, "" -> NaN
+    return TextParser(rows, names=columns, thousands=",").read()
+
+
+def read_table(html, table_id, drop_totals=True):
+    """Extract and parse the table with the given id from a full fbref page."""
+    table_html = find_table(html, table_id)
+    if table_html is None:
+        raise ValueError(f"No table with id '{table_id}' found")
+    return parse_table(table_html, drop_totals=drop_totals)
@@ -0,0 +1,309 @@
+"""Shared fetch layer for fbref pages.
+
+Every page goes through two cache tiers before touching the network:
+
+1. an in-memory LRU, bounded by total bytes, shared by all sessions in the process
+2. an on-disk cache under settings.CACHE_DIR, bounded by total bytes
+
+Entries live for a per-source TTL (settings.SOURCE_TTLS). Once an entry expires
+it is revalidated with If-None-Match / If-Modified-Since, so an unchanged page
+costs a 304 instead of a full download.
+
+Network requests to one host are spaced at least settings.HOST_MIN_INTERVAL
+apart across all threads, so the prefetcher and user sessions together stay
+within fbref's rate limit. A per-host circuit breaker stops requests to a host
+that keeps failing (or answered 429) until its cooldown has passed; during that
+time fetch_html raises HostUnavailable without touching the network.
+"""
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from collections import Counter, OrderedDict
+from dataclasses import dataclass
+from urllib.parse import urldefrag, urlsplit
+
+import requests
+
+from core import metrics, settings
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class CachedPage:
+    url: str
+    body: str
+    fetched_at: float
+    expires_at: float
+    etag: str = None
+    last_modified: str = None
+
+    @property
+    def size(self):
+        return len(self.body)
+
+
+class HostUnavailable(Exception):
+    """The host's circuit breaker is open, so no request was sent."""
+
+
+# Counters for cache behaviour: memory_hits, disk_hits, revalidated, downloads,
+# evictions, throttled, failures, breaker_opened, breaker_rejected
+stats = Counter()
+
+_memory = OrderedDict()
+_memory_bytes = 0
+_lock = threading.Lock()
+_session = requests.Session()
+_session.headers["User-Agent"] = settings.USER_AGENT
+
+# Earliest time.monotonic() at which each host may be requested again
+_host_next = {}
+# host -> (consecutive failures, time.monotonic() until which the breaker is open)
+_breakers = {}
+_host_lock = threading.Lock()
+
+
+def cache_key(url):
+    # The fragment (#all_stats_passing) is never sent to the server
+    return urldefrag(url)[0]
+
+
+def ttl_for(url):
+    path = urlsplit(url).path
+    for prefix, ttl in settings.SOURCE_TTLS.items():
+        if path.startswith(prefix):
+            return ttl
+    return settings.DEFAULT_TTL
+
+
+def resolve_url(url):
+    """Rewrite an fbref URL to the configured base URL (used for local stand-in servers)."""
+    url = cache_key(url)
+    if not settings.FBREF_BASE_URL:
+        return url
+    parts = urlsplit(url)
+    target = parts.path + (f"?{parts.query}" if parts.query else "")
+    return settings.FBREF_BASE_URL.rstrip("/") + target
+
+
+# --- Rate limit ---
+
+def _throttle(url):
+    """Wait for this request's turn on its host; turns are handed out HOST_MIN_INTERVAL apart."""
+    host = urlsplit(url).netloc
+    with _host_lock:
+        now = time.monotonic()
+        turn = max(now, _host_next.get(host, now))
+        _host_next[host] = turn + settings.HOST_MIN_INTERVAL
+    if turn > now:
+        stats["throttled"] += 1
+        time.sleep(turn - now)
+
+
+# --- Circuit breaker ---
+
+def _check_breaker(host):
+    with _host_lock:
+        failures, open_until = _breakers.get(host, (0, 0.0))
+        if failures < settings.BREAKER_FAILURES and not open_until:
+            return
+        now = time.monotonic()
+        if now < open_until:
+            stats["breaker_rejected"] += 1
+            raise HostUnavailable(f"{host} is failing; not retrying it for another {open_until - now:.0f}s")
+        # Cooldown over: let this request through as a trial and hold the others back
+        _breakers[host] = (failures, now + settings.REQUEST_TIMEOUT)
+
+
+def _record_result(host, failed, retry_after=0.0):
+    with _host_lock:
+        if not failed:
+            _breakers.pop(host, None)
+            return
+        stats["failures"] += 1
+        failures = _breakers.get(host, (0, 0.0))[0] + 1
+        open_until = 0.0
+        if failures >= settings.BREAKER_FAILURES or retry_after:
+            stats["breaker_opened"] += 1
+            open_until = time.monotonic() + max(settings.BREAKER_COOLDOWN, retry_after)
+            logger.warning("%s failed %d times in a row; holding off for %.0fs", host, failures, open_until - time.monotonic())
+        _breakers[host] = (failures, open_until)
+
+
+def _retry_after(response):
+    try:
+        return float(response.headers.get("Retry-After", 0))
+    except ValueError:
+        return 0.0
+
+
+def breaker_states():
+    """{host: seconds until its breaker closes again} for hosts that are being held off."""
+    now = time.monotonic()
+    with _host_lock:
+        return {host: round(open_until - now, 1) for host, (_, open_until) in _breakers.items() if open_until > now}
+
+
+# --- Memory tier ---
+
+def _memory_get(key):
+    with _lock:
+        page = _memory.get(key)
+        if page is not None:
+            _memory.move_to_end(key)
+        return page
+
+
+def _memory_put(key, page):
+    global _memory_bytes
+    with _lock:
+        old = _memory.pop(key, None)
+        if old is not None:
+            _memory_bytes -= old.size
+        _memory[key] = page
+        _memory_bytes += page.size
+        while _memory_bytes > settings.MEMORY_CACHE_BYTES and len(_memory) > 1:
+            _, evicted = _memory.popitem(last=False)
+            _memory_bytes -= evicted.size
+            stats["evictions"] += 1
+
+
+# --- Disk tier ---
+
+def _disk_paths(key):
+    digest = hashlib.sha1(key.encode("utf-8")).hexdigest()
+    return settings.CACHE_DIR / f"{digest}.html", settings.CACHE_DIR / f"{digest}.json"
+
+
+def _disk_get(key):
+    body_path, meta_path = _disk_paths(key)
+    try:
+        meta = json.loads(meta_path.read_text())
+        body = body_path.read_text(encoding="utf-8")
+    except (OSError, ValueError):
+        return None
+    # Touch the file so eviction is least-recently-used rather than oldest-written
+    os.utime(body_path)
+    return CachedPage(body=body, **meta)
+
+
+def _disk_put(key, page):
+    body_path, meta_path = _disk_paths(key)
+    settings.CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    meta = {
+        "url": page.url,
+        "fetched_at": page.fetched_at,
+        "expires_at": page.expires_at,
+        "etag": page.etag,
+        "last_modified": page.last_modified,
+    }
+    # Write to temp files and rename so concurrent readers never see half a page
+    suffix = f"{os.getpid()}.{threading.get_ident()}.tmp"
+    tmp_body = body_path.with_suffix(f".html.{suffix}")
+    tmp_meta = meta_path.with_suffix(f".json.{suffix}")
+    tmp_body.write_text(page.body, encoding="utf-8")
+    tmp_meta.write_text(json.dumps(meta))
+    os.replace(tmp_body, body_path)
+    os.replace(tmp_meta, meta_path)
+    _disk_evict()
+
+
+def _disk_evict():
+    files = []
+    for path in settings.CACHE_DIR.glob("*.html"):
+        try:
+            st = path.stat()
+        except OSError:
+            continue
+        files.append((st.st_mtime, st.st_size, path))
+    total = sum(size for _, size, _ in files)
+    for _, size, path in sorted(files):
+        if total <= settings.DISK_CACHE_BYTES:
+            break
+        for stale in (path, path.with_suffix(".json")):
+            try:
+                stale.unlink()
+            except OSError:
+                pass
+        total -= size
+        stats["evictions"] += 1
+
+
+# --- Public API ---
+
+def fetch_html(url, ttl=None):
+    """Return the HTML for url, from cache when fresh, otherwise from the network."""
+    key = cache_key(url)
+    ttl = ttl_for(url) if ttl is None else ttl
+    now = time.time()
+
+    page = _memory_get(key)
+    if page is not None and page.expires_at > now:
+        stats["memory_hits"] += 1
+        return page.body
+
+    if page is None:
+        page = _disk_get(key)
+        if page is not None and page.expires_at > now:
+            stats["disk_hits"] += 1
+            _memory_put(key, page)
+            return page.body
+
+    headers = {}
+    if page is not None:
+        if page.etag:
+            headers["If-None-Match"] = page.etag
+        if page.last_modified:
+            headers["If-Modified-Since"] = page.last_modified
+
+    target = resolve_url(url)
+    host = urlsplit(target).netloc
+    _check_breaker(host)
+    _throttle(target)
+    try:
+        with metrics.span("fetch", key):
+            response = _session.get(target, headers=headers, timeout=settings.REQUEST_TIMEOUT)
+    except requests.RequestException:
+        _record_result(host, failed=True)
+        raise
+    if response.status_code == 429:
+        _record_result(host, failed=True, retry_after=_retry_after(response))
+    else:
+        _record_result(host, failed=response.status_code >= 500)
+
+    if response.status_code == 304 and page is not None:
+        stats["revalidated"] += 1
+        page.fetched_at = now
+        page.expires_at = now + ttl
+    else:
+        response.raise_for_status()
+        stats["downloads"] += 1
+        page = CachedPage(
+            url=key,
+            body=response.text,
+            fetched_at=now,
+            expires_at=now + ttl,
+            etag=response.headers.get("ETag"),
+            last_modified=response.headers.get("Last-Modified"),
+        )
+
+    _memory_put(key, page)
+    _disk_put(key, page)
+    return page.body
+
+
+def clear(disk=False):
+    """Empty the memory tier (and optionally the disk tier) and reset the circuit breakers."""
+    global _memory_bytes
+    with _lock:
+        _memory.clear()
+        _memory_bytes = 0
+    with _host_lock:
+        _breakers.clear()
+    if disk and settings.CACHE_DIR.exists():
+        for path in settings.CACHE_DIR.iterdir():
+            path.unlink()
@@ -0,0 +1,88 @@
+"""Figure lifecycle manager for every chart in the app.
+
+Charts create figures through new_figure() / subplots() here rather than
+through pyplot. The figures are plain matplotlib Figure objects on an Agg
+canvas, so they are never registered with pyplot's global figure manager and
+nothing keeps them alive once they are released.
+
+Every figure is released deterministically: figures created inside a
+rendering() block are cleared and released when the block exits, even if
+drawing fails. The number of live figures is capped at settings.MAX_LIVE_FIGURES;
+past the cap, new_figure() waits for a slot and raises if none frees up.
+"""
+import threading
+from collections import Counter
+from contextlib import contextmanager
+
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+
+from core import settings
+
+# created, released, waits, peak_live
+stats = Counter()
+
+_live = 0
+_slots = threading.Condition()
+_scope = threading.local()
+
+
+def live_figures():
+    return _live
+
+
+def _acquire():
+    global _live
+    with _slots:
+        if _live >= settings.MAX_LIVE_FIGURES:
+            stats["waits"] += 1
+            if not _slots.wait_for(lambda: _live < settings.MAX_LIVE_FIGURES, timeout=settings.FIGURE_WAIT):
+                raise RuntimeError(f"More than {settings.MAX_LIVE_FIGURES} figures alive; a chart is not releasing its figures")
+        _live += 1
+        stats["created"] += 1
+        stats["peak_live"] = max(stats["peak_live"], _live)
+
+
+def new_figure(**kwargs):
+    """A new Figure (same keyword arguments as plt.figure) counted against the live-figure ceiling."""
+    _acquire()
+    fig = Figure(**kwargs)
+    FigureCanvasAgg(fig)
+    fig._epl_released = False
+    created = getattr(_scope, "figures", None)
+    if created is not None:
+        created.append(fig)
+    return fig
+
+
+def subplots(nrows=1, ncols=1, subplot_kw=None, gridspec_kw=None, **fig_kw):
+    """Drop-in for plt.subplots() built on new_figure()."""
+    fig = new_figure(**fig_kw)
+    axes = fig.subplots(nrows, ncols, subplot_kw=subplot_kw, gridspec_kw=gridspec_kw)
+    return fig, axes
+
+
+def release(fig):
+    """Clear a figure and give its slot back; releasing twice is a no-op."""
+    global _live
+    if getattr(fig, "_epl_released", True):
+        return
+    fig._epl_released = True
+    fig.clear()
+    with _slots:
+        _live -= 1
+        stats["released"] += 1
+        _slots.notify()
+
+
+@contextmanager
+def rendering():
+    """Release every figure created in this block (on this thread) when it exits."""
+    outer = getattr(_scope, "figures", None)
+    _scope.figures = []
+    try:
+        yield
+    finally:
+        created, _scope.figures = _scope.figures, outer
+        for fig in created:
+            release(fig)
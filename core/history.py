@@ -0,0 +1,281 @@
+"""Season history of league tables, one matchweek at a time.
+
+fbref tables are season-to-date totals. Each refresh of a table is added to
+the history as the matchweek it was taken at (see snapshots.infer_week), one
+compact Parquet file per week:
+
+    <settings.HISTORY_DIR>/<league>/<stat_type>/<season>/week-09.parquet
+
+holding, for every squad (or player) and every TRACKED column:
+
+    <column>          the season-to-date value
+    <column>_delta    the change since the previous stored week
+    <column>_window   the sum of the changes over the last ROLLING_WEEKS weeks
+
+The deltas and rolling sums are computed at ingest from the previous week's
+file and the one leaving the window, never from the whole history. A week
+without a refresh simply has its matches counted in the next stored week.
+Refreshing the latest week again replaces it; weeks older than the latest are
+not rewritten.
+
+trends() turns a season into dense (squad x week) arrays for the trend charts,
+once per change of the stored weeks.
+
+Usage:
+    python -m core.history list
+    python -m core.history backfill     # ingest every stored snapshot, oldest first
+"""
+import argparse
+import os
+import re
+import threading
+from dataclasses import dataclass, field
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pyarrow.parquet as pq
+
+from core import settings, snapshots
+
+# Season-to-date columns kept per stat type (as named after the schema is applied)
+TRACKED = {
+    "passing": ("passes_Cmp", "passes_Att", "PrgP", "PrgDist", "KP", "1/3", "PPA", "xA"),
+    "shooting": ("Gls", "Sh", "SoT", "xG", "npxG"),
+    "players": ("Min", "Gls", "Ast", "xG", "xAG", "PrgC", "PrgP", "PrgR"),
+}
+
+# Matches played (in 90s), per stat type: the denominator of the rolling rates
+MATCHES = {"passing": "no_matches", "shooting": "no_matches", "players": "90s"}
+
+# Columns naming a row; a player who changes clubs starts a new series
+KEYS = {"passing": ("Squad",), "shooting": ("Squad",), "players": ("Player", "Squad")}
+
+ROLLING_WEEKS = 5
+
+_WEEK_FILE = re.compile(r"week-(\d+)\.parquet$")
+
+
+def _slug(value):
+    return re.sub(r"[^a-z0-9]+", "-", str(value).lower()).strip("-")
+
+
+def _season_dir(league, stat_type, season, root=None):
+    return Path(root or settings.HISTORY_DIR) / _slug(league) / _slug(stat_type) / season
+
+
+def _week_path(directory, week):
+    return directory / f"week-{int(week):02d}.parquet"
+
+
+def stored_weeks(league, stat_type, season=None, root=None):
+    """The weeks stored for a season, in order."""
+    return _weeks(_season_dir(league, stat_type, season or snapshots.current_season(), root))
+
+
+def _weeks(directory):
+    if not directory.is_dir():
+        return []
+    return sorted(int(match.group(1)) for match in map(_WEEK_FILE.search, os.listdir(directory)) if match)
+
+
+def _keys(frame, stat_type):
+    parts = [frame[name].astype(str) for name in KEYS[stat_type]]
+    if len(parts) == 1:
+        return parts[0].to_numpy()
+    return (parts[0] + " (" + parts[1] + ")").to_numpy()
+
+
+def _aligned(week, column, keys):
+    # A stored week's column in the order of keys; rows it does not have count as 0
+    if week is None or column not in week.columns:
+        return np.zeros(len(keys), dtype=np.float32)
+    return week[column].reindex(keys).fillna(0).to_numpy(dtype=np.float32)
+
+
+def _read_week(directory, week):
+    return pq.read_table(_week_path(directory, week)).to_pandas().set_index("key")
+
+
+def ingest(frame, league, stat_type, season=None, week=None, root=None):
+    """Add one refresh of a season-to-date table to the history; returns the week stored.
+
+    Returns None for stat types without TRACKED columns and for weeks older
+    than the latest one stored.
+    """
+    if stat_type not in TRACKED:
+        return None
+    season = season or snapshots.current_season()
+    week = snapshots.infer_week(frame) if week is None else int(week)
+    directory = _season_dir(league, stat_type, season, root)
+    stored = _weeks(directory)
+    if stored and week < stored[-1]:
+        return None
+
+    keys = _keys(frame, stat_type)
+    unique = ~pd.Index(keys).duplicated()
+    frame, keys = frame[unique], keys[unique]
+
+    earlier = [stored_week for stored_week in stored if stored_week < week]
+    previous_week = earlier[-1] if earlier else None
+    previous = _read_week(directory, previous_week) if previous_week is not None else None
+    # Weeks that were inside the previous week's window but fall out of this one
+    start = (previous_week if previous_week is not None else week) - ROLLING_WEEKS
+    leaving = [_read_week(directory, stored_week) for stored_week in earlier
+               if start < stored_week <= week - ROLLING_WEEKS]
+
+    columns = {"key": keys, "week": np.full(len(keys), week, dtype=np.int16)}
+    for name in (MATCHES[stat_type], *TRACKED[stat_type]):
+        if name not in frame.columns:
+            continue
+        cumulative = frame[name].to_numpy(dtype=np.float32)
+        delta = cumulative - _aligned(previous, name, keys)
+        window = _aligned(previous, f"{name}_window", keys) + delta
+        for old in leaving:
+            window -= _aligned(old, f"{name}_delta", keys)
+        columns[name] = cumulative
+        columns[f"{name}_delta"] = delta
+        columns[f"{name}_window"] = window
+
+    directory.mkdir(parents=True, exist_ok=True)
+    path = _week_path(directory, week)
+    tmp = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+    pd.DataFrame(columns).to_parquet(tmp, index=False, compression="zstd")
+    os.replace(tmp, path)
+    return week
+
+
+# Kinds of trend, by their label in the charts
+KINDS = {
+    "cumulative": "Season to date",
+    "delta": "Week over week",
+    "rolling": f"Per 90, last {ROLLING_WEEKS} weeks",
+}
+
+
+@dataclass
+class Trends:
+    league: str
+    stat_type: str
+    season: str
+    weeks: np.ndarray                 # stored weeks, in order
+    keys: list                        # row labels, sorted
+    values: dict = field(repr=False)  # (kind, column) -> array of shape (len(keys), len(weeks)), NaN where missing
+    signature: tuple = field(repr=False, default=())
+
+    @property
+    def columns(self):
+        return [name for name in TRACKED[self.stat_type] if ("cumulative", name) in self.values]
+
+    def series(self, column, kind="cumulative"):
+        return self.values[(kind, column)]
+
+    def latest(self, column, kind="cumulative"):
+        """Each row's most recent value (NaN if it has none)."""
+        values = pd.DataFrame(self.series(column, kind)).ffill(axis=1)
+        return values.iloc[:, -1].to_numpy()
+
+    def frame(self, column, kind="cumulative", keys=None):
+        """Long (Week, key, value) table of some rows, for a chart."""
+        positions = np.arange(len(self.keys)) if keys is None else np.searchsorted(self.keys, keys)
+        block = self.series(column, kind)[positions]
+        label = KEYS[self.stat_type][0]
+        return pd.DataFrame({
+            "Week": np.tile(self.weeks, len(positions)),
+            label: np.repeat(np.asarray(self.keys, dtype=object)[positions], len(self.weeks)),
+            column: block.ravel(),
+        }).dropna(subset=[column])
+
+
+_trends = {}
+_lock = threading.Lock()
+
+
+def _signature(directory):
+    return tuple((week, _week_path(directory, week).stat().st_mtime_ns) for week in _weeks(directory))
+
+
+def _build(league, stat_type, season, directory, signature):
+    table = pd.concat([_read_week(directory, week).reset_index() for week, _ in signature], ignore_index=True)
+    weeks = np.array([week for week, _ in signature])
+    codes, keys = pd.factorize(table["key"], sort=True)
+    columns = np.searchsorted(weeks, table["week"].to_numpy())
+
+    def dense(values):
+        array = np.full((len(keys), len(weeks)), np.nan, dtype=np.float32)
+        array[codes, columns] = values
+        return array
+
+    matches = MATCHES[stat_type]
+    values = {}
+    for name in TRACKED[stat_type]:
+        if name not in table.columns:
+            continue
+        values[("cumulative", name)] = dense(table[name].to_numpy())
+        values[("delta", name)] = dense(table[f"{name}_delta"].to_numpy())
+        if matches in table.columns:
+            played = table[f"{matches}_window"].to_numpy()
+            with np.errstate(divide="ignore", invalid="ignore"):
+                rate = np.where(played > 0, table[f"{name}_window"].to_numpy() / played, np.nan)
+            values[("rolling", name)] = dense(rate)
+    return Trends(league, stat_type, season, weeks, list(keys), values, signature)
+
+
+def trends(league, stat_type, season=None, root=None):
+    """Dense trend arrays for one season, or None if nothing is stored; rebuilt only when a week changes."""
+    season = season or snapshots.current_season()
+    directory = _season_dir(league, stat_type, season, root)
+    signature = _signature(directory)
+    if not signature:
+        return None
+    key = (str(directory), league, stat_type)
+    with _lock:
+        built = _trends.get(key)
+    if built is None or built.signature != signature:
+        built = _build(league, stat_type, season, directory, signature)
+        with _lock:
+            _trends[key] = built
+    return built
+
+
+def clear():
+    with _lock:
+        _trends.clear()
+
+
+def backfill(root=None, snapshot_root=None):
+    """Ingest every stored snapshot, oldest week first; returns the number of weeks stored."""
+    from core import schemas
+
+    schema_for = {"passing": schemas.PASSING, "shooting": schemas.SHOOTING, "players": schemas.PLAYER}
+    stored = 0
+    catalog = snapshots.catalog(snapshot_root)
+    for entry in catalog[catalog["stat_type"].isin(list(TRACKED))].to_dict("records"):
+        frame = snapshots.read_entry(entry, root=snapshot_root)
+        frame = schemas.apply(frame, schema_for[entry["stat_type"]])
+        if ingest(frame, entry["league"], entry["stat_type"], entry["season"], entry["week"], root) is not None:
+            stored += 1
+    return stored
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--root", default=None, help="history directory (default: settings.HISTORY_DIR)")
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("list", help="show the stored weeks")
+    commands.add_parser("backfill", help="ingest every snapshot in the snapshot store")
+    args = parser.parse_args()
+
+    root = Path(args.root or settings.HISTORY_DIR)
+    if args.command == "backfill":
+        print(f"Stored {backfill(root)} weeks in {root}")
+        return
+    for season_dir in sorted(root.glob("*/*/*")):
+        weeks = _weeks(season_dir)
+        if weeks:
+            league, stat_type, season = season_dir.relative_to(root).parts
+            print(f"{league:<24} {stat_type:<10} {season}  weeks {', '.join(map(str, weeks))}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""Plotly specs for charts drawn in the browser instead of rendered on the server.
+
+The builders return plain Plotly figure dicts (traces and layout) rather than
+plotly.graph_objects figures: nothing is rasterized on the server, and the
+JSON sent for a 20-bar chart is a few kilobytes instead of a PNG of a few
+hundred. Values go in as plain lists, with floats rounded to what the charts
+show. Hover labels replace the value annotations the matplotlib versions draw
+on every bar.
+"""
+import numpy as np
+import pandas as pd
+
+# Decimals kept for float columns in a spec
+DECIMALS = 3
+
+
+def values(series):
+    """A column as a JSON-friendly list (categoricals as strings, floats rounded, NaN as None)."""
+    if isinstance(series.dtype, pd.CategoricalDtype) or series.dtype == object:
+        return series.astype(str).tolist()
+    if pd.api.types.is_float_dtype(series.dtype):
+        rounded = np.round(series.to_numpy(dtype=np.float64), DECIMALS)
+        return [None if np.isnan(value) else value for value in rounded.tolist()]
+    return series.tolist()
+
+
+def _layout(title, xlabel, ylabel, **extra):
+    layout = {
+        "title": {"text": title},
+        "xaxis": {"title": {"text": xlabel or ""}},
+        "yaxis": {"title": {"text": ylabel or ""}},
+        "margin": {"t": 60, "l": 60, "r": 20, "b": 60},
+        "legend": {"orientation": "h", "y": 1.02, "yanchor": "bottom", "x": 1, "xanchor": "right"},
+        # An empty template keeps plotly's default one (~6 KB) out of every spec;
+        # Streamlit styles the chart with its own theme in the browser
+        "template": {},
+    }
+    layout.update(extra)
+    return layout
+
+
+def bar(frame, x, y, title, xlabel=None, ylabel=None, colors=None, names=None, horizontal=False, colorscale=None):
+    """Grouped bars of the y columns by x, in the frame's row order.
+
+    horizontal puts x on the vertical axis, top to bottom. colorscale shades
+    a single series by value instead of using colors.
+    """
+    categories = values(frame[x])
+    traces = []
+    for i, column in enumerate(y):
+        amounts = values(frame[column])
+        trace = {"type": "bar", "name": names[i] if names else column}
+        if horizontal:
+            trace.update(orientation="h", x=amounts, y=categories, hovertemplate="%{y}: %{x}<extra></extra>")
+        else:
+            trace.update(x=categories, y=amounts, hovertemplate="%{x}<br>%{fullData.name}: %{y}<extra></extra>")
+        if colorscale:
+            trace["marker"] = {"color": amounts, "colorscale": colorscale}
+        elif colors:
+            trace["marker"] = {"color": colors[i]}
+        traces.append(trace)
+
+    layout = _layout(title, xlabel, ylabel, barmode="group", showlegend=len(y) > 1)
+    if horizontal:
+        layout["yaxis"]["autorange"] = "reversed"
+        layout["height"] = max(400, 22 * len(categories) + 120)
+    else:
+        layout["xaxis"]["tickangle"] = -45
+    return {"data": traces, "layout": layout}
+
+
+def scatter(frame, x, y, hover, title, xlabel=None, ylabel=None, color=None, diagonal=False, medians=False):
+    """Points of y against x, labelled with the hover column on hover.
+
+    diagonal adds the y = x reference line; medians adds dashed lines at the
+    median of each axis.
+    """
+    xs, ys = values(frame[x]), values(frame[y])
+    traces = [{
+        "type": "scatter", "mode": "markers", "name": "",
+        "x": xs, "y": ys, "text": values(frame[hover]),
+        "marker": {"size": 10, "opacity": 0.7, **({"color": color} if color else {})},
+        "hovertemplate": f"%{{text}}<br>{xlabel or x}: %{{x}}<br>{ylabel or y}: %{{y}}<extra></extra>",
+    }]
+    shapes = []
+    if diagonal:
+        finite = [value for value in xs + ys if value is not None]
+        if finite:
+            low, high = min(finite), max(finite)
+            traces.append({"type": "scatter", "mode": "lines", "x": [low, high], "y": [low, high],
+                           "line": {"color": "red", "dash": "dash"}, "hoverinfo": "skip", "name": f"{y} = {x}"})
+    if medians:
+        line = {"color": "gray", "dash": "dash", "width": 1}
+        shapes += [
+            {"type": "line", "xref": "paper", "x0": 0, "x1": 1, "y0": float(frame[y].median()),
+             "y1": float(frame[y].median()), "line": line},
+            {"type": "line", "yref": "paper", "y0": 0, "y1": 1, "x0": float(frame[x].median()),
+             "x1": float(frame[x].median()), "line": line},
+        ]
+    return {"data": traces, "layout": _layout(title, xlabel, ylabel, shapes=shapes, showlegend=False)}
+
+
+def line(frame, x, y, group, title, xlabel=None, ylabel=None):
+    """One line of y against x per value of the group column, in the frame's row order."""
+    traces = []
+    for name, rows in frame.groupby(group, sort=False, observed=True):
+        traces.append({
+            "type": "scatter", "mode": "lines+markers", "name": str(name),
+            "x": values(rows[x]), "y": values(rows[y]),
+            "hovertemplate": f"{name}<br>{xlabel or x}: %{{x}}<br>{ylabel or y}: %{{y}}<extra></extra>",
+        })
+    return {"data": traces, "layout": _layout(title, xlabel, ylabel, showlegend=True)}
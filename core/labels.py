@@ -0,0 +1,213 @@
+"""Fast, deterministic placement of point labels on scatter charts.
+
+Labels are placed greedily in priority order. Each label tries a fixed list of
+candidate positions around its point (eight directions at four distances)
+and takes the first one whose box stays inside the axes and overlaps neither a
+marker nor a label placed before it. A label that fits nowhere takes the
+candidate that overlaps least instead, so every point is labelled; labels are
+only left out when the caller asks for the top k (max_labels).
+
+Collision tests run on occupancy grids in pixel space. Markers are rasterized
+once, and a summed-area table answers the marker test for every label and
+candidate in one vectorized step; only the label-against-label test is
+sequential, one grid slice per candidate tried.
+
+Nothing depends on randomness or the clock, so the same data, figure size and
+font always give the same layout and cached chart images stay valid. The time
+budget is therefore a work budget: max_checks caps the number of grid tests,
+and lower-priority labels past it skip the label-against-label test and take
+their best spot clear of markers.
+"""
+import numpy as np
+from matplotlib.collections import LineCollection
+from matplotlib.font_manager import FontProperties
+
+# Directions tried around each point, in order of preference
+_DIRECTIONS = np.array([(1, 1), (-1, 1), (1, -1), (-1, -1), (1, 0), (-1, 0), (0, 1), (0, -1)], float)
+# Extra distance of each ring from the marker, in label heights
+_RINGS = (0.0, 1.5, 3.0, 5.0)
+
+DEFAULT_MAX_CHECKS = 250_000
+
+
+def top_k(scores, k=None):
+    """Indices ordered by descending score, optionally only the first k (ties keep point order)."""
+    order = np.argsort(-np.asarray(scores, dtype=float), kind="stable")
+    return order if k is None else order[:k]
+
+
+def diagonal_distance(x, y):
+    """Distance of each point from the y = x line, e.g. goals against xG."""
+    return np.abs(np.asarray(y, dtype=float) - np.asarray(x, dtype=float)) / np.sqrt(2)
+
+
+def median_distance(x, y):
+    """Distance of each point from where the median lines cross, each axis scaled by its IQR."""
+    def scaled(values):
+        values = np.asarray(values, dtype=float)
+        q1, median, q3 = np.percentile(values, [25, 50, 75])
+        spread = (q3 - q1) or values.std() or 1.0
+        return (values - median) / spread
+
+    return np.hypot(scaled(x), scaled(y))
+
+
+def _candidates(points, sizes, marker_radius, pad):
+    """Label boxes (x0, y0, x1, y1) for every point and candidate: shape (n, candidates, 4)."""
+    directions = np.tile(_DIRECTIONS, (len(_RINGS), 1))
+    rings = np.repeat(_RINGS, len(_DIRECTIONS))
+    width, height = sizes[:, 0, None], sizes[:, 1, None]
+
+    distance = marker_radius + pad + rings[None, :] * height
+    anchor_x = points[:, 0, None] + directions[None, :, 0] * distance
+    anchor_y = points[:, 1, None] + directions[None, :, 1] * distance
+    # A box extends away from its point: right of the anchor when the direction is +x, centred when 0
+    x0 = anchor_x - width * (1 - directions[None, :, 0]) / 2
+    y0 = anchor_y - height * (1 - directions[None, :, 1]) / 2
+    return np.stack([x0, y0, x0 + width, y0 + height], axis=-1), directions, rings
+
+
+def _marker_table(points, marker_radius, bounds, cell, shape):
+    # Rasterize every marker's bounding square with a 2-D difference array,
+    # then build the summed-area table of the occupied cells
+    rows, cols = shape
+    c0 = np.clip(np.floor((points[:, 0] - marker_radius - bounds[0]) / cell), 0, cols).astype(int)
+    c1 = np.clip(np.ceil((points[:, 0] + marker_radius - bounds[0]) / cell), 0, cols).astype(int)
+    r0 = np.clip(np.floor((points[:, 1] - marker_radius - bounds[1]) / cell), 0, rows).astype(int)
+    r1 = np.clip(np.ceil((points[:, 1] + marker_radius - bounds[1]) / cell), 0, rows).astype(int)
+    diff = np.zeros((rows + 1, cols + 1), dtype=np.int32)
+    np.add.at(diff, (r0, c0), 1)
+    np.add.at(diff, (r0, c1), -1)
+    np.add.at(diff, (r1, c0), -1)
+    np.add.at(diff, (r1, c1), 1)
+    occupied = diff.cumsum(axis=0).cumsum(axis=1)[:rows, :cols] > 0
+
+    table = np.zeros((rows + 1, cols + 1), dtype=np.int32)
+    table[1:, 1:] = occupied.cumsum(axis=0).cumsum(axis=1)
+    return table
+
+
+def layout(points, sizes, bounds, marker_radius=3.0, order=None, max_checks=DEFAULT_MAX_CHECKS):
+    """Choose label positions in pixel space.
+
+    points: (n, 2) marker centres; sizes: (n, 2) label width/height; bounds:
+    (x0, y0, x1, y1) of the area labels must stay in. order lists the labels
+    to place, most important first (default: all, in point order). Every
+    label in order is placed, on its least-overlapping candidate if no
+    candidate is free.
+
+    Returns (index, boxes, directions, rings) for the labels in order.
+    """
+    points = np.asarray(points, dtype=float).reshape(-1, 2)
+    sizes = np.asarray(sizes, dtype=float).reshape(-1, 2)
+    order = np.arange(len(points)) if order is None else np.asarray(order, dtype=int)
+    empty = (np.empty(0, int), np.empty((0, 4)), np.empty((0, 2)), np.empty(0))
+    if not len(order):
+        return empty
+
+    cell = max(1.0, float(np.median(sizes[order, 1])) / 4)
+    pad = 1.25 * cell
+    shape = (int(np.ceil((bounds[3] - bounds[1]) / cell)), int(np.ceil((bounds[2] - bounds[0]) / cell)))
+    boxes, directions, rings = _candidates(points[order], sizes[order], marker_radius, pad)
+
+    inside = ((boxes[..., 0] >= bounds[0]) & (boxes[..., 1] >= bounds[1])
+              & (boxes[..., 2] <= bounds[2]) & (boxes[..., 3] <= bounds[3]))
+    c0 = np.clip(np.floor((boxes[..., 0] - bounds[0]) / cell), 0, shape[1]).astype(int)
+    r0 = np.clip(np.floor((boxes[..., 1] - bounds[1]) / cell), 0, shape[0]).astype(int)
+    c1 = np.clip(np.ceil((boxes[..., 2] - bounds[0]) / cell), 0, shape[1]).astype(int)
+    r1 = np.clip(np.ceil((boxes[..., 3] - bounds[1]) / cell), 0, shape[0]).astype(int)
+
+    table = _marker_table(points, marker_radius, bounds, cell, shape)
+    on_markers = table[r1, c1] - table[r0, c1] - table[r1, c0] + table[r0, c0]
+    free = inside & (on_markers == 0)
+    # Overlap score of each candidate against the markers, with leaving the axes worst of all
+    crowding = on_markers + ~inside * (shape[0] * shape[1] + 1)
+
+    labels = np.zeros(shape, dtype=bool)
+    choices = np.empty(len(order), dtype=int)
+    checks = 0
+    for position in range(len(order)):
+        choice = None
+        if checks < max_checks:
+            for candidate in np.flatnonzero(free[position]):
+                checks += 1
+                area = labels[r0[position, candidate]:r1[position, candidate], c0[position, candidate]:c1[position, candidate]]
+                if not area.any():
+                    choice = candidate
+                    break
+        if choice is None:
+            # Nowhere free (or out of budget): the candidate overlapping least, nearest first on ties
+            overlap = crowding[position]
+            if checks < max_checks:
+                checks += len(overlap)
+                overlap = overlap + [labels[r0[position, candidate]:r1[position, candidate],
+                                            c0[position, candidate]:c1[position, candidate]].sum()
+                                     for candidate in range(len(overlap))]
+            choice = int(np.argmin(overlap))
+        labels[r0[position, choice]:r1[position, choice], c0[position, choice]:c1[position, choice]] = True
+        choices[position] = choice
+
+    placed = np.arange(len(order))
+    return order, boxes[placed, choices], directions[choices], rings[choices]
+
+
+def _text_sizes(fig, texts, fontsize):
+    # Width from per-character advances measured once per distinct character;
+    # far cheaper than laying out every label, and close enough for collisions
+    renderer = fig.canvas.get_renderer()
+    prop = FontProperties(size=fontsize)
+    advances = {char: renderer.get_text_width_height_descent(char, prop, ismath=False)[0]
+                for char in set("".join(texts))}
+    height = renderer.get_text_width_height_descent("Ag", prop, ismath=False)[1]
+    widths = np.array([sum(advances[char] for char in text) for text in texts], dtype=float)
+    return np.column_stack([widths + 2, np.full(len(texts), height + 2)])
+
+
+def place_labels(ax, x, y, texts, priority=None, max_labels=None, fontsize=10, marker_size=36,
+                 max_checks=DEFAULT_MAX_CHECKS, leader_kw=None, **text_kw):
+    """Label the points (x, y) on ax without overlaps and return the Text artists.
+
+    priority scores decide who gets the best spots; every point is labelled
+    unless max_labels keeps only the top-scoring labels, e.g. the biggest
+    outliers. marker_size is the scatter's s. Labels placed away from
+    their point get a leader line styled by leader_kw. Call this after the
+    axes limits and figure layout are final (e.g. after tight_layout).
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    texts = [str(text) for text in texts]
+    order = top_k(np.zeros(len(texts)) if priority is None else priority, max_labels)
+
+    fig = ax.figure
+    points = ax.transData.transform(np.column_stack([x, y]))
+    sizes = _text_sizes(fig, texts, fontsize)
+    marker_radius = np.sqrt(marker_size) / 2 * fig.dpi / 72
+    index, boxes, directions, rings = layout(points, sizes, ax.bbox.extents, marker_radius, order, max_checks)
+
+    to_points = 72 / fig.dpi
+    artists = []
+    for label, box, (dx, dy) in zip(index, boxes, directions):
+        # Anchor on the box edge facing the point, so the text grows away from it
+        anchor_x = box[0] if dx > 0 else box[2] if dx < 0 else (box[0] + box[2]) / 2
+        anchor_y = box[1] if dy > 0 else box[3] if dy < 0 else (box[1] + box[3]) / 2
+        artists.append(ax.annotate(
+            texts[label], (x[label], y[label]),
+            xytext=((anchor_x - points[label, 0]) * to_points, (anchor_y - points[label, 1]) * to_points),
+            textcoords="offset points",
+            ha="left" if dx > 0 else "right" if dx < 0 else "center",
+            va="bottom" if dy > 0 else "top" if dy < 0 else "center",
+            fontsize=fontsize, **text_kw,
+        ))
+
+    far = rings > 0
+    if far.any():
+        # Leader lines from the point to the nearest corner/edge of its label, in data coordinates
+        nearest = np.column_stack([
+            np.clip(points[index[far], 0], boxes[far, 0], boxes[far, 2]),
+            np.clip(points[index[far], 1], boxes[far, 1], boxes[far, 3]),
+        ])
+        ends = ax.transData.inverted().transform(nearest)
+        segments = np.stack([np.column_stack([x[index[far]], y[index[far]]]), ends], axis=1)
+        style = {"colors": "gray", "linewidths": 0.5, **(leader_kw or {})}
+        ax.add_collection(LineCollection(segments, zorder=1, **style), autolim=False)
+    return artists
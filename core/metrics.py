@@ -0,0 +1,133 @@
+"""Latency samples, byte counters and per-rerun traces.
+
+Hot paths time themselves with span(stage, label), e.g.
+span("fetch", url) or span("plot", "plot_team_passes"). Each span is
+recorded as a "<stage>_seconds" observation; the most recent
+settings.METRIC_SAMPLES samples are kept for every (metric, label) pair, and
+summary() reports p50/p95/p99 over them. add_bytes() keeps running totals of
+bytes sent to the browser.
+
+Inside a trace() block, the spans and bytes recorded on the current thread are
+also collected, so one Streamlit rerun can be broken down stage by stage;
+annotate() tags the trace with what the page showed (league, team).
+Background threads (prefetch, refresh) are never part of a rerun's trace.
+"""
+import functools
+import threading
+import time
+from collections import Counter, deque
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+
+import numpy as np
+
+from core import settings
+
+_samples = {}
+_counts = {}
+_sums = {}
+_bytes = Counter()
+_lock = threading.Lock()
+_local = threading.local()
+
+
+@dataclass
+class Trace:
+    spans: list = field(default_factory=list)   # (stage, label, seconds) in completion order
+    bytes: Counter = field(default_factory=Counter)
+    context: dict = field(default_factory=dict)  # e.g. the league a page was showing
+
+
+def observe(metric, label, seconds):
+    with _lock:
+        key = (metric, label)
+        samples = _samples.get(key)
+        if samples is None:
+            samples = _samples[key] = deque(maxlen=settings.METRIC_SAMPLES)
+        samples.append(seconds)
+        _counts[key] = _counts.get(key, 0) + 1
+        _sums[key] = _sums.get(key, 0.0) + seconds
+
+
+@contextmanager
+def span(stage, label=""):
+    """Time the block as one <stage>_seconds observation (recorded even if it raises)."""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - started
+        observe(f"{stage}_seconds", label, elapsed)
+        current = getattr(_local, "trace", None)
+        if current is not None:
+            current.spans.append((stage, label, elapsed))
+
+
+def timed(stage):
+    """Decorator form of span(), labelled with the function's name."""
+    def decorate(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(stage, func.__name__):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+def add_bytes(kind, amount):
+    with _lock:
+        _bytes[kind] += amount
+    current = getattr(_local, "trace", None)
+    if current is not None:
+        current.bytes[kind] += amount
+
+
+def current_trace():
+    """The trace being collected on this thread, or None."""
+    return getattr(_local, "trace", None)
+
+
+def annotate(**context):
+    """Attach context (e.g. league=...) to the current thread's trace, if there is one."""
+    current = getattr(_local, "trace", None)
+    if current is not None:
+        current.context.update(context)
+
+
+@contextmanager
+def trace():
+    """Collect this thread's spans and bytes for the duration of the block; yields a Trace."""
+    outer = getattr(_local, "trace", None)
+    _local.trace = Trace()
+    try:
+        yield _local.trace
+    finally:
+        _local.trace = outer
+
+
+def summary(metric=None):
+    """{(metric, label): {"count", "sum", "p50", "p95", "p99", "max"}}, optionally for one metric.
+
+    count and sum cover every observation since start; the percentiles cover the retained samples.
+    """
+    with _lock:
+        snapshot = {key: (np.fromiter(samples, float), _counts[key], _sums[key])
+                    for key, samples in _samples.items() if metric is None or key[0] == metric}
+    result = {}
+    for key, (values, count, total) in snapshot.items():
+        p50, p95, p99 = np.percentile(values, [50, 95, 99])
+        result[key] = {"count": count, "sum": total, "p50": p50, "p95": p95, "p99": p99, "max": values.max()}
+    return result
+
+
+def bytes_sent():
+    with _lock:
+        return dict(_bytes)
+
+
+def clear():
+    with _lock:
+        _samples.clear()
+        _counts.clear()
+        _sums.clear()
+        _bytes.clear()
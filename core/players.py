@@ -0,0 +1,83 @@
+"""League-wide player table with per-90 metrics and attacking categories.
+
+Every player in a league comes from the league's standard stats table in one
+fetch (core.sources.PLAYER_URLS). enrich() then adds, vectorized over the
+whole league, the derived columns declared in core.derived:
+
+- Gls/90 and Ast/90
+- Eligible: regular starters (at least 25% of their club's most starts) with
+  goals and assists and at least 90 minutes, the players the per-90 charts use
+- Category: where an eligible player sits against their club's medians, chosen
+  with one np.select (the first matching category wins)
+
+The enriched table is computed once per version of the league table and
+shared; a club view is a lookup of precomputed row positions. When a refresh
+changes only some columns, only the derived columns that depend on them are
+computed again.
+"""
+import threading
+from dataclasses import dataclass
+
+import pandas as pd
+
+from core import datasets, derived, metrics, sources
+
+# Columns added by enrich(), see core.derived
+ENRICHED = ("Gls/90", "Ast/90", "Eligible", "Category")
+
+
+@dataclass
+class LeaguePlayers:
+    league: str
+    dataset: datasets.Dataset
+    frame: pd.DataFrame
+    rows: dict
+
+    def squads(self):
+        return sorted(self.rows)
+
+    def club(self, squad):
+        """The club's players (an empty frame if the squad is not in the league)."""
+        return self.frame.iloc[self.rows.get(squad, [])]
+
+
+_tables = {}
+_lock = threading.Lock()
+
+
+def enrich(frame, key=None):
+    """Add Gls/90, Ast/90, Eligible and Category for every player.
+
+    key names the league table across versions (see core.derived.derive).
+    """
+    return derived.derive(frame, ENRICHED, key=key)
+
+
+def _build(league, dataset):
+    with metrics.span("enrich", league):
+        frame = enrich(dataset.frame, key=(league, "players"))
+    rows = frame.groupby("Squad", observed=True).indices
+    return LeaguePlayers(league, dataset, frame, rows)
+
+
+def league_players(league, stale_ok=True):
+    """Enriched player table for one configured league, rebuilt only when the table changes.
+
+    stale_ok is passed on to the registry (see core.datasets.get_dataset).
+    """
+    dataset = datasets.get_source(sources.players(league), stale_ok=stale_ok)
+    with _lock:
+        table = _tables.get(league)
+    # The registry hands back the same frame object until the page content changes
+    if table is None or table.dataset.frame is not dataset.frame:
+        table = _build(league, dataset)
+        with _lock:
+            _tables[league] = table
+    elif table.dataset is not dataset:
+        table.dataset = dataset
+    return table
+
+
+def clear():
+    with _lock:
+        _tables.clear()
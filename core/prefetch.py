@@ -0,0 +1,106 @@
+"""Background prefetcher that keeps every configured table warm.
+
+A prefetch pass loads every source in core.sources through the dataset
+registry on a bounded thread pool (settings.PREFETCH_WORKERS). Parsed frames
+land in the registry, pages in the fetch cache and, with SNAPSHOT_ON_FETCH,
+tables in the snapshot store, so a user picking any league is served from
+memory instead of waiting on fbref.
+
+Requests still go through the fetch layer's per-host rate limit, and transient
+failures are retried with jittered exponential backoff. start() runs one pass
+when the app starts and then another whenever a warmed table expires.
+"""
+import logging
+import random
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+from core import datasets, settings, sources
+
+logger = logging.getLogger(__name__)
+
+# passes, warmed, retries, failures
+stats = Counter()
+
+_started = False
+_start_lock = threading.Lock()
+
+
+def _retryable(exc):
+    if isinstance(exc, requests.HTTPError):
+        status = exc.response.status_code if exc.response is not None else 0
+        return status == 429 or status >= 500
+    return isinstance(exc, (requests.ConnectionError, requests.Timeout))
+
+
+def _backoff(attempt):
+    # Full jitter, so workers that failed together do not retry together
+    return random.uniform(0, settings.PREFETCH_BACKOFF * 2 ** attempt)
+
+
+def warm_source(source):
+    """Load one source into the registry, retrying transient failures."""
+    for attempt in range(settings.PREFETCH_RETRIES + 1):
+        try:
+            return datasets.get_source(source, stale_ok=False)
+        except Exception as exc:
+            if attempt == settings.PREFETCH_RETRIES or not _retryable(exc):
+                raise
+            stats["retries"] += 1
+            time.sleep(_backoff(attempt))
+
+
+def warm(to_warm=None, workers=None):
+    """Load every source (default: sources.all_sources()) concurrently.
+
+    Returns {source: Dataset or the exception that stopped it}. Failures are
+    logged and counted; they never stop the rest of the pass.
+    """
+    to_warm = sources.all_sources() if to_warm is None else to_warm
+    results = {}
+    with ThreadPoolExecutor(max_workers=workers or settings.PREFETCH_WORKERS,
+                            thread_name_prefix="epl-prefetch") as pool:
+        futures = {source: pool.submit(warm_source, source) for source in to_warm}
+        for source, future in futures.items():
+            try:
+                results[source] = future.result()
+                stats["warmed"] += 1
+            except Exception as exc:
+                results[source] = exc
+                stats["failures"] += 1
+                logger.warning("prefetch of %s (%s) failed: %s", source.url, source.table_id, exc)
+    stats["passes"] += 1
+    return results
+
+
+def _next_pass_delay(results):
+    # Come back when the first warmed table expires, but never spin and never
+    # wait longer than PREFETCH_INTERVAL (failed sources are retried then)
+    expiries = [result.expires_at for result in results.values() if isinstance(result, datasets.Dataset)]
+    delay = min(expiries) - time.time() if expiries else settings.PREFETCH_INTERVAL
+    return min(max(delay, 60), settings.PREFETCH_INTERVAL)
+
+
+def _run_forever():
+    while True:
+        results = warm()
+        time.sleep(_next_pass_delay(results))
+
+
+def start():
+    """Start the prefetch loop on a daemon thread, once per process.
+
+    Safe to call on every Streamlit rerun. Returns True only for the call that
+    started it; does nothing when settings.PREFETCH is off.
+    """
+    global _started
+    with _start_lock:
+        if _started or not settings.PREFETCH:
+            return False
+        _started = True
+    threading.Thread(target=_run_forever, name="epl-prefetch", daemon=True).start()
+    return True
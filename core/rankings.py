@@ -0,0 +1,192 @@
+"""Cross-league rankings: every configured league's squads (or players) ranked together.
+
+For each stat type ("passing", "shooting", "players", as in the second element
+of Source.snapshot_key) the tables of all configured leagues are concatenated
+and, per metric in METRICS, the engine precomputes in one vectorized pass:
+
+- the value, per 90 minutes for counting stats (rates are ranked as they are)
+- its percentile across all leagues (0-100, ties share the average)
+- its z-score across all leagues
+- its rank (1 = best) and the row order from best to worst
+
+Players with fewer than MIN_PLAYER_MINUTES are left out, so a cameo does not
+top a per-90 table.
+
+The result is built once per version of the underlying tables and shared;
+top() and profile() are lookups into it, not sorts.
+"""
+import threading
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+from core import datasets, metrics, sources
+
+# Metrics ranked per stat type: column -> True for counts divided by 90s played
+METRICS = {
+    "passing": {
+        "passes_Cmp": True, "Cmp%": False, "PrgP": True, "PrgDist": True,
+        "KP": True, "1/3": True, "PPA": True, "xA": True,
+    },
+    "shooting": {
+        "Gls": True, "Sh/90": False, "SoT/90": False, "SoT%": False,
+        "G/Sh": False, "xG": True, "npxG": True, "G-xG": True,
+    },
+    "players": {
+        "Gls": True, "Ast": True, "xG": True, "xAG": True,
+        "PrgC": True, "PrgP": True, "PrgR": True,
+    },
+}
+
+# Column with the number of 90s played, per stat type
+NINETIES = {"passing": "no_matches", "shooting": "no_matches", "players": "90s"}
+
+# Column naming what is ranked, per stat type
+ENTITY = {"passing": "Squad", "shooting": "Squad", "players": "Player"}
+
+MIN_PLAYER_MINUTES = 450
+
+
+def _sources(stat_type):
+    if stat_type == "passing":
+        return {league: sources.passing(league) for league in sources.PASSING_URLS}
+    if stat_type == "shooting":
+        return {league: sources.shooting(league) for league in sources.SHOOTING_URLS}
+    if stat_type == "players":
+        return {league: sources.players(league) for league in sources.PLAYER_URLS}
+    raise KeyError(f"Unknown stat type: {stat_type}")
+
+
+@dataclass
+class Rankings:
+    stat_type: str
+    frames: tuple            # the source frames this was built from
+    table: pd.DataFrame      # League, the entity (and Squad for players), then one column per metric
+    percentiles: pd.DataFrame
+    zscores: pd.DataFrame
+    ranks: pd.DataFrame
+    order: dict              # metric -> row positions from best to worst (missing values last)
+    rows: dict               # entity name -> row positions
+
+    @property
+    def entity(self):
+        return ENTITY[self.stat_type]
+
+    @property
+    def metrics(self):
+        return list(self.percentiles.columns)
+
+    def _labels(self):
+        return ["League", self.entity] + (["Squad"] if self.entity != "Squad" else [])
+
+    def top(self, metric, n=10, leagues=None):
+        """The n best rows on a metric, optionally only from some leagues.
+
+        leagues=None ranks every league; an empty selection gives an empty table.
+        """
+        if metric not in self.order:
+            raise KeyError(f"{metric} is not ranked for {self.stat_type}")
+        positions = self.order[metric]
+        if leagues is not None:
+            positions = positions[self.table["League"].isin(leagues).to_numpy()[positions]]
+        positions = positions[:n]
+        result = self.table.iloc[positions][self._labels() + [metric]]
+        return result.assign(**{
+            "Percentile": self.percentiles[metric].to_numpy()[positions],
+            "Z-score": self.zscores[metric].to_numpy()[positions],
+            "Rank": self.ranks[metric].to_numpy()[positions],
+        }).reset_index(drop=True)
+
+    def profile(self, name, league=None):
+        """Where one squad (or player) ranks on every metric, one row per metric.
+
+        league picks between namesakes; otherwise the first match is used.
+        Raises KeyError if there is no such row.
+        """
+        positions = self.rows.get(name, [])
+        if league is not None:
+            positions = [row for row in positions if self.table["League"].iat[row] == league]
+        if not len(positions):
+            raise KeyError(f"{name} is not ranked for {self.stat_type}")
+        row = positions[0]
+        return pd.DataFrame({
+            "Value": self.table[self.metrics].iloc[row].to_numpy(dtype=np.float64),
+            "Percentile": self.percentiles.iloc[row].to_numpy(),
+            "Z-score": self.zscores.iloc[row].to_numpy(),
+            "Rank": self.ranks.iloc[row].to_numpy(),
+            "Of": self.ranks.count().to_numpy(),
+        }, index=pd.Index(self.metrics, name="Metric"))
+
+
+_rankings = {}
+_lock = threading.Lock()
+
+
+def per_90(frame, stat_type):
+    """The ranked metrics of a table, counting stats divided by the 90s played (missing ones left out)."""
+    nineties = frame[NINETIES[stat_type]].to_numpy(dtype=np.float64)
+    values = {}
+    for column, counting in METRICS[stat_type].items():
+        if column not in frame.columns:
+            continue
+        value = frame[column].to_numpy(dtype=np.float64)
+        if counting:
+            with np.errstate(divide="ignore", invalid="ignore"):
+                value = np.where(nineties > 0, value / nineties, np.nan)
+            column = f"{column}/90"
+        values[column] = value
+    return pd.DataFrame(values, index=frame.index)
+
+
+def _build(stat_type, frames):
+    entity = ENTITY[stat_type]
+    labels = ["League", entity] + (["Squad"] if entity != "Squad" else [])
+    parts = []
+    for league, frame in frames.items():
+        if stat_type == "players":
+            frame = frame[frame["Min"].to_numpy() >= MIN_PLAYER_MINUTES]
+        columns = {name: frame[name].astype(str).to_numpy() for name in labels[1:]}
+        parts.append(pd.concat([pd.DataFrame({"League": league, **columns}, index=frame.index),
+                                per_90(frame, stat_type)], axis=1))
+    table = pd.concat(parts, ignore_index=True)
+    table = table.astype({name: "category" for name in labels})
+
+    values = table.drop(columns=labels)
+    percentiles = values.rank(pct=True) * 100
+    zscores = (values - values.mean()) / values.std(ddof=0)
+    ranks = values.rank(ascending=False, method="min")
+    # argsort puts NaN last; negating sorts descending, stable keeps table order among ties
+    order = {name: np.argsort(-values[name].to_numpy(), kind="stable") for name in values.columns}
+    rows = table.groupby(entity, observed=True).indices
+    return Rankings(stat_type, tuple(frames.values()), table, percentiles, zscores, ranks, order, rows)
+
+
+def rankings(stat_type):
+    """Rankings across every configured league for a stat type, rebuilt only when a table changes."""
+    frames = {league: datasets.get_source(source).frame for league, source in _sources(stat_type).items()}
+    with _lock:
+        built = _rankings.get(stat_type)
+    # The registry hands back the same frame objects until a page's content changes
+    if built is None or len(built.frames) != len(frames) or any(
+            old is not new for old, new in zip(built.frames, frames.values())):
+        with metrics.span("rank", stat_type):
+            built = _build(stat_type, frames)
+        with _lock:
+            _rankings[stat_type] = built
+    return built
+
+
+def top(stat_type, metric, n=10, leagues=None):
+    """The n best squads (or players) on a metric across leagues."""
+    return rankings(stat_type).top(metric, n, leagues)
+
+
+def profile(stat_type, name, league=None):
+    """Where one squad (or player) ranks on every metric across leagues."""
+    return rankings(stat_type).profile(name, league)
+
+
+def clear():
+    with _lock:
+        _rankings.clear()
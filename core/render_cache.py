@@ -0,0 +1,105 @@
+"""Content-addressed cache of rendered chart images.
+
+A chart is identified by the function that draws it, the data it is drawn from
+and any extra parameters. When all three match a previous render, the stored
+PNG is returned and the figure is never built. Images live in a process-wide
+LRU bounded by total bytes (settings.RENDER_CACHE_BYTES).
+"""
+import hashlib
+import threading
+from collections import Counter, OrderedDict
+from io import BytesIO
+
+import pandas as pd
+
+from core import figures, metrics, settings
+
+# Same savefig options st.pyplot uses, so cached images look identical
+SAVEFIG_OPTIONS = {"format": "png", "dpi": 200, "bbox_inches": "tight"}
+
+# hits, misses, evictions, bytes_rendered
+stats = Counter()
+
+_images = OrderedDict()
+_bytes = 0
+_lock = threading.Lock()
+
+
+def chart_key(draw, frame, **params):
+    """Hash of the drawing code, the frame's columns/dtypes/values and the parameters."""
+    digest = hashlib.sha1()
+    digest.update(f"{draw.__module__}.{draw.__qualname__}".encode())
+    # Editing a draw function invalidates its images even without a restart
+    digest.update(draw.__code__.co_code)
+    digest.update(repr(list(zip(frame.columns, frame.dtypes.astype(str)))).encode())
+    digest.update(pd.util.hash_pandas_object(frame, index=True).values.tobytes())
+    digest.update(repr(sorted(params.items())).encode())
+    return digest.hexdigest()
+
+
+def get(key):
+    with _lock:
+        image = _images.get(key)
+        if image is not None:
+            _images.move_to_end(key)
+        return image
+
+
+def put(key, image):
+    global _bytes
+    with _lock:
+        old = _images.pop(key, None)
+        if old is not None:
+            _bytes -= len(old)
+        _images[key] = image
+        _bytes += len(image)
+        while _bytes > settings.RENDER_CACHE_BYTES and len(_images) > 1:
+            _, evicted = _images.popitem(last=False)
+            _bytes -= len(evicted)
+            stats["evictions"] += 1
+
+
+def to_png(fig):
+    buffer = BytesIO()
+    fig.savefig(buffer, **SAVEFIG_OPTIONS)
+    return buffer.getvalue()
+
+
+def render(draw, frame, **params):
+    """PNG bytes for draw(frame, **params), drawing only on a cache miss."""
+    key = chart_key(draw, frame, **params)
+    image = get(key)
+    if image is not None:
+        stats["hits"] += 1
+        return image
+
+    stats["misses"] += 1
+    # Figures are released as soon as they are serialized, or if drawing fails
+    with figures.rendering():
+        with metrics.span("draw", draw.__name__):
+            fig = draw(frame, **params)
+        with metrics.span("savefig", draw.__name__):
+            image = to_png(fig)
+    stats["bytes_rendered"] += len(image)
+    put(key, image)
+    return image
+
+
+def summary():
+    """Hit/miss statistics plus current occupancy."""
+    with _lock:
+        entries, size = len(_images), _bytes
+    lookups = stats["hits"] + stats["misses"]
+    return {
+        **stats,
+        "entries": entries,
+        "bytes": size,
+        "hit_ratio": stats["hits"] / lookups if lookups else 0.0,
+    }
+
+
+def clear():
+    global _bytes
+    with _lock:
+        _images.clear()
+        _bytes = 0
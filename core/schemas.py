@@ -0,0 +1,99 @@
+"""Typed schemas for the fbref tables the app uses.
+
+Each schema declares how raw fbref columns are renamed, which columns a table
+must have, and how it is stored in memory:
+
+- Squad / Player / Nation / Pos become categoricals
+- whole-number columns are downcast to int16 (or int32 when values need it)
+- every other numeric column (rates, per-90 values, xG) becomes float32
+
+apply() runs once when a table enters the dataset registry, so views can rely
+on the declared columns being present instead of checking for them.
+"""
+from dataclasses import dataclass, field
+
+import numpy as np
+import pandas as pd
+from pandas.api import types
+
+CATEGORICAL_COLUMNS = ("Squad", "Player", "Nation", "Pos")
+
+
+class SchemaError(ValueError):
+    """A table is missing columns its schema requires."""
+
+
+@dataclass(frozen=True)
+class Schema:
+    name: str
+    required: tuple
+    renames: dict = field(default_factory=dict, hash=False)
+    categories: tuple = CATEGORICAL_COLUMNS
+
+
+PASSING = Schema(
+    name="passing",
+    renames={
+        "# Pl": "no_players",
+        "90s": "no_matches",
+        "Cmp": "passes_Cmp",
+        "Att": "passes_Att",
+        "Cmp.1": "s_passes_Cmp",    #Short passes completed
+        "Att.1" : "s_passes_Att",   #Short passes attempted
+        "Cmp%.1" : "s_passes_Cmp%", #Short passes completion %
+        "Cmp.2": "m_passes_Cmp",    #Medium passes completed
+        "Att.2" : "m_passes_Att",   #Medium passes attempted
+        "Cmp%.2" : "m_passes_Cmp%", # Medium passes completion %
+        "Cmp.3" : "l_passes_Cmp",   # Long passes completed
+        "Att.3" : "l_passes_Att",   # Long passes attempted
+        "Cmp%.3" : "l_passes_Cmp%", # Long passes completion %
+    },
+    required=("Squad", "passes_Cmp", "passes_Att", "s_passes_Cmp", "m_passes_Cmp", "l_passes_Cmp", "PrgP"),
+)
+
+SHOOTING = Schema(
+    name="shooting",
+    renames={
+        "# Pl": "no_players",
+        "90s": "no_matches",
+    },
+    required=("Squad", "Gls", "Sh", "SoT", "SoT%", "Sh/90", "SoT/90", "xG"),
+)
+
+PLAYER = Schema(
+    name="player",
+    required=("Player", "Squad", "Min", "Starts", "90s", "Gls", "Ast"),
+)
+
+
+def _smallest_int(series):
+    low, high = series.min(), series.max()
+    for dtype in (np.int16, np.int32):
+        info = np.iinfo(dtype)
+        if info.min <= low and high <= info.max:
+            return series.astype(dtype)
+    return series
+
+
+def _compact(series, name, categories):
+    if name in categories:
+        return series.astype("category")
+    if types.is_bool_dtype(series):
+        return series
+    if types.is_integer_dtype(series):
+        return _smallest_int(series) if len(series) else series.astype(np.int16)
+    if types.is_float_dtype(series):
+        return series.astype(np.float32)
+    return series
+
+
+def apply(frame, schema):
+    """Rename, validate and downcast a raw table according to its schema."""
+    frame = frame.rename(columns=schema.renames)
+    missing = [column for column in schema.required if column not in frame.columns]
+    if missing:
+        raise SchemaError(f"{schema.name} table is missing required columns: {', '.join(missing)}")
+    return pd.DataFrame(
+        {name: _compact(frame[name], name, schema.categories) for name in frame.columns},
+        index=frame.index,
+    )
@@ -0,0 +1,141 @@
+import os
+from pathlib import Path
+
+# Root of the repository, used to anchor the default cache locations
+ROOT_DIR = Path(__file__).resolve().parent.parent
+
+
+def _env_float(name, default):
+    value = os.environ.get(name)
+    return float(value) if value else default
+
+
+# --- Fetch cache ---
+# On-disk cache of raw fbref pages, shared by every Streamlit session on the host
+CACHE_DIR = Path(os.environ.get("EPL_CACHE_DIR", ROOT_DIR / ".cache" / "fbref"))
+
+# Size budgets for the two cache tiers (megabytes)
+MEMORY_CACHE_BYTES = int(_env_float("EPL_MEMORY_CACHE_MB", 64) * 1024 * 1024)
+DISK_CACHE_BYTES = int(_env_float("EPL_DISK_CACHE_MB", 256) * 1024 * 1024)
+
+# Time-to-live per source, matched against the URL path (first match wins).
+# League tables change after every match, club pages a little less often.
+SOURCE_TTLS = {
+    "/en/comps/": _env_float("EPL_TTL_COMPS", 60 * 60),
+    "/en/squads/": _env_float("EPL_TTL_SQUADS", 6 * 60 * 60),
+}
+DEFAULT_TTL = _env_float("EPL_TTL_DEFAULT", 60 * 60)
+
+# Point the fetch layer at a local stand-in server (e.g. http://127.0.0.1:8765)
+# instead of https://fbref.com. Cache keys still use the original URL.
+FBREF_BASE_URL = os.environ.get("EPL_FBREF_BASE_URL")
+
+REQUEST_TIMEOUT = _env_float("EPL_REQUEST_TIMEOUT", 20)
+USER_AGENT = os.environ.get(
+    "EPL_USER_AGENT",
+    "Mozilla/5.0 (X11; Linux x86_64) EPL-DATA/1.0",
+)
+
+# Minimum seconds between requests to the same host, shared by every thread.
+# fbref asks automated clients to stay under 10 requests a minute.
+HOST_MIN_INTERVAL = _env_float("EPL_HOST_INTERVAL", 6)
+
+# Circuit breaker per host: after BREAKER_FAILURES consecutive failures
+# (connection errors, timeouts, 5xx) the host is left alone for
+# BREAKER_COOLDOWN seconds. A 429 opens it at once, for at least Retry-After.
+BREAKER_FAILURES = int(_env_float("EPL_BREAKER_FAILURES", 3))
+BREAKER_COOLDOWN = _env_float("EPL_BREAKER_COOLDOWN", 120)
+
+# --- Dataset registry ---
+# Threads that refresh expired tables while the stale copy keeps being served
+REFRESH_WORKERS = int(_env_float("EPL_REFRESH_WORKERS", 2))
+
+# --- Shared tables ---
+# Parsed tables are published as memory-mapped Arrow files that every app
+# process on the host attaches to. Numeric columns are shared without copying;
+# string columns are copied into each process (except with pandas 3). /dev/shm
+# keeps the files in shared memory where it exists.
+SHARED_TABLES = os.environ.get("EPL_SHARED_TABLES", "1").lower() in ("1", "true", "yes")
+SHARED_DIR = Path(os.environ.get(
+    "EPL_SHARED_DIR",
+    Path("/dev/shm/epl-data") if Path("/dev/shm").is_dir() else ROOT_DIR / ".cache" / "shared",
+))
+
+# --- Snapshot store ---
+# Written on every fetch; kept out of the repo like the fetch cache
+SNAPSHOT_DIR = Path(os.environ.get("EPL_SNAPSHOT_DIR", ROOT_DIR / ".cache" / "snapshots"))
+# Snapshots committed with the repo, read alongside SNAPSHOT_DIR and never
+# written by the app (see core.snapshots for importing one)
+SEED_SNAPSHOT_DIR = Path(os.environ.get("EPL_SEED_SNAPSHOT_DIR", ROOT_DIR / "EPL_PASSING_STATS" / "data" / "snapshots"))
+
+# Serve the latest snapshot instead of scraping fbref
+OFFLINE = os.environ.get("EPL_OFFLINE", "").lower() in ("1", "true", "yes")
+
+# Write a snapshot every time a league table is fetched from fbref
+SNAPSHOT_ON_FETCH = os.environ.get("EPL_SNAPSHOT_ON_FETCH", "1").lower() in ("1", "true", "yes")
+
+# --- Season history ---
+# Every refresh of a league table is added to a per-matchweek history with
+# week-over-week deltas and rolling rates (see core.history)
+HISTORY = os.environ.get("EPL_HISTORY", "1").lower() in ("1", "true", "yes")
+# Generated at run time, so kept out of the repo like the fetch cache
+HISTORY_DIR = Path(os.environ.get("EPL_HISTORY_DIR", ROOT_DIR / ".cache" / "history"))
+
+# --- Render cache ---
+# Byte budget for cached chart images (megabytes)
+RENDER_CACHE_BYTES = int(_env_float("EPL_RENDER_CACHE_MB", 128) * 1024 * 1024)
+
+# --- Charts ---
+# How charts reach the browser: "matplotlib" (a PNG rendered on the server) or
+# "plotly" (a JSON spec drawn in the browser). Charts without a Plotly version
+# always use matplotlib; ?charts=plotly or ?charts=matplotlib in the URL
+# switches one session.
+CHART_BACKEND = os.environ.get("EPL_CHART_BACKEND", "matplotlib").lower()
+
+# Per-chart overrides by chart name (the draw function without "draw_"), e.g.
+# EPL_CHART_BACKENDS="team_goals_scatter=matplotlib,team_passes=plotly"
+CHART_BACKENDS = dict(
+    item.strip().lower().split("=", 1)
+    for item in os.environ.get("EPL_CHART_BACKENDS", "").split(",") if "=" in item
+)
+
+# --- Figures ---
+# Ceiling on matplotlib figures alive at once across all sessions; further
+# renders wait up to FIGURE_WAIT seconds for a slot before failing
+MAX_LIVE_FIGURES = int(_env_float("EPL_MAX_LIVE_FIGURES", 16))
+FIGURE_WAIT = _env_float("EPL_FIGURE_WAIT", 30)
+
+# --- Prefetch ---
+# Warm every configured table in the background when the app starts
+PREFETCH = os.environ.get("EPL_PREFETCH", "1").lower() in ("1", "true", "yes")
+PREFETCH_WORKERS = int(_env_float("EPL_PREFETCH_WORKERS", 4))
+
+# Longest wait between prefetch passes; a pass also runs as soon as a warmed table expires
+PREFETCH_INTERVAL = _env_float("EPL_PREFETCH_INTERVAL", 15 * 60)
+
+# Retries per table for transient failures (connection errors, 429, 5xx), with
+# full-jitter exponential backoff starting at PREFETCH_BACKOFF seconds
+PREFETCH_RETRIES = int(_env_float("EPL_PREFETCH_RETRIES", 3))
+PREFETCH_BACKOFF = _env_float("EPL_PREFETCH_BACKOFF", 2)
+
+# --- Metrics ---
+# Latency samples kept per metric and source for the percentile summaries
+METRIC_SAMPLES = int(_env_float("EPL_METRIC_SAMPLES", 1000))
+
+# Sidebar performance panel for every session (it can also be opened per
+# session with ?perf=1 in the URL)
+PERF_PANEL = os.environ.get("EPL_PERF_PANEL", "").lower() in ("1", "true", "yes")
+
+# Log one JSON line per rerun (and format all app logs as JSON)
+JSON_LOGS = os.environ.get("EPL_JSON_LOGS", "").lower() in ("1", "true", "yes")
+
+# Serve Prometheus text metrics on this port (0 = off)
+METRICS_PORT = int(_env_float("EPL_METRICS_PORT", 0))
+METRICS_HOST = os.environ.get("EPL_METRICS_HOST", "127.0.0.1")
+
+# --- Data API ---
+# Serve the league and club tables over HTTP on this port (0 = off), see core.api
+API_PORT = int(_env_float("EPL_API_PORT", 0))
+API_HOST = os.environ.get("EPL_API_HOST", "127.0.0.1")
+# Encoded API responses kept in memory
+API_CACHE_BYTES = int(_env_float("EPL_API_CACHE_MB", 32) * 1024 * 1024)
@@ -0,0 +1,170 @@
+"""Parsed tables shared by every app process on the host.
+
+When several Streamlit processes serve the app, each one would otherwise
+fetch, parse and hold its own copy of every table. Instead, the process that
+loads a table publishes it once as an uncompressed Arrow IPC file:
+
+    <settings.SHARED_DIR>/<league>/<stat_type>/<fetched_at>-<digest>.arrow
+    <settings.SHARED_DIR>/<league>/<stat_type>/current.json
+
+and every process, the publisher included, attaches to it through a memory
+map. Only fixed-width numeric columns are read straight from the mapped pages,
+which the OS shares between processes. to_pandas() copies the rest into the
+process: categories get their own codes, and string columns become object
+arrays of Python strings (pandas 3's Arrow-backed str dtype is the exception
+and keeps pointing at the mapped buffers). So each process can still hold its
+own copy of the text columns; what is always shared is the numeric data and
+the single fetch and parse. The attached frames are read-only, as the dataset
+registry requires anyway.
+
+current.json names the current version with its fetch time, expiry and page
+digest, so a process that starts later, or whose copy expired, picks up a
+table another process already loaded instead of fetching it again. A new
+version is written under a temporary name and renamed into place before
+current.json is swapped the same way, so readers see either the old version or
+the new one. Versions before the previous one are deleted; processes still
+holding them keep their mapping until they let go.
+"""
+import json
+import logging
+import os
+import re
+import shutil
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+
+import pyarrow as pa
+
+from core import settings
+
+logger = logging.getLogger(__name__)
+
+POINTER = "current.json"
+
+# Versions kept per table: the current one and the one before it, for readers
+# that read the old pointer just before it was swapped
+KEEP_VERSIONS = 2
+
+
+@dataclass
+class Entry:
+    path: Path
+    fetched_at: float
+    expires_at: float
+    digest: str
+    version: int
+    tag: str
+
+
+def _slug(value):
+    return re.sub(r"[^a-z0-9]+", "-", str(value).lower()).strip("-")
+
+
+def _table_dir(league, stat_type, root=None):
+    return Path(root or settings.SHARED_DIR) / _slug(league) / _slug(stat_type)
+
+
+def _to_arrow(frame):
+    arrays = []
+    for name in frame.columns:
+        column = frame[name]
+        if column.dtype.kind in "iuf":
+            # Kept as plain values (NaN included, no validity bitmap), so the
+            # column maps back to a numpy array without conversion
+            arrays.append(pa.array(column.to_numpy()))
+        else:
+            arrays.append(pa.array(column, from_pandas=True))
+    return pa.table(arrays, names=[str(name) for name in frame.columns])
+
+
+def _write_atomic(path, write):
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    try:
+        write(tmp)
+        os.replace(tmp, path)
+    finally:
+        tmp.unlink(missing_ok=True)
+
+
+def _write_pointer(directory, entry):
+    pointer = {
+        "path": entry.path.name,
+        "fetched_at": entry.fetched_at,
+        "expires_at": entry.expires_at,
+        "digest": entry.digest,
+        "version": entry.version,
+        "tag": entry.tag,
+    }
+    _write_atomic(directory / POINTER, lambda tmp: tmp.write_text(json.dumps(pointer), encoding="utf-8"))
+
+
+def _read_pointer(directory, tag):
+    try:
+        pointer = json.loads((directory / POINTER).read_text(encoding="utf-8"))
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError) as exc:
+        logger.warning("unreadable shared table pointer in %s: %s", directory, exc)
+        return None
+    if pointer.get("tag") != tag:
+        return None
+    return Entry(directory / pointer["path"], pointer["fetched_at"], pointer["expires_at"],
+                 pointer["digest"], pointer["version"], tag)
+
+
+def current(league, stat_type, tag, root=None):
+    """The current Entry for a table, or None if there is none (or it was written for another tag)."""
+    return _read_pointer(_table_dir(league, stat_type, root), tag)
+
+
+def attach(entry):
+    """The table behind an entry as a read-only DataFrame; its numeric columns are backed by the memory map."""
+    with pa.memory_map(str(entry.path)) as source:
+        table = pa.ipc.open_file(source).read_all()
+    # One block per column, so numeric columns stay views of the mapped buffers
+    return table.to_pandas(split_blocks=True)
+
+
+def publish(frame, league, stat_type, fetched_at, expires_at, digest, tag, root=None):
+    """Write a new version of a table, make it current and return its Entry."""
+    directory = _table_dir(league, stat_type, root)
+    directory.mkdir(parents=True, exist_ok=True)
+    previous = current(league, stat_type, tag, root)
+    path = directory / f"{int(fetched_at * 1000)}-{digest[:12]}.arrow"
+    table = _to_arrow(frame)
+
+    def write(tmp):
+        with pa.OSFile(str(tmp), "wb") as sink, pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+
+    _write_atomic(path, write)
+    entry = Entry(path, fetched_at, expires_at, digest, previous.version + 1 if previous else 1, tag)
+    _write_pointer(directory, entry)
+    _prune(directory)
+    return entry
+
+
+def touch(entry, fetched_at, expires_at):
+    """Extend the current version's lifetime after its page was found unchanged."""
+    directory = entry.path.parent
+    latest = _read_pointer(directory, entry.tag)
+    # Another process may have published a newer version meanwhile; leave it alone
+    if latest is None or latest.path != entry.path:
+        return
+    _write_pointer(directory, Entry(entry.path, fetched_at, expires_at, entry.digest, entry.version, entry.tag))
+
+
+def _prune(directory):
+    versions = sorted(directory.glob("*.arrow"), key=lambda path: path.stat().st_mtime, reverse=True)
+    for path in versions[KEEP_VERSIONS:]:
+        try:
+            path.unlink()
+        except OSError:
+            # Still mapped on platforms that refuse to delete open files; next publish retries
+            pass
+
+
+def clear(root=None):
+    """Remove every shared table (processes holding one keep their mapping)."""
+    shutil.rmtree(Path(root or settings.SHARED_DIR), ignore_errors=True)
@@ -0,0 +1,149 @@
+"""Similar players across every configured league, by their per-90 profile.
+
+Each ranked player (players with at least rankings.MIN_PLAYER_MINUTES, every
+league together) is a vector of the z-scores of their per-90 metrics, so
+every metric weighs the same whatever its scale. A missing value counts as
+the average (z = 0).
+
+The index is kept in blocks, one per league. A block holds the league's
+ranked players, their per-90 values and each metric's count, sum and sum of
+squares, and is keyed by the digest of the league table it was built from.
+When a league table is refreshed only that league's block is built again;
+the cross-league mean and spread come from the blocks' sums, and the blocks
+are stacked and standardized in one vectorized pass.
+
+The vectors sit in one contiguous float32 matrix with their squared norms
+precomputed, so a query is a single matrix-vector product
+(|a - b|^2 = |a|^2 - 2 a.b + |b|^2) and a partial sort for the k nearest,
+rather than a scan over the league tables. benchmarks.bench_similarity times
+queries and rebuilds at larger scales.
+"""
+import threading
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+from core import datasets, metrics, rankings, sources
+
+LABELS = ["League", "Player", "Squad"]
+
+
+@dataclass
+class Block:
+    digest: str
+    table: pd.DataFrame      # LABELS, then the per-90 values, one row per ranked player
+    count: np.ndarray        # per metric: values present
+    total: np.ndarray        # per metric: sum of the values present
+    squares: np.ndarray      # per metric: sum of their squares
+
+
+@dataclass
+class Index:
+    blocks: dict             # league -> Block
+    table: pd.DataFrame      # every block's table, stacked
+    features: list           # the metrics in the vectors
+    vectors: np.ndarray      # one standardized row per ranked player
+    norms: np.ndarray        # squared norm of each row
+    rows: dict               # player name -> row positions
+
+    def find(self, name, league=None):
+        """Row of a player in the index, or None (e.g. under the minutes threshold)."""
+        league_column = self.table["League"]
+        for row in self.rows.get(name, []):
+            if league is None or league_column.iat[row] == league:
+                return row
+        return None
+
+    def similar(self, name, k=10, league=None):
+        """The k players closest to one player, nearest first.
+
+        league picks between namesakes. Raises KeyError if the player is not
+        in the index.
+        """
+        row = self.find(name, league)
+        if row is None:
+            raise KeyError(f"{name} is not in the similarity index")
+        distances = self.norms - 2 * (self.vectors @ self.vectors[row]) + self.norms[row]
+        distances[row] = np.inf
+        k = min(k, len(distances) - 1)
+        if k <= 0:
+            return self.table.iloc[[]]
+        nearest = np.argpartition(distances, k - 1)[:k]
+        nearest = nearest[np.argsort(distances[nearest], kind="stable")]
+        return self.table.iloc[nearest][LABELS + self.features].assign(
+            Distance=np.sqrt(np.maximum(distances[nearest], 0)),
+        ).reset_index(drop=True)
+
+
+_index = None
+_lock = threading.Lock()
+
+
+def _features():
+    return [f"{column}/90" if counting else column for column, counting in rankings.METRICS["players"].items()]
+
+
+def _block(league, dataset):
+    frame = dataset.frame
+    frame = frame[frame["Min"].to_numpy() >= rankings.MIN_PLAYER_MINUTES]
+    values = rankings.per_90(frame, "players").reindex(columns=_features())
+    matrix = values.to_numpy(dtype=np.float64)
+    present = ~np.isnan(matrix)
+    table = pd.concat([pd.DataFrame({
+        "League": league,
+        "Player": frame["Player"].astype(str).to_numpy(),
+        "Squad": frame["Squad"].astype(str).to_numpy(),
+    }, index=frame.index), values], axis=1).reset_index(drop=True)
+    return Block(dataset.digest, table, present.sum(axis=0),
+                 np.where(present, matrix, 0).sum(axis=0), np.where(present, matrix * matrix, 0).sum(axis=0))
+
+
+def _combine(blocks):
+    parts = list(blocks.values())
+    count = sum(block.count for block in parts)
+    # Metrics no league has are left out, as in the rankings
+    kept = count > 0
+    features = [name for name, keep in zip(_features(), kept) if keep]
+    count = count[kept]
+    mean = sum(block.total for block in parts)[kept] / count
+    std = np.sqrt(np.maximum(sum(block.squares for block in parts)[kept] / count - mean * mean, 0))
+
+    table = pd.concat([block.table for block in parts], ignore_index=True)
+    table = table.astype({name: "category" for name in LABELS})
+    with np.errstate(divide="ignore", invalid="ignore"):
+        zscores = (table[features].to_numpy(dtype=np.float64) - mean) / std
+    vectors = np.ascontiguousarray(np.nan_to_num(zscores, nan=0.0, posinf=0.0, neginf=0.0), dtype=np.float32)
+    norms = np.einsum("ij,ij->i", vectors, vectors)
+    rows = table.groupby("Player", observed=True).indices
+    return Index(blocks, table, features, vectors, norms, rows)
+
+
+def index():
+    """The similarity index over every league's players, rebuilding only the leagues whose table changed."""
+    global _index
+    loaded = {league: datasets.get_source(sources.players(league)) for league in sources.PLAYER_URLS}
+    with _lock:
+        built = _index
+    previous = built.blocks if built is not None else {}
+    changed = [league for league, dataset in loaded.items()
+               if league not in previous or previous[league].digest != dataset.digest]
+    if built is None or changed or len(previous) != len(loaded):
+        with metrics.span("similarity_index", "players"):
+            blocks = {league: _block(league, dataset) if league in changed else previous[league]
+                      for league, dataset in loaded.items()}
+            built = _combine(blocks)
+        with _lock:
+            _index = built
+    return built
+
+
+def similar_players(name, k=10, league=None):
+    """The k players across all leagues whose per-90 profile is closest to one player's."""
+    return index().similar(name, k, league)
+
+
+def clear():
+    global _index
+    with _lock:
+        _index = None
@@ -0,0 +1,204 @@
+"""Columnar matchweek snapshots of league tables.
+
+Each (league, stat_type, season, week) table is written once as a Parquet file:
+
+    <settings.SNAPSHOT_DIR>/<league>/<stat_type>/<season>/week-09.parquet
+
+and recorded in <settings.SNAPSHOT_DIR>/catalog.json. SNAPSHOT_DIR is a local,
+untracked store (under .cache/ by default) that fetches write to. Snapshots
+committed with the repo live in settings.SEED_SNAPSHOT_DIR, which is only ever
+written by a deliberate import; reads see both, the local store winning for
+the same week. Reads go through pyarrow, so a caller can project columns and
+push row filters down to the file instead of loading the whole table.
+
+In offline mode (EPL_OFFLINE=1) the dataset registry serves the latest snapshot
+instead of scraping fbref.
+
+Usage:
+    python -m core.snapshots list
+    python -m core.snapshots --root EPL_PASSING_STATS/data/snapshots import-csv \\
+        EPL_PASSING_STATS/data/epl_passing_stats_week9.csv \\
+        --league "Premier League" --stat-type passing --season 2024-2025 --week 9
+"""
+import argparse
+import datetime
+import json
+import os
+import re
+import threading
+import time
+from pathlib import Path
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from core import settings
+
+CATALOG_FILE = "catalog.json"
+
+_lock = threading.Lock()
+
+
+def _slug(value):
+    return re.sub(r"[^a-z0-9]+", "-", str(value).lower()).strip("-")
+
+
+def _key(league, stat_type, season, week):
+    return f"{league}|{stat_type}|{season}|{int(week)}"
+
+
+def current_season(today=None):
+    """fbref season label for a date; seasons roll over in July (e.g. '2024-2025')."""
+    today = today or datetime.date.today()
+    start = today.year if today.month >= 7 else today.year - 1
+    return f"{start}-{start + 1}"
+
+
+def infer_week(frame):
+    """Matchweek a cumulative table was taken at: the most matches played by anyone in it."""
+    for column in ("MP", "90s", "no_matches"):
+        if column in frame.columns:
+            played = pd.to_numeric(frame[column], errors="coerce").max()
+            if pd.notna(played):
+                return int(round(played))
+    return 0
+
+
+# --- Catalog ---
+
+def _catalog_path(root):
+    return Path(root) / CATALOG_FILE
+
+
+def _read_catalog(root):
+    try:
+        return json.loads(_catalog_path(root).read_text())
+    except (OSError, ValueError):
+        return {}
+
+
+def _write_catalog(root, catalog):
+    path = _catalog_path(root)
+    tmp = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+    tmp.write_text(json.dumps(catalog, indent=1, sort_keys=True))
+    os.replace(tmp, path)
+
+
+def _entries(root=None):
+    # Catalog entries by key, each with the root it was read from; without a
+    # root, the seed snapshots overlaid with the local store
+    roots = [root] if root else [settings.SEED_SNAPSHOT_DIR, settings.SNAPSHOT_DIR]
+    entries = {}
+    for directory in roots:
+        for key, entry in _read_catalog(directory).items():
+            entries[key] = {**entry, "root": str(directory)}
+    return entries
+
+
+def catalog(root=None):
+    """The catalog as a DataFrame, one row per snapshot."""
+    columns = ["league", "stat_type", "season", "week", "rows", "path", "written_at", "root"]
+    frame = pd.DataFrame(list(_entries(root).values()), columns=columns)
+    return frame.sort_values(["league", "stat_type", "season", "week"])
+
+
+def latest(league, stat_type, season=None, root=None):
+    """Catalog entry of the most recent snapshot for a league/stat type, or None."""
+    entries = [
+        entry for entry in _entries(root).values()
+        if entry["league"] == league and entry["stat_type"] == stat_type
+        and (season is None or entry["season"] == season)
+    ]
+    if not entries:
+        return None
+    return max(entries, key=lambda entry: (entry["season"], entry["week"]))
+
+
+# --- Read / write ---
+
+def write(frame, league, stat_type, season=None, week=None, root=None):
+    """Store a table as the snapshot for (league, stat_type, season, week) and return its catalog entry."""
+    root = Path(root or settings.SNAPSHOT_DIR)
+    season = season or current_season()
+    week = infer_week(frame) if week is None else int(week)
+
+    relative = Path(_slug(league)) / _slug(stat_type) / season / f"week-{week:02d}.parquet"
+    path = root / relative
+    path.parent.mkdir(parents=True, exist_ok=True)
+
+    table = pa.Table.from_pandas(frame, preserve_index=False)
+    tmp = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+    pq.write_table(table, tmp, compression="zstd")
+    os.replace(tmp, path)
+
+    entry = {
+        "league": league,
+        "stat_type": stat_type,
+        "season": season,
+        "week": week,
+        "rows": len(frame),
+        "path": relative.as_posix(),
+        "written_at": time.time(),
+    }
+    with _lock:
+        entries = _read_catalog(root)
+        entries[_key(league, stat_type, season, week)] = entry
+        _write_catalog(root, entries)
+    return {**entry, "root": str(root)}
+
+
+def read_entry(entry, columns=None, filters=None, root=None):
+    """Load the snapshot behind a catalog entry.
+
+    columns projects the read to the listed columns; filters are pyarrow
+    predicates (e.g. [("Squad", "in", ["Arsenal", "Chelsea"])]) evaluated
+    while reading rather than after.
+    """
+    path = Path(root or entry.get("root") or settings.SNAPSHOT_DIR) / entry["path"]
+    return pq.read_table(path, columns=columns, filters=filters).to_pandas()
+
+
+def read(league, stat_type, season=None, week=None, columns=None, filters=None, root=None):
+    """Load a snapshot; the latest one for the league/stat type unless week is given."""
+    if week is None:
+        entry = latest(league, stat_type, season=season, root=root)
+    else:
+        entry = _entries(root).get(_key(league, stat_type, season or current_season(), week))
+    if entry is None:
+        raise LookupError(f"No snapshot for {league} / {stat_type}")
+    return read_entry(entry, columns=columns, filters=filters, root=root)
+
+
+def import_csv(path, league, stat_type, season, week=None, root=None):
+    """Import one of the old hand-exported CSVs (UTF-8 BOM, unnamed index column)."""
+    frame = pd.read_csv(path, encoding="utf-8-sig", index_col=0)
+    frame = frame.reset_index(drop=True)
+    return write(frame, league, stat_type, season=season, week=week, root=root)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--root", default=None, help="snapshot directory (default: the local store, "
+                        "read together with the seed snapshots)")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    commands.add_parser("list", help="show the catalog")
+
+    importer = commands.add_parser("import-csv", help="import a CSV export as a snapshot")
+    importer.add_argument("path")
+    importer.add_argument("--league", required=True)
+    importer.add_argument("--stat-type", required=True)
+    importer.add_argument("--season", required=True)
+    importer.add_argument("--week", type=int)
+
+    args = parser.parse_args()
+    if args.command == "list":
+        print(catalog(args.root).to_string(index=False))
+    else:
+        entry = import_csv(args.path, args.league, args.stat_type, args.season, args.week, root=args.root)
+        print(f"Imported {entry['rows']} rows into {entry['path']}")
+
+
+if __name__ == "__main__":
+    main()
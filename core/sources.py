@@ -0,0 +1,58 @@
+"""Every fbref table the app can show, in one place.
+
+Views pick their league menus from the URL dicts here, and the prefetcher
+(core.prefetch) walks all_sources() to warm the same tables ahead of time, so
+a league added here is both selectable and prefetched.
+"""
+from dataclasses import dataclass
+
+from core import schemas
+
+# League squad tables, by league name as shown in the page menus
+PASSING_URLS = {
+    "Belgian Pro League": "https://fbref.com/en/comps/37/passing/Belgian-Pro-League-Stats#all_stats_passing",
+    "Premier League": "https://fbref.com/en/comps/9/passing/Premier-League-Stats#all_stats_passing",
+    "La Liga": "https://fbref.com/en/comps/12/passing/La-Liga-Stats#all_stats_passing",
+}
+
+SHOOTING_URLS = {
+    "Belgian Pro League": "https://fbref.com/en/comps/37/shooting/Belgian-Pro-League-Stats#all_stats_shooting",
+    "Premier League": "https://fbref.com/en/comps/9/shooting/Premier-League-Stats#all_stats_shooting",
+}
+
+# League-wide player tables, by league name as shown on the club profiles page.
+# Club views are filters over these (see core.players), so every club in a
+# configured league is available without fetching club pages one by one.
+PLAYER_URLS = {
+    "Belgian Pro": "https://fbref.com/en/comps/37/stats/Belgian-Pro-League-Stats#all_stats_standard",
+    "English Premier League": "https://fbref.com/en/comps/9/stats/Premier-League-Stats#all_stats_standard",
+}
+
+
+@dataclass(frozen=True)
+class Source:
+    """One table on one fbref page, with everything the registry needs to load it."""
+    url: str
+    table_id: str
+    schema: schemas.Schema
+    snapshot_key: tuple
+
+
+def passing(league):
+    return Source(PASSING_URLS[league], "stats_squads_passing_for", schemas.PASSING, (league, "passing"))
+
+
+def shooting(league):
+    return Source(SHOOTING_URLS[league], "stats_squads_shooting_for", schemas.SHOOTING, (league, "shooting"))
+
+
+def players(league):
+    return Source(PLAYER_URLS[league], "stats_standard", schemas.PLAYER, (league, "players"))
+
+
+def all_sources():
+    """Every configured source, league tables first."""
+    found = [passing(league) for league in PASSING_URLS]
+    found += [shooting(league) for league in SHOOTING_URLS]
+    found += [players(league) for league in PLAYER_URLS]
+    return found
@@ -0,0 +1,161 @@
+"""Exports for the app's performance data: JSON logs and Prometheus text.
+
+snapshot() gathers every counter the core modules keep (registry, fetch,
+render cache, figures, prefetch, data API, bytes sent) plus the cache hit ratios
+and the number of hosts the fetch layer's circuit breaker is holding off.
+prometheus_text() renders those, the seconds left on each open breaker and the
+latency summaries from core.metrics in the Prometheus text exposition format; with settings.METRICS_PORT set,
+start() serves it at /metrics from a background thread. With
+settings.JSON_LOGS, app logs are written as JSON lines and record_rerun() adds
+one line per rerun with its stage timings.
+"""
+import json
+import logging
+import re
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from core import api, datasets, fetch, figures, metrics, prefetch, render_cache, settings
+
+logger = logging.getLogger("epl.rerun")
+
+_started = False
+_start_lock = threading.Lock()
+
+
+def _ratio(hits, total):
+    return hits / total if total else 0.0
+
+
+def snapshot():
+    """Flat {name: number} of all counters, gauges and hit ratios."""
+    values = datasets.counters()
+    values.update({f"render_cache_{name}": value for name, value in render_cache.summary().items()})
+    values.update({f"figures_{name}": value for name, value in figures.stats.items()})
+    values["figures_live"] = figures.live_figures()
+    values.update({f"prefetch_{name}": value for name, value in prefetch.stats.items()})
+    values.update({f"api_{name}": value for name, value in api.stats.items()})
+    values.update({f"bytes_sent_{kind}": value for kind, value in metrics.bytes_sent().items()})
+
+    lookups = fetch.stats["memory_hits"] + fetch.stats["disk_hits"] + fetch.stats["revalidated"] + fetch.stats["downloads"]
+    values["fetch_hit_ratio"] = _ratio(fetch.stats["memory_hits"] + fetch.stats["disk_hits"], lookups)
+    values["datasets_hit_ratio"] = _ratio(datasets.stats["hits"] + datasets.stats["stale"], datasets.stats["requests"])
+    values["fetch_hosts_held_off"] = len(fetch.breaker_states())
+    return values
+
+
+def _metric_name(name):
+    return "epl_" + re.sub(r"[^a-zA-Z0-9_]", "_", name)
+
+
+def _label(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", " ")
+
+
+def prometheus_text():
+    lines = []
+    for name, value in sorted(snapshot().items()):
+        lines.append(f"{_metric_name(name)} {float(value):g}")
+
+    held_off = fetch.breaker_states()
+    if held_off:
+        name = _metric_name("fetch_breaker_open_seconds")
+        lines.append(f"# TYPE {name} gauge")
+        lines += [f'{name}{{host="{_label(host)}"}} {seconds:g}' for host, seconds in sorted(held_off.items())]
+
+    by_metric = {}
+    for (metric, label), summary in metrics.summary().items():
+        by_metric.setdefault(metric, []).append((label, summary))
+    for metric, series in sorted(by_metric.items()):
+        name = _metric_name(metric)
+        lines.append(f"# TYPE {name} summary")
+        for label, summary in series:
+            source = f'source="{_label(label)}"'
+            for quantile in ("p50", "p95", "p99"):
+                lines.append(f'{name}{{{source},quantile="0.{quantile[1:]}"}} {summary[quantile]:.6f}')
+            lines.append(f"{name}_sum{{{source}}} {summary['sum']:.6f}")
+            lines.append(f"{name}_count{{{source}}} {summary['count']}")
+    return "\n".join(lines) + "\n"
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split("?", 1)[0] != "/metrics":
+            self.send_error(404)
+            return
+        body = prometheus_text().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def serve(port, host="127.0.0.1"):
+    """Serve /metrics on a background thread and return the server."""
+    server = ThreadingHTTPServer((host, port), _MetricsHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="epl-metrics", daemon=True).start()
+    return server
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record):
+        entry = {
+            "time": round(record.created, 3),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        entry.update(getattr(record, "fields", {}))
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+def start():
+    """Set up JSON logging and the metrics endpoint once per process, as configured."""
+    global _started
+    with _start_lock:
+        if _started:
+            return
+        _started = True
+    if settings.JSON_LOGS:
+        handler = logging.StreamHandler(sys.stderr)
+        handler.setFormatter(JsonFormatter())
+        root = logging.getLogger()
+        root.addHandler(handler)
+        root.setLevel(logging.INFO)
+    if settings.METRICS_PORT:
+        serve(settings.METRICS_PORT, settings.METRICS_HOST)
+
+
+def record_rerun(page, trace):
+    """Account for a finished rerun traced with metrics.trace().
+
+    The rerun time is observed as view_seconds under "<page> / <context>", so
+    percentiles can be compared per page and league; with JSON_LOGS one log
+    line carries the full breakdown by stage, plus bytes sent.
+    """
+    total = sum(seconds for stage, _, seconds in trace.spans if stage == "rerun")
+    view = " / ".join([page, *map(str, trace.context.values())])
+    metrics.observe("view_seconds", view, total)
+    if not settings.JSON_LOGS:
+        return
+    stages = {}
+    for stage, _, seconds in trace.spans:
+        if stage != "rerun":
+            stages[stage] = stages.get(stage, 0.0) + seconds
+    logger.info("rerun", extra={"fields": {
+        "event": "rerun",
+        "page": page,
+        **trace.context,
+        "seconds": round(total, 6),
+        "stages": {stage: round(seconds, 6) for stage, seconds in stages.items()},
+        "spans": [{"stage": stage, "label": label, "seconds": round(seconds, 6)} for stage, label, seconds in trace.spans],
+        "bytes": dict(trace.bytes),
+    }})
@@ -1,37 +1,58 @@
+import importlib
+
 import streamlit as st
-import pandas as pd
-import numpy as np
-import matplotlib.pyplot as plt
-import plotly.express as px
-from adjustText import adjust_text
+
+from core import api, metrics, prefetch, telemetry
+from views import perf_panel
+
+# Warm every league table in the background (once per process), so picking
+# any league is served from memory rather than waiting on fbref
+prefetch.start()
+# JSON logs / Prometheus endpoint, when configured (once per process)
+telemetry.start()
+# Read-only data API for other tools, when configured (once per process)
+api.start()
 
 # Sidebar Setup
 st.sidebar.title("Explore Analysis")
 st.sidebar.write("Select a project to explore.")
 
 # --- Navigation ---
-# Create a dictionary mapping project names to file paths for easier management
+# Map project names to the view modules that implement them. Each module exposes
+# a render() entry point and keeps its heavy imports (seaborn, ...)
+# to itself, so only the selected page pays for them.
 pages = {
-    "League Passing Profiles": "views/passing_stats.py",
-    "League Shooting Profiles": "views/shooting_stats.py",
-    "Goals":"views/goals.py",
-    "Club Profiles": "views/player_profiles.py"
+    "League Passing Profiles": "views.passing_stats",
+    "League Shooting Profiles": "views.shooting_stats",
+    "Goals": "views.goals",
+    "Club Profiles": "views.player_profiles",
+    "Cross-League Rankings": "views.rankings",
+    "Season Trends": "views.trends",
 }
 
+
+def load_page(module_name):
+    # import_module caches the module in sys.modules, so each view is compiled
+    # and imported once per process and simply re-rendered on later reruns
+    return importlib.import_module(module_name)
+
+
 # Sidebar selection for pages
 selected_page = st.sidebar.selectbox("Choose a Project", list(pages.keys()))
 
 
-
 # --- Run Selected Page ---
-# Dynamically load and execute the selected page
 if selected_page in pages:
-    with open(pages[selected_page]) as f:
-        code = f.read()
-        print("Debug - Executing:\n", code)
-        exec(code)
+    # Time the page stage by stage; the trace feeds the per-page percentiles,
+    # the JSON rerun log and the performance panel
+    with metrics.trace() as trace:
+        with metrics.span("rerun", selected_page):
+            load_page(pages[selected_page]).render()
+    telemetry.record_rerun(selected_page, trace)
 
+    if perf_panel.enabled():
+        perf_panel.render(trace)
 
 
 # Display footer
-st.sidebar.text("Made by November")
\ No newline at end of file
+st.sidebar.text("Made by November")
@@ -0,0 +1,70 @@
+"""Fixtures for the fetch layer tests: a local fbref stand-in and a controllable clock."""
+import pytest
+
+from core import fetch, settings
+from tools import fbref_standin
+
+PAGES = {
+    "en/comps/9/passing/Premier-League-Stats": "<html><body>passing</body></html>",
+    "en/comps/9/shooting/Premier-League-Stats": "<html><body>shooting</body></html>",
+    "en/comps/9/stats/Premier-League-Stats": "<html><body>standard</body></html>",
+}
+
+
+class Clock:
+    """Stands in for the time module in core.fetch, so TTLs and cooldowns pass instantly."""
+
+    def __init__(self):
+        self.now = 1_700_000_000.0
+
+    def time(self):
+        return self.now
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+    def advance(self, seconds):
+        self.now += seconds
+
+
+@pytest.fixture
+def fixtures_dir(tmp_path):
+    root = tmp_path / "fbref"
+    for path, body in PAGES.items():
+        page = root / f"{path}.html"
+        page.parent.mkdir(parents=True, exist_ok=True)
+        page.write_text(body, encoding="utf-8")
+    return root
+
+
+@pytest.fixture
+def standin(fixtures_dir):
+    server = fbref_standin.serve(fixtures_dir)
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(fetch, "time", clock)
+    return clock
+
+
+@pytest.fixture(autouse=True)
+def fetch_layer(monkeypatch, tmp_path, standin, clock):
+    """core.fetch pointed at the stand-in, with an empty cache under tmp_path and no rate limit."""
+    monkeypatch.setattr(settings, "FBREF_BASE_URL", fbref_standin.base_url(standin))
+    monkeypatch.setattr(settings, "CACHE_DIR", tmp_path / "cache")
+    monkeypatch.setattr(settings, "HOST_MIN_INTERVAL", 0)
+    monkeypatch.setattr(settings, "BREAKER_FAILURES", 3)
+    monkeypatch.setattr(settings, "BREAKER_COOLDOWN", 120)
+    fetch.clear(disk=True)
+    fetch.stats.clear()
+    yield fetch
+    fetch.clear(disk=True)
+    fetch.stats.clear()
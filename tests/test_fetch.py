@@ -0,0 +1,226 @@
+"""core.fetch against the local fbref stand-in (tools.fbref_standin).
+
+Run with: python -m pytest tests
+"""
+import os
+
+import pytest
+import requests
+
+from core import fetch, settings
+
+PASSING = "https://fbref.com/en/comps/9/passing/Premier-League-Stats#all_stats_passing"
+SHOOTING = "https://fbref.com/en/comps/9/shooting/Premier-League-Stats#all_stats_shooting"
+STANDARD = "https://fbref.com/en/comps/9/stats/Premier-League-Stats#all_stats_standard"
+TTL = 60
+
+
+def requests_made(standin):
+    return sum(standin.counts.values())
+
+
+def host(standin):
+    return "%s:%d" % standin.server_address[:2]
+
+
+# --- TTL ---
+
+def test_fresh_page_is_served_from_memory(standin, clock):
+    body = fetch.fetch_html(PASSING, ttl=TTL)
+    clock.advance(TTL - 1)
+
+    assert fetch.fetch_html(PASSING, ttl=TTL) == body == "<html><body>passing</body></html>"
+    assert requests_made(standin) == 1
+    assert fetch.stats["memory_hits"] == 1
+
+
+def test_fresh_page_is_served_from_disk_after_memory_is_cleared(standin):
+    fetch.fetch_html(PASSING, ttl=TTL)
+    fetch.clear()
+
+    assert fetch.fetch_html(PASSING, ttl=TTL) == "<html><body>passing</body></html>"
+    assert requests_made(standin) == 1
+    assert fetch.stats["disk_hits"] == 1
+
+
+def test_expired_page_goes_back_to_the_server(standin, clock):
+    fetch.fetch_html(PASSING, ttl=TTL)
+    clock.advance(TTL + 1)
+
+    fetch.fetch_html(PASSING, ttl=TTL)
+    assert requests_made(standin) == 2
+
+
+def test_ttl_comes_from_the_source_settings(monkeypatch, standin, clock):
+    monkeypatch.setitem(settings.SOURCE_TTLS, "/en/comps/", 10)
+    fetch.fetch_html(PASSING)
+    clock.advance(9)
+    fetch.fetch_html(PASSING)
+    assert requests_made(standin) == 1
+
+    clock.advance(2)
+    fetch.fetch_html(PASSING)
+    assert requests_made(standin) == 2
+
+
+# --- Revalidation ---
+
+@pytest.mark.parametrize("validator", ["etag", "last_modified"])
+def test_unchanged_page_is_revalidated_with_a_304(standin, clock, validator):
+    fetch.fetch_html(PASSING, ttl=TTL)
+    page = fetch._memory[fetch.cache_key(PASSING)]
+    # Leave only one validator, so each conditional header is exercised on its own
+    setattr(page, "last_modified" if validator == "etag" else "etag", None)
+    clock.advance(TTL + 1)
+
+    assert fetch.fetch_html(PASSING, ttl=TTL) == "<html><body>passing</body></html>"
+    assert fetch.stats["revalidated"] == 1
+    assert fetch.stats["downloads"] == 1
+    assert page.fetched_at == clock.now
+    assert page.expires_at == clock.now + TTL
+
+    # The extended expiry holds: no request until it passes again
+    clock.advance(TTL - 1)
+    fetch.fetch_html(PASSING, ttl=TTL)
+    assert requests_made(standin) == 2
+
+
+def test_revalidated_expiry_is_written_to_disk(clock):
+    fetch.fetch_html(PASSING, ttl=TTL)
+    clock.advance(TTL + 1)
+    fetch.fetch_html(PASSING, ttl=TTL)
+    fetch.clear()
+
+    assert fetch._disk_get(fetch.cache_key(PASSING)).expires_at == clock.now + TTL
+
+
+def test_changed_page_is_downloaded_again(fixtures_dir, clock):
+    fetch.fetch_html(PASSING, ttl=TTL)
+    page = fixtures_dir / "en/comps/9/passing/Premier-League-Stats.html"
+    page.write_text("<html><body>passing, updated</body></html>", encoding="utf-8")
+    clock.advance(TTL + 1)
+
+    assert fetch.fetch_html(PASSING, ttl=TTL) == "<html><body>passing, updated</body></html>"
+    assert fetch.stats["revalidated"] == 0
+    assert fetch.stats["downloads"] == 2
+
+
+# --- Eviction ---
+
+def test_memory_tier_evicts_the_least_recently_used_page_by_bytes(monkeypatch):
+    page_size = len("<html><body>passing</body></html>")
+    monkeypatch.setattr(settings, "MEMORY_CACHE_BYTES", 2 * page_size + 1)
+    fetch.fetch_html(PASSING, ttl=TTL)
+    fetch.fetch_html(SHOOTING, ttl=TTL)
+    fetch.fetch_html(PASSING, ttl=TTL)  # now the most recently used
+
+    fetch.fetch_html(STANDARD, ttl=TTL)
+
+    assert list(fetch._memory) == [fetch.cache_key(PASSING), fetch.cache_key(STANDARD)]
+    assert fetch._memory_bytes <= settings.MEMORY_CACHE_BYTES
+    assert fetch.stats["evictions"] >= 1
+
+
+def test_disk_tier_evicts_the_least_recently_used_page_by_bytes(monkeypatch):
+    page_size = len("<html><body>passing</body></html>")
+    monkeypatch.setattr(settings, "DISK_CACHE_BYTES", 2 * page_size + 1)
+    fetch.fetch_html(PASSING, ttl=TTL)
+    fetch.fetch_html(SHOOTING, ttl=TTL)
+    passing_body = fetch._disk_paths(fetch.cache_key(PASSING))[0]
+    shooting_body = fetch._disk_paths(fetch.cache_key(SHOOTING))[0]
+    # Written in that order; reading the passing page back from disk makes
+    # the shooting page the least recently used
+    os.utime(passing_body, (1, 1))
+    os.utime(shooting_body, (2, 2))
+    fetch.clear()
+    fetch.fetch_html(PASSING, ttl=TTL)
+    assert fetch.stats["disk_hits"] == 1
+
+    fetch.fetch_html(STANDARD, ttl=TTL)
+
+    cached = {path.name for path in settings.CACHE_DIR.glob("*.html")}
+    assert passing_body.name in cached
+    assert shooting_body.name not in cached
+    assert fetch._disk_paths(fetch.cache_key(STANDARD))[0].name in cached
+    assert not fetch._disk_paths(fetch.cache_key(SHOOTING))[1].exists()
+    assert sum(path.stat().st_size for path in settings.CACHE_DIR.glob("*.html")) <= settings.DISK_CACHE_BYTES
+
+
+# --- Circuit breaker ---
+
+@pytest.mark.parametrize("status", [500, 503])
+def test_breaker_opens_after_repeated_server_errors_and_closes_after_cooldown(standin, clock, status):
+    standin.error_rate, standin.error_status = 1, status
+    for _ in range(settings.BREAKER_FAILURES):
+        with pytest.raises(requests.HTTPError):
+            fetch.fetch_html(PASSING, ttl=TTL)
+
+    with pytest.raises(fetch.HostUnavailable):
+        fetch.fetch_html(PASSING, ttl=TTL)
+    assert requests_made(standin) == settings.BREAKER_FAILURES
+    assert fetch.breaker_states() == {host(standin): settings.BREAKER_COOLDOWN}
+    assert fetch.stats["breaker_opened"] == 1
+    assert fetch.stats["breaker_rejected"] == 1
+
+    # After the cooldown one trial request goes through; its success closes the breaker
+    standin.error_rate = 0
+    clock.advance(settings.BREAKER_COOLDOWN + 1)
+    assert fetch.fetch_html(PASSING, ttl=TTL) == "<html><body>passing</body></html>"
+    assert fetch.breaker_states() == {}
+    assert fetch._breakers == {}
+
+
+def test_failed_trial_request_opens_the_breaker_again(standin, clock):
+    standin.error_rate = 1
+    for _ in range(settings.BREAKER_FAILURES):
+        with pytest.raises(requests.HTTPError):
+            fetch.fetch_html(PASSING, ttl=TTL)
+    clock.advance(settings.BREAKER_COOLDOWN + 1)
+
+    with pytest.raises(requests.HTTPError):
+        fetch.fetch_html(PASSING, ttl=TTL)
+    with pytest.raises(fetch.HostUnavailable):
+        fetch.fetch_html(PASSING, ttl=TTL)
+    assert requests_made(standin) == settings.BREAKER_FAILURES + 1
+
+
+def test_breaker_stays_closed_below_the_failure_threshold(standin):
+    standin.error_rate = 1
+    for _ in range(settings.BREAKER_FAILURES - 1):
+        with pytest.raises(requests.HTTPError):
+            fetch.fetch_html(PASSING, ttl=TTL)
+
+    # A success resets the count of consecutive failures
+    standin.error_rate = 0
+    fetch.fetch_html(PASSING, ttl=TTL)
+    assert fetch.breaker_states() == {}
+    assert fetch._breakers == {}
+
+
+def test_429_opens_the_breaker_at_once_for_retry_after(standin, clock):
+    retry_after = settings.BREAKER_COOLDOWN * 2
+    standin.error_rate, standin.error_status, standin.retry_after = 1, 429, retry_after
+    with pytest.raises(requests.HTTPError):
+        fetch.fetch_html(PASSING, ttl=TTL)
+
+    assert fetch.breaker_states() == {host(standin): retry_after}
+    # Past the usual cooldown but not past Retry-After: still held off
+    clock.advance(settings.BREAKER_COOLDOWN + 1)
+    with pytest.raises(fetch.HostUnavailable):
+        fetch.fetch_html(PASSING, ttl=TTL)
+    assert requests_made(standin) == 1
+
+    standin.error_rate = 0
+    clock.advance(retry_after)
+    fetch.fetch_html(PASSING, ttl=TTL)
+    assert fetch.breaker_states() == {}
+
+
+def test_cached_pages_are_still_served_while_the_breaker_is_open(standin):
+    fetch.fetch_html(SHOOTING, ttl=TTL)
+    standin.error_rate = 1
+    for _ in range(settings.BREAKER_FAILURES):
+        with pytest.raises(requests.HTTPError):
+            fetch.fetch_html(PASSING, ttl=TTL)
+
+    assert fetch.fetch_html(SHOOTING, ttl=TTL) == "<html><body>shooting</body></html>"
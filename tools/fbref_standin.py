@@ -0,0 +1,139 @@
+"""Local stand-in for fbref.com that replays recorded pages.
+
+Pages are looked up by URL path under a fixtures directory, e.g.
+/en/comps/9/passing/Premier-League-Stats -> <root>/en/comps/9/passing/Premier-League-Stats.html
+
+An optional per-request delay imitates the latency of the real site, and an
+error rate answers that share of requests with a 503, as fbref does when it
+sheds load (or with another status, e.g. a 429 with a Retry-After header).
+
+Responses carry ETag and Last-Modified headers and honour conditional requests,
+so the fetch cache's revalidation path can be exercised end to end.
+
+Usage:
+    python -m tools.fbref_standin --root fixtures/fbref --port 8765 [--delay 0.5] [--error-rate 0.1]
+    EPL_FBREF_BASE_URL=http://127.0.0.1:8765 streamlit run streamlit_football_app.py
+"""
+import argparse
+import hashlib
+import random
+import threading
+import time
+from collections import Counter
+from email.utils import formatdate, parsedate_to_datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+
+def page_path(root, url_path):
+    url_path = url_path.split("?", 1)[0].strip("/")
+    path = (Path(root) / f"{url_path}.html").resolve()
+    # Never serve anything outside the fixtures directory
+    if Path(root).resolve() not in path.parents:
+        return None
+    return path
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        self.server.counts[self.path] += 1
+        if self.server.delay:
+            time.sleep(self.server.delay)
+        if self.server.error_rate and random.random() < self.server.error_rate:
+            self.server.errors[self.path] += 1
+            self.send_response(self.server.error_status)
+            if self.server.retry_after is not None:
+                self.send_header("Retry-After", str(self.server.retry_after))
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        path = page_path(self.server.root, self.path)
+        if path is None or not path.is_file():
+            self.send_error(404)
+            return
+
+        body = path.read_bytes()
+        etag = '"%s"' % hashlib.sha1(body).hexdigest()
+        mtime = path.stat().st_mtime
+        last_modified = formatdate(mtime, usegmt=True)
+
+        if self._not_modified(etag, mtime):
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.send_header("Last-Modified", last_modified)
+            self.end_headers()
+            return
+
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("ETag", etag)
+        self.send_header("Last-Modified", last_modified)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _not_modified(self, etag, mtime):
+        if_none_match = self.headers.get("If-None-Match")
+        if if_none_match is not None:
+            return if_none_match == etag
+        if_modified_since = self.headers.get("If-Modified-Since")
+        if if_modified_since:
+            try:
+                return int(mtime) <= parsedate_to_datetime(if_modified_since).timestamp()
+            except (TypeError, ValueError):
+                return False
+        return False
+
+    def log_message(self, format, *args):
+        pass
+
+
+def serve(root, host="127.0.0.1", port=0, delay=0, error_rate=0, error_status=503, retry_after=None):
+    """Start the stand-in server on a background thread and return it.
+
+    Every request waits delay seconds before it is answered, and a share
+    error_rate of them (picked at random) is answered with error_status,
+    carrying a Retry-After header when retry_after is given.
+
+    The bound address is server.server_address; server.counts holds requests per
+    path and server.errors the failed ones among them. All of these settings
+    are attributes of the server and can be changed while it runs. Call
+    server.shutdown() to stop it.
+    """
+    server = ThreadingHTTPServer((host, port), StandInHandler)
+    server.root = Path(root)
+    server.counts = Counter()
+    server.delay = delay
+    server.error_rate = error_rate
+    server.error_status = error_status
+    server.retry_after = retry_after
+    server.errors = Counter()
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def base_url(server):
+    host, port = server.server_address[:2]
+    return f"http://{host}:{port}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--root", default="fixtures/fbref", help="directory of recorded pages")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--delay", type=float, default=0, help="seconds to wait before each response")
+    parser.add_argument("--error-rate", type=float, default=0, help="share of requests answered with a 503")
+    args = parser.parse_args()
+
+    server = serve(args.root, args.host, args.port, delay=args.delay, error_rate=args.error_rate)
+    print(f"Serving {args.root} at {base_url(server)}")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
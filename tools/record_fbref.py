@@ -0,0 +1,60 @@
+"""Record the fbref pages the app reads, for replay by tools.fbref_standin.
+
+Every URL in core.sources is fetched once through core.fetch (so the per-host
+rate limit and the fetch cache apply) and written under the output directory
+at its URL path, e.g.
+https://fbref.com/en/comps/9/passing/Premier-League-Stats -> <out>/en/comps/9/passing/Premier-League-Stats.html
+
+Pages already recorded are kept unless --force is given.
+
+Usage:
+    python -m tools.record_fbref --out fixtures/fbref
+    python -m benchmarks.bench_suite --fixtures fixtures/fbref
+"""
+import argparse
+from pathlib import Path
+from urllib.parse import urldefrag, urlsplit
+
+
+def fixture_path(root, url):
+    return Path(root) / (urlsplit(url).path.strip("/") + ".html")
+
+
+def record(root, urls, force=False):
+    """Fetch each URL into root; returns the paths written."""
+    from core import fetch
+
+    written = []
+    for url in urls:
+        path = fixture_path(root, url)
+        if path.exists() and not force:
+            continue
+        html = fetch.fetch_html(url)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(html, encoding="utf-8")
+        written.append(path)
+    return written
+
+
+def source_urls():
+    from core import sources
+
+    urls = []
+    for source in sources.all_sources():
+        url = urldefrag(source.url)[0]
+        if url not in urls:
+            urls.append(url)
+    return urls
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--out", default="fixtures/fbref")
+    parser.add_argument("--force", action="store_true", help="re-record pages that already exist")
+    args = parser.parse_args()
+    for path in record(args.out, source_urls(), force=args.force):
+        print(path)
+
+
+if __name__ == "__main__":
+    main()
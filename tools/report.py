@@ -0,0 +1,294 @@
+"""Headless batch reports: every chart for every league and club, as PNG and HTML.
+
+The charts are the views' own plot_* functions, run outside Streamlit with
+views.ui.capture() collecting their images. The league x chart x club
+matrix is fanned out over a process pool (one chart per task, Agg backend),
+and a static report directory is written:
+
+    <out>/index.html                      leagues
+    <out>/<league>/index.html             league tables, league charts, clubs
+    <out>/<league>/clubs/<club>/index.html
+    <out>/manifest.json                   fingerprint of every chart's inputs
+
+Leagues are grouped by fbref competition, so the passing, shooting and player
+tables of one competition share a page. A chart is only drawn again when its
+fingerprint changes: the rows it is drawn from, its parameters, or the code of
+its view module, of the modules that shape its data (core.derived,
+core.players) or of the shared renderer (core.charts, core.figures, ...).
+Unchanged charts are skipped.
+
+Data is loaded through core.datasets, so the fetch cache and the per-host
+rate limit apply as they do in the app. Every table, league or player, is
+loaded fresh (stale_ok=False): a report never mixes a stored snapshot with
+fresh data.
+
+Usage:
+    python -m tools.report --out reports
+    python -m tools.report --out reports --workers 8 --force
+"""
+import argparse
+import functools
+import hashlib
+import html
+import importlib
+import inspect
+import json
+import multiprocessing
+import os
+import re
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from pathlib import Path
+
+import pandas as pd
+
+# Charts per league table, by source kind (the second element of Source.snapshot_key)
+LEAGUE_CHARTS = {
+    "passing": (
+        ("views.passing_stats", "plot_team_passes", "Completed vs attempted passes"),
+        ("views.passing_stats", "plot_passing_types", "Passing types"),
+        ("views.passing_stats", "plot_progressive_passes", "Progressive passes"),
+        ("views.passing_stats", "plot_missed_passes", "Missed passes"),
+    ),
+    "shooting": (
+        ("views.shooting_stats", "plot_team_shots", "Shots"),
+        ("views.shooting_stats", "plot_team_acc", "Shooting accuracy"),
+        ("views.shooting_stats", "plot_shots_per_90_vs_sot_per_90", "Shots vs shots on target per 90"),
+        ("views.shooting_stats", "plot_team_sot", "Shots on target"),
+        ("views.goals", "plot_team_goals", "Goals scored"),
+        ("views.goals", "plot_team_goals_scatter", "Goals vs expected goals"),
+    ),
+}
+
+# Charts per club, drawn from the club's slice of the league player table
+CLUB_CHARTS = (
+    ("plot_metric_distribution", "Goals", {"metric": "Gls", "metric_label": "Goals"}),
+    ("plot_metric_distribution", "Assists", {"metric": "Ast", "metric_label": "Assists"}),
+    ("plot_minutes_distribution", "Minutes played", {}),
+    ("plot_goals_assists_per_90", "Goals and assists per 90", {}),
+)
+CLUB_MODULE = "views.player_profiles"
+
+# Modules every chart's data is shaped, drawn and encoded with, on top of its view module:
+# derived columns are computed inside the plot functions, so their definitions are code too
+CHART_MODULES = ("core.derived", "core.players", "core.charts", "core.figures", "core.labels",
+                 "core.render_cache", "views.ui")
+
+MANIFEST = "manifest.json"
+
+
+@dataclass
+class Chart:
+    path: str            # PNG path relative to the report directory
+    title: str
+    module: str
+    function: str
+    frame: pd.DataFrame
+    kwargs: dict = field(default_factory=dict)
+    fingerprint: str = ""
+
+
+@dataclass
+class Page:
+    path: str            # HTML path relative to the report directory
+    title: str
+    tables: list = field(default_factory=list)    # (caption, frame)
+    charts: list = field(default_factory=list)
+    links: list = field(default_factory=list)     # (title, path of the linked page)
+
+
+def slug(name):
+    return re.sub(r"[^a-z0-9]+", "-", str(name).lower()).strip("-")
+
+
+def _competition(url):
+    match = re.search(r"/comps/(\d+)/", url)
+    return match.group(1) if match else url
+
+
+@functools.lru_cache(maxsize=None)
+def _module_digest(module_name):
+    module = importlib.import_module(module_name)
+    return hashlib.sha1(Path(inspect.getsourcefile(module)).read_bytes()).hexdigest()
+
+
+def fingerprint(chart):
+    """Identity of a chart's inputs: the plot function, its rows and parameters, and the code that draws it.
+
+    The code is the chart's view module and the modules shared by every chart (CHART_MODULES).
+    """
+    from core import render_cache
+
+    plot = inspect.unwrap(getattr(importlib.import_module(chart.module), chart.function))
+    key = render_cache.chart_key(plot, chart.frame, **chart.kwargs)
+    code = ":".join(_module_digest(name) for name in (chart.module, *CHART_MODULES))
+    return hashlib.sha1(f"{key}:{code}".encode()).hexdigest()
+
+
+def plan(leagues=None, clubs=True):
+    """Load every configured table and lay out the report's pages and charts.
+
+    Tables that cannot be loaded are reported on stderr and left out.
+    """
+    from core import datasets, players, sources
+
+    pages = {}
+    index = Page("index.html", "Reports")
+    for source in sources.all_sources():
+        league, kind = source.snapshot_key
+        if leagues and league not in leagues:
+            continue
+        competition = _competition(source.url)
+        page = pages.get(competition)
+        if page is None:
+            page = pages[competition] = Page(f"{slug(league)}/index.html", league)
+            index.links.append((league, page.path))
+        base = Path(page.path).parent
+
+        try:
+            if kind == "players":
+                table = players.league_players(league, stale_ok=False)
+                frame = table.frame
+            else:
+                frame = datasets.get_source(source, stale_ok=False).frame
+        except Exception as error:
+            print(f"Skipping {kind} / {league}: {error}", file=sys.stderr)
+            continue
+
+        if kind != "players":
+            page.tables.append((f"{kind.capitalize()} by squad", frame))
+            for module, function, title in LEAGUE_CHARTS.get(kind, ()):
+                page.charts.append(Chart(str(base / f"{function}.png"), title, module, function, frame))
+            continue
+
+        if not clubs:
+            continue
+        for squad in table.squads():
+            club = table.club(squad)
+            club_page = Page(str(base / "clubs" / slug(squad) / "index.html"), f"{squad} ({league})")
+            club_page.tables.append(("Players", club))
+            for function, title, kwargs in CLUB_CHARTS:
+                name = function + (f"_{slug(kwargs['metric'])}" if "metric" in kwargs else "")
+                club_page.charts.append(Chart(str(Path(club_page.path).parent / f"{name}.png"), title,
+                                              CLUB_MODULE, function, club, {"team_name": squad, **kwargs}))
+            page.links.append((squad, club_page.path))
+            pages[club_page.path] = club_page
+    return [index, *pages.values()]
+
+
+def _init_worker():
+    import matplotlib
+
+    from streamlit import logger
+
+    matplotlib.use("Agg")
+    # The views' st.* calls are no-ops outside a Streamlit run; keep the bare-mode warnings quiet
+    logger.set_log_level("error")
+
+
+def draw(chart, out):
+    """Run one chart's plot function and write its image; returns (path, written, seconds)."""
+    from views import ui
+
+    start = time.perf_counter()
+    plot = getattr(importlib.import_module(chart.module), chart.function)
+    with ui.capture() as images:
+        plot(chart.frame, **chart.kwargs)
+    if images:
+        target = Path(out) / chart.path
+        target.parent.mkdir(parents=True, exist_ok=True)
+        target.write_bytes(images[-1])
+    return chart.path, bool(images), time.perf_counter() - start
+
+
+def _load_manifest(out):
+    path = Path(out) / MANIFEST
+    if not path.exists():
+        return {}
+    return json.loads(path.read_text(encoding="utf-8"))
+
+
+def _page_html(page, manifest):
+    depth = len(Path(page.path).parent.parts)
+    home = "../" * depth + "index.html"
+    here = Path(page.path).parent
+    parts = [
+        "<!DOCTYPE html><html><head><meta charset='utf-8'>",
+        f"<title>{html.escape(page.title)}</title>",
+        "<style>body{font-family:sans-serif;margin:2em}img{max-width:100%}"
+        "table{border-collapse:collapse;font-size:small}td,th{padding:2px 6px;border:1px solid #ddd}</style>",
+        "</head><body>",
+        f"<p><a href='{home}'>All leagues</a></p>" if depth else "",
+        f"<h1>{html.escape(page.title)}</h1>",
+    ]
+    for chart in page.charts:
+        parts.append(f"<h2>{html.escape(chart.title)}</h2>")
+        if manifest.get(chart.path, {}).get("image"):
+            parts.append(f"<img src='{html.escape(os.path.relpath(chart.path, here))}' alt='{html.escape(chart.title)}'>")
+        else:
+            parts.append("<p>No data for this chart.</p>")
+    for caption, frame in page.tables:
+        parts.append(f"<h2>{html.escape(caption)}</h2>")
+        parts.append(frame.to_html(index=False, na_rep="", float_format=lambda value: f"{value:.2f}"))
+    if page.links:
+        parts.append("<ul>")
+        for title, path in page.links:
+            parts.append(f"<li><a href='{html.escape(os.path.relpath(path, here))}'>{html.escape(title)}</a></li>")
+        parts.append("</ul>")
+    parts.append(f"<p><small>Generated {time.strftime('%Y-%m-%d %H:%M')}</small></p></body></html>")
+    return "".join(parts)
+
+
+def build(out, leagues=None, clubs=True, workers=None, force=False):
+    """Write the report directory; returns (charts drawn, charts skipped as unchanged)."""
+    out = Path(out)
+    pages = plan(leagues, clubs)
+    manifest = _load_manifest(out)
+
+    charts = [chart for page in pages for chart in page.charts]
+    pending = []
+    for chart in charts:
+        chart.fingerprint = fingerprint(chart)
+        entry = manifest.get(chart.path)
+        unchanged = (entry is not None and entry["fingerprint"] == chart.fingerprint
+                     and (not entry["image"] or (out / chart.path).exists()))
+        if force or not unchanged:
+            pending.append(chart)
+
+    if pending:
+        # spawn rather than fork: the parent already runs the registry's refresh threads
+        context = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(workers, mp_context=context, initializer=_init_worker) as pool:
+            futures = {pool.submit(draw, chart, out): chart for chart in pending}
+            for future in as_completed(futures):
+                chart = futures[future]
+                path, written, seconds = future.result()
+                manifest[path] = {"fingerprint": chart.fingerprint, "image": written, "seconds": round(seconds, 3)}
+
+    for page in pages:
+        target = out / page.path
+        target.parent.mkdir(parents=True, exist_ok=True)
+        target.write_text(_page_html(page, manifest), encoding="utf-8")
+    (out / MANIFEST).write_text(json.dumps(manifest, indent=1, sort_keys=True) + "\n", encoding="utf-8")
+    return len(pending), len(charts) - len(pending)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--out", default="reports")
+    parser.add_argument("--league", action="append", dest="leagues",
+                        help="only this league, as named in core.sources (repeatable)")
+    parser.add_argument("--no-clubs", action="store_true", help="league pages only")
+    parser.add_argument("--workers", type=int, default=None, help="processes (default: one per CPU)")
+    parser.add_argument("--force", action="store_true", help="redraw charts even if their inputs are unchanged")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    drawn, skipped = build(args.out, args.leagues, not args.no_clubs, args.workers, args.force)
+    print(f"{drawn} charts drawn, {skipped} unchanged, in {time.perf_counter() - start:.1f}s -> {args.out}/index.html")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,198 @@
+"""Synthetic fbref-shaped pages for benchmarks and the stand-in server.
+
+The pages mirror the structure the app relies on: a visible squad table, more
+tables hidden in HTML comments, two-row headers, repeated header rows in long
+player tables and Squad Total / Opponent Total footers on club pages. Values
+are random but deterministic for a given seed, and `scale` multiplies the
+number of rows to show how each code path grows with data size.
+
+Usage:
+    python -m tools.synth_fbref --out fixtures/fbref https://fbref.com/en/comps/9/passing/Premier-League-Stats ...
+"""
+import argparse
+import random
+from pathlib import Path
+from urllib.parse import urlsplit
+
+# (group label, columns) per table type; the group labels form the over_header row
+PASSING_SQUAD = [
+    ("", ["Squad", "# Pl", "90s"]),
+    ("Total", ["Cmp", "Att", "Cmp%", "TotDist", "PrgDist"]),
+    ("Short", ["Cmp", "Att", "Cmp%"]),
+    ("Medium", ["Cmp", "Att", "Cmp%"]),
+    ("Long", ["Cmp", "Att", "Cmp%"]),
+    ("", ["Ast", "xAG"]),
+    ("Expected", ["xA", "A-xAG"]),
+    ("", ["KP", "1/3", "PPA", "CrsPA", "PrgP"]),
+]
+SHOOTING_SQUAD = [
+    ("", ["Squad", "# Pl", "90s"]),
+    ("Standard", ["Gls", "Sh", "SoT", "SoT%", "Sh/90", "SoT/90", "G/Sh", "G/SoT", "Dist", "FK", "PK", "PKatt"]),
+    ("Expected", ["xG", "npxG", "npxG/Sh", "G-xG", "np:G-xG"]),
+]
+STANDARD_PLAYER = [
+    ("", ["Player", "Nation", "Pos", "Squad", "Age"]),
+    ("Playing Time", ["MP", "Starts", "Min", "90s"]),
+    ("Performance", ["Gls", "Ast", "G+A", "G-PK", "PK", "PKatt", "CrdY", "CrdR"]),
+    ("Expected", ["xG", "npxG", "xAG", "npxG+xAG"]),
+    ("Progression", ["PrgC", "PrgP", "PrgR"]),
+    ("Per 90 Minutes", ["Gls", "Ast", "G+A", "G-PK", "G+A-PK", "xG", "xAG", "xG+xAG", "npxG", "npxG+xAG"]),
+    ("", ["Matches"]),
+]
+
+SQUADS = [
+    "Arsenal", "Aston Villa", "Bournemouth", "Brentford", "Brighton", "Chelsea",
+    "Crystal Palace", "Everton", "Fulham", "Ipswich Town", "Leicester City",
+    "Liverpool", "Manchester City", "Manchester Utd", "Newcastle Utd",
+    "Nott'ham Forest", "Southampton", "Tottenham", "West Ham", "Wolves",
+]
+NATIONS = ["eng ENG", "fr FRA", "es ESP", "br BRA", "pt POR", "be BEL", "nl NED", "de GER"]
+POSITIONS = ["GK", "DF", "MF", "FW", "DF,MF", "MF,FW", "FW,MF"]
+
+# Extra page weight around the tables, like fbref's navigation menus and scripts
+_FILLER = (
+    '<div class="nav"><ul>'
+    + "".join(f'<li><a href="/en/comps/{i}/">Competition {i}</a><ul><li>Season</li></ul></li>' for i in range(300))
+    + "</ul></div><script>" + "var x = 1;" * 2000 + "</script>"
+)
+
+
+def _columns(groups):
+    return [name for _, names in groups for name in names]
+
+
+def _over_header(groups):
+    return "".join(
+        f'<th colspan="{len(names)}" class="over_header center">{label}</th>' for label, names in groups
+    )
+
+
+def _value(rng, name, row_label, squad):
+    if name in ("Squad",):
+        return f'<a href="/en/squads/0000/{squad}-Stats">{squad}</a>'
+    if name == "Player":
+        return f'<a href="/en/players/0000/{row_label}">{row_label}</a>'
+    if name == "Nation":
+        return rng.choice(NATIONS)
+    if name == "Pos":
+        return rng.choice(POSITIONS)
+    if name == "Age":
+        return f"{rng.randint(17, 36)}-{rng.randint(0, 364):03d}"
+    if name == "Matches":
+        return '<a href="/en/players/0000/matchlogs">Matches</a>'
+    if name.endswith("%") or "/" in name or name.startswith(("x", "npx", "G-", "np:", "A-")):
+        return f"{rng.uniform(-5 if '-' in name else 0, 99):.1f}"
+    if name in ("TotDist", "PrgDist", "Min"):
+        return f"{rng.randint(0, 60000):,}"
+    return str(rng.randint(0, 900))
+
+
+def table_html(table_id, groups, row_labels, rng, squads=None, repeat_header_every=0, footer=False):
+    columns = _columns(groups)
+    header = "".join(f'<th scope="col">{name}</th>' for name in columns)
+    body = []
+    for i, label in enumerate(row_labels):
+        if repeat_header_every and i and i % repeat_header_every == 0:
+            body.append(f'<tr class="thead">{header}</tr>')
+        # Squad tables are keyed by squad; player tables spread players over the squads
+        row_squad = label if squads is None else squads[i % len(squads)]
+        cells = [_value(rng, name, label, row_squad) for name in columns]
+        body.append(
+            f'<tr><th scope="row">{cells[0]}</th>' + "".join(f"<td>{c}</td>" for c in cells[1:]) + "</tr>"
+        )
+    foot = ""
+    if footer:
+        foot_rows = []
+        for label in ("Squad Total", "Opponent Total"):
+            cells = [label] + [_value(rng, name, label, label) for name in columns[1:]]
+            foot_rows.append(
+                f'<tr><th scope="row">{cells[0]}</th>' + "".join(f"<td>{c}</td>" for c in cells[1:]) + "</tr>"
+            )
+        foot = "<tfoot>" + "".join(foot_rows) + "</tfoot>"
+    return (
+        f'<table class="stats_table sortable" id="{table_id}">'
+        f"<caption>{table_id}</caption>"
+        f'<thead><tr class="over_header">{_over_header(groups)}</tr><tr>{header}</tr></thead>'
+        f"<tbody>{''.join(body)}</tbody>{foot}</table>"
+    )
+
+
+def _page(tables):
+    parts = ["<!DOCTYPE html><html><head><title>fbref stand-in</title></head><body>", _FILLER]
+    for markup, commented in tables:
+        wrapped = f"<!--\n{markup}\n-->" if commented else markup
+        parts.append(f'<div class="table_wrapper"><div class="table_container">{wrapped}</div></div>')
+        parts.append(_FILLER)
+    parts.append("</body></html>")
+    return "".join(parts)
+
+
+def _players(count):
+    return [f"Player {i:05d}" for i in range(count)]
+
+
+def league_page(stat_type, scale=1, seed=0):
+    """League page for 'passing', 'shooting' or 'stats' (standard player table)."""
+    rng = random.Random(seed)
+    squads = [f"{name} {i // len(SQUADS)}" if i >= len(SQUADS) else name
+              for i, name in enumerate(SQUADS * scale)]
+    squad_groups = PASSING_SQUAD if stat_type == "passing" else SHOOTING_SQUAD
+    squad_kind = "passing" if stat_type == "passing" else "shooting"
+    player_kind = "standard" if stat_type == "stats" else stat_type
+    players = _players(25 * len(squads))
+    tables = [
+        (table_html(f"stats_squads_{squad_kind}_for", squad_groups, squads, rng), False),
+        (table_html(f"stats_squads_{squad_kind}_against", squad_groups, [f"vs {s}" for s in squads], rng), True),
+        (table_html(f"stats_{player_kind}", STANDARD_PLAYER, players, rng,
+                    squads=squads, repeat_header_every=25), True),
+    ]
+    return _page(tables)
+
+
+def squad_page(scale=1, seed=0, comp_id=9):
+    """Club page: standard player table (with footer totals), fixtures, and commented extras."""
+    rng = random.Random(seed)
+    players = _players(30 * scale)
+    fixtures = [f"Matchweek {i}" for i in range(1, 39)]
+    tables = [
+        (table_html(f"stats_standard_{comp_id}", STANDARD_PLAYER, players, rng,
+                    squads=["Club"], footer=True), False),
+        (table_html("matchlogs_for", SHOOTING_SQUAD, fixtures, rng, squads=["Club"]), False),
+        (table_html(f"stats_shooting_{comp_id}", SHOOTING_SQUAD, players, rng, squads=["Club"]), True),
+        (table_html(f"stats_passing_{comp_id}", PASSING_SQUAD, players, rng, squads=["Club"]), True),
+    ]
+    return _page(tables)
+
+
+def page_for_url(url, scale=1, seed=0):
+    """Pick the page shape from an fbref URL path."""
+    parts = urlsplit(url).path.strip("/").split("/")
+    if "squads" in parts:
+        return squad_page(scale=scale, seed=seed)
+    stat_type = parts[3] if len(parts) > 4 else "stats"
+    return league_page(stat_type, scale=scale, seed=seed)
+
+
+def write_fixtures(root, urls, scale=1):
+    """Write a synthetic page for each URL under root, laid out for tools.fbref_standin."""
+    written = []
+    for seed, url in enumerate(urls):
+        path = Path(root) / (urlsplit(url).path.strip("/") + ".html")
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(page_for_url(url, scale=scale, seed=seed), encoding="utf-8")
+        written.append(path)
+    return written
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("urls", nargs="+")
+    parser.add_argument("--out", default="fixtures/fbref")
+    parser.add_argument("--scale", type=int, default=1)
+    args = parser.parse_args()
+    for path in write_fixtures(args.out, args.urls, args.scale):
+        print(path)
+
+
+if __name__ == "__main__":
+    main()
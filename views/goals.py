@@ -1,88 +1,33 @@
 import streamlit as st 
-import requests 
 import pandas as pd
 import numpy as np
-import matplotlib.pyplot as plt 
-import plotly.express as px
-from adjustText import adjust_text
 
+from core import charts, datasets, figures, interactive, labels, metrics, sources
+from views import ui
 
 
+# Leagues offered in the menu (configured in core.sources)
+urls = sources.SHOOTING_URLS
 
-st.title("Football Shooting Stats")
 
-# Define URLs for different leagues
-urls = {
-   
-    "Belgian Pro League": "https://fbref.com/en/comps/37/shooting/Belgian-Pro-League-Stats#all_stats_shooting",
-    "Premier League": "https://fbref.com/en/comps/9/shooting/Premier-League-Stats#all_stats_shooting",
+# Bar chart of this page (drawn by core.charts)
+TEAM_GOALS = charts.BarChart(
+    name="team_goals",
+    header="League Goals Scored By Teams",
+    title="League Goals Scored By Teams",
+    y=("Gls",),
+    sort="Gls",
+    colors=("#1f77b4",),
+    ylabel="Number of Goals",
+    labels="%d",
+)
 
-}
-# Dropdown menu for selecting league
-selected_league = st.selectbox("Select a League", list(urls.keys()))
+plot_team_goals = ui.bar_chart(TEAM_GOALS, __name__)
 
-# Load data from the selected URL
-url = urls[selected_league]
-st.subheader(f"Loading data from: **{selected_league}**")
 
-
-#Loading Data from the url
-pd.set_option('display.max_columns', None)
-html = pd.read_html(url, header=1)
-df = html[0]
-
-#raw dataframe
-#st.dataframe(df)
-
-#Rename Columns for Readability 
-df.rename(columns = {
-    "# Pl": "no_players",
-    "90s": "no_matches",
-    }, inplace=True)
-
-# Display Dataframe in an interactive table....Clean dataframe
-st.dataframe(df)
-st.markdown("---")
-
-
-def plot_team_goals(df):
-    st.header('League Goals Scored By Teams')
-
-    # Group by 'Squad' and 'passes_Cmp' and 'passes_Att'
-
-    league_goals = df[['Squad','Gls']].sort_values( by='Gls', ascending=False)
-                                        
-    fig = plt.figure(dpi=150)  # Increase DPI for a larger image display
-    ax = fig.add_subplot(111)
-
-    #plot the data
-    league_goals.plot(kind="bar", x='Squad', y=['Gls'], ax =ax , color=['#1f77b4'])
-
-    ax.set_title('League Goals Scored By Teams')
-    ax.set_ylabel('Number of Goals')
-    ax.set_xlabel('Squad')
-    ax.set_xticklabels(league_goals['Squad'], rotation=45, ha='right', fontsize=9)
-
-    fig.tight_layout()
-
-    for p in ax.patches:
-        ax.annotate(f'{int(p.get_height())}', 
-                    (p.get_x() + p.get_width() / 2., p.get_height()), 
-                    ha='center', va='center', 
-                    xytext=(0, 6), 
-                    textcoords='offset points', fontsize=8)
-
-    st.pyplot(fig)
-
-
-def plot_team_goals_scatter(df):
-    # Check if the required columns are present
-    if not {'xG', 'Gls', 'Squad'}.issubset(df.columns):
-        st.error("Dataframe missing one of the required columns: 'xG', 'Gls', or 'Squad'")
-        return
-    
+def draw_team_goals_scatter(df):
     # Create the scatter plot
-    fig, ax = plt.subplots(figsize=(12, 8))
+    fig, ax = figures.subplots(figsize=(12, 8))
     scatter = ax.scatter(df['xG'], df['Gls'], alpha=0.6, s=100)
 
     # Add labels and title
@@ -97,29 +42,65 @@ def plot_team_goals_scatter(df):
     ]
     ax.plot(lims, lims, 'r--', alpha=0.75, zorder=0)
 
-    # Add team labels to points
-    texts = [
-        ax.text(df['xG'].iloc[i], df['Gls'].iloc[i], txt, fontsize=18, alpha=0.7)
-        for i, txt in enumerate(df['Squad'])
-    ]
+    # Adjust layout to prevent clipping of tick-labels; labels are placed in the final layout
+    fig.tight_layout()
 
-    # Adjust text to minimize overlap
-    adjust_text(texts, arrowprops=dict(arrowstyle="-", color='gray', lw=0.5))
+    # Add team labels to points without overlaps; teams furthest from xG = Gls get the best spots
+    labels.place_labels(ax, df['xG'], df['Gls'], df['Squad'],
+                        priority=labels.diagonal_distance(df['xG'], df['Gls']),
+                        fontsize=18, marker_size=100, alpha=0.7)
+    return fig
 
-    # Adjust layout to prevent clipping of tick-labels and display in Streamlit
-    fig.tight_layout()
-    st.pyplot(fig)
 
+def spec_team_goals_scatter(df):
+    # Team names show on hover rather than as placed labels
+    return interactive.scatter(df, 'xG', 'Gls', 'Squad', 'Actual Goals vs Expected Goals',
+                               xlabel='Expected Goals (xG)', ylabel='Actual Goals (Gls)', diagonal=True)
 
 
+@metrics.timed("plot")
+def plot_team_goals_scatter(df):
+    # xG, Gls and Squad are guaranteed by schemas.SHOOTING at ingest
+    ui.show_chart(draw_team_goals_scatter, spec_team_goals_scatter, df[['Squad', 'xG', 'Gls']])
+
 
+def render():
+    st.title("Football Shooting Stats")
+    league_view()
 
 
+# Picking another league reruns only this section, not the whole app
+@ui.fragment
+def league_view():
+    # Dropdown menu for selecting league
+    selected_league = st.selectbox("Select a League", list(urls.keys()))
+    metrics.annotate(league=selected_league)
 
-# Calling functions to generate each plot
+    st.subheader(f"Loading data from: **{selected_league}**")
+
+    #Loading Data from the url
+    pd.set_option('display.max_columns', None)
+    # Shared, read-only table: every page and session gets the same parsed frame,
+    # already renamed and downcast by its schema
+    try:
+        dataset = datasets.get_source(sources.shooting(selected_league))
+    except Exception as e:
+        st.error(f"Error loading data for {selected_league}: {e}")
+        return
+    df = dataset.frame
+    ui.show_freshness(dataset)
 
-if df is not None:
-    plot_team_goals(df)     
+    #raw dataframe
+    #st.dataframe(df)
+
+    # Display Dataframe in an interactive table....Clean dataframe
+    ui.show_table(df)
     st.markdown("---")
-    plot_team_goals_scatter(df)
-    st.markdown("---")
\ No newline at end of file
+
+    # Calling functions to generate each plot
+
+    if df is not None:
+        plot_team_goals(df)     
+        st.markdown("---")
+        plot_team_goals_scatter(df)
+        st.markdown("---")
@@ -0,0 +1,56 @@
+"""Opt-in sidebar panel with the performance breakdown of the current rerun.
+
+Shown when settings.PERF_PANEL is on, or for one session with ?perf=1 in the
+URL. Besides this rerun's stages it lists tail latencies per page and league,
+per chart and per upstream source, the cache hit ratios and any host the
+circuit breaker is holding off, so the cause of a slow p95 can be traced to a
+chart, a league or the network.
+"""
+import pandas as pd
+import streamlit as st
+
+from core import fetch, metrics, settings, telemetry
+
+
+def enabled():
+    return settings.PERF_PANEL or st.query_params.get("perf") == "1"
+
+
+def _percentiles(metric, top=10):
+    rows = [{"source": label, "count": summary["count"],
+             "p50 ms": summary["p50"] * 1000, "p95 ms": summary["p95"] * 1000, "p99 ms": summary["p99"] * 1000}
+            for (_, label), summary in metrics.summary(metric).items()]
+    if not rows:
+        return None
+    return pd.DataFrame(rows).sort_values("p95 ms", ascending=False).head(top).round(1)
+
+
+def render(trace):
+    with st.sidebar.expander("Performance", expanded=True):
+        total = sum(seconds for stage, _, seconds in trace.spans if stage == "rerun")
+        st.markdown(f"**This rerun:** {total * 1000:.0f} ms, "
+                    + ", ".join(f"{kind} {size / 1024:.0f} KiB" for kind, size in trace.bytes.items()))
+        spans = pd.DataFrame(
+            [(stage, label, seconds * 1000) for stage, label, seconds in trace.spans if stage != "rerun"],
+            columns=["stage", "label", "ms"],
+        )
+        if not spans.empty:
+            st.dataframe(spans.sort_values("ms", ascending=False).round(2), hide_index=True)
+
+        values = telemetry.snapshot()
+        st.markdown(
+            f"**Hit ratios:** render cache {values['render_cache_hit_ratio']:.0%}, "
+            f"datasets {values['datasets_hit_ratio']:.0%}, fetch {values['fetch_hit_ratio']:.0%}"
+        )
+        held_off = fetch.breaker_states()
+        if held_off:
+            st.markdown("**Held off by the circuit breaker:** "
+                        + ", ".join(f"{host} ({seconds:.0f} s left)" for host, seconds in sorted(held_off.items())))
+
+        for title, metric in (("Reruns by page", "view_seconds"),
+                              ("Charts", "plot_seconds"),
+                              ("Upstream fetches", "fetch_seconds")):
+            table = _percentiles(metric)
+            if table is not None:
+                st.markdown(f"**{title}**")
+                st.dataframe(table, hide_index=True)
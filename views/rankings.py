@@ -0,0 +1,51 @@
+import streamlit as st
+
+from core import metrics, rankings
+from views import ui
+
+# Stat types offered in the menu, as named in core.rankings
+STAT_TYPES = {
+    "Squad passing": "passing",
+    "Squad shooting": "shooting",
+    "Players": "players",
+}
+
+
+def render():
+    st.title("Cross-League Rankings")
+    st.write("Every configured league ranked together. Counting stats are per 90 minutes; "
+             f"players need at least {rankings.MIN_PLAYER_MINUTES} minutes.")
+    rankings_view()
+
+
+# Picking another stat type, metric or squad reruns only this section
+@ui.fragment
+def rankings_view():
+    label = st.selectbox("Compare", list(STAT_TYPES))
+    stat_type = STAT_TYPES[label]
+    metrics.annotate(stat_type=stat_type)
+
+    try:
+        # Built once per version of the league tables and shared by every session
+        ranked = rankings.rankings(stat_type)
+    except Exception as e:
+        st.error(f"Error loading data for {label}: {e}")
+        return
+
+    st.header("Top across leagues")
+    metric = st.selectbox("Metric", ranked.metrics)
+    leagues = list(ranked.table["League"].cat.categories)
+    chosen = st.multiselect("Leagues", leagues, default=leagues)
+    count = st.slider("How many", 5, 50, 10)
+    if chosen:
+        ui.show_table(ranked.top(metric, count, chosen))
+    else:
+        st.info("Pick at least one league to rank.")
+
+    st.markdown("---")
+    st.header(f"{ranked.entity} profile")
+    names = sorted(ranked.rows)
+    name = st.selectbox(ranked.entity, names)
+    if name:
+        metrics.annotate(name=name)
+        ui.show_table(ranked.profile(name))
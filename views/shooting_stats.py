@@ -1,148 +1,106 @@
 import streamlit as st 
-import requests 
 import pandas as pd
-import numpy as np
-import matplotlib.pyplot as plt 
-import plotly.express as px
-
-
-
-
-st.title("Football Shooting Stats")
-
-# Define URLs for different leagues
-urls = {
-   
-    "Belgian Pro League": "https://fbref.com/en/comps/37/shooting/Belgian-Pro-League-Stats#all_stats_shooting",
-    "Premier League": "https://fbref.com/en/comps/9/shooting/Premier-League-Stats#all_stats_shooting",
-
-}
-
-# Dropdown menu for selecting league
-selected_league = st.selectbox("Select a League", list(urls.keys()))
-
-# Load data from the selected URL
-url = urls[selected_league]
-st.subheader(f"Loading data from: **{selected_league}**")
-
-
-#Loading Data from the url
-pd.set_option('display.max_columns', None)
-html = pd.read_html(url, header=1)
-df = html[0]
-
-#raw dataframe
-#st.dataframe(df)
-
-#Rename Columns for Readability 
-df.rename(columns = {
-    "# Pl": "no_players",
-    "90s": "no_matches",
-    }, inplace=True)
-
-# Display Dataframe in an interactive table....Clean dataframe
-st.dataframe(df)
-st.markdown("---")
-
-def plot_team_shots(df):
-    st.header('Shots Vs Shots On Target')
-
-    # Group by 'Squad' and 'Shots' and 'Shots On Target'
-
-    league_shots = df[['Squad','SoT', 'Sh']].sort_values( by='Sh', ascending=False)
-                                        
-    fig = plt.figure(dpi=150)  # Increase DPI for a larger image display
-    ax = fig.add_subplot(111)
-
-    #plot the data
-    league_shots.plot(kind="bar", x='Squad', y=['Sh', 'SoT',], ax =ax , color=['#1f77b4', '#ff7f0e'])
-
-    ax.set_title('Shots Vs Shots On Target')
-    ax.set_ylabel('Number of Goals')
-    ax.set_xlabel('Squad')
-    ax.set_xticklabels(league_shots['Squad'], rotation=45, ha='right', fontsize=9)
-
-    fig.tight_layout()
-
-    st.pyplot(fig)
-
-def plot_team_acc(df):
-    st.header('Shots On Target Vs Goals')
-
-    league_shots = df[['Squad','Gls', 'SoT']].sort_values(by='SoT',ascending=False)
-
-    fig = plt.figure(dpi=150)  # Increase DPI for a larger image display
-    ax = fig.add_subplot(111)
-
-    #plot the data
-    league_shots.plot(kind="bar", x='Squad', y=['SoT', 'Gls'], ax =ax , color=['#1f77b4', '#ff7f0e'])
-
-    ax.set_title('Shots On Target Vs Goals')
-    ax.set_ylabel('Number of Goals')
-    ax.set_xlabel('Squad')
-    ax.set_xticklabels(league_shots['Squad'], rotation=45, ha='right', fontsize=9)
-
-    fig.tight_layout()
-
-    st.pyplot(fig)
-
-def plot_shots_per_90_vs_sot_per_90(df):
-    st.header('Shots/90 vs Shots On Target/90 by Team')
-    league_data = df[['Squad', 'Sh/90', 'SoT/90']].sort_values('Sh/90', ascending=False)
-
-    fig = plt.figure(dpi=150)
-    ax = fig.add_subplot(111)
-    league_data.plot(kind='bar', x='Squad', y=['Sh/90', 'SoT/90'], ax=ax, color=['#1f77b4', '#ff7f0e'])
-
-    ax.set_title('Shots/90 vs Shots On Target/90')
-    ax.set_xlabel('Team')
-    ax.set_ylabel('Shots per 90')
-    ax.set_xticklabels(league_data['Squad'], rotation=45, ha='right')
-
-    st.pyplot(fig)
-
-def plot_team_sot(df):
-    st.header('Shots On Target Percentage (SoT%)')
-
-    # Group by 'Squad' and 'passes_Cmp' and 'passes_Att'
-
-    league_goals = df[['Squad','SoT%']].sort_values( by='SoT%', ascending=False)
-                                        
-    fig = plt.figure(dpi=150)  # Increase DPI for a larger image display
-    ax = fig.add_subplot(111)
-
-    #plot the data
-    league_goals.plot(kind="bar", x='Squad', y=['SoT%'], ax =ax , color=['#1f77b4'])
-
-    ax.set_title('Direct measure of accuracy')
-    ax.set_ylabel('SoT%')
-    ax.set_xlabel('Squad')
-    ax.set_xticklabels(league_goals['Squad'], rotation=45, ha='right', fontsize=9)
-
-    fig.tight_layout()
-
-    for p in ax.patches:
-        ax.annotate(f'{int(p.get_height())}', 
-                    (p.get_x() + p.get_width() / 2., p.get_height()), 
-                    ha='center', va='center', 
-                    xytext=(0, 6), 
-                    textcoords='offset points', fontsize=8)
-
-    st.pyplot(fig)
-
 
+from core import charts, datasets, metrics, sources
+from views import ui
+
+
+# Leagues offered in the menu (configured in core.sources)
+urls = sources.SHOOTING_URLS
+
+
+# Bar charts of this page (drawn by core.charts)
+TEAM_SHOTS = charts.BarChart(
+    name="team_shots",
+    header="Shots Vs Shots On Target",
+    title="Shots Vs Shots On Target",
+    y=("Sh", "SoT"),
+    sort="Sh",
+    colors=("#1f77b4", "#ff7f0e"),
+    ylabel="Number of Goals",
+)
+
+TEAM_ACC = charts.BarChart(
+    name="team_acc",
+    header="Shots On Target Vs Goals",
+    title="Shots On Target Vs Goals",
+    y=("SoT", "Gls"),
+    sort="SoT",
+    colors=("#1f77b4", "#ff7f0e"),
+    ylabel="Number of Goals",
+)
+
+SHOTS_PER_90_VS_SOT_PER_90 = charts.BarChart(
+    name="shots_per_90_vs_sot_per_90",
+    header="Shots/90 vs Shots On Target/90 by Team",
+    title="Shots/90 vs Shots On Target/90",
+    y=("Sh/90", "SoT/90"),
+    sort="Sh/90",
+    colors=("#1f77b4", "#ff7f0e"),
+    xlabel="Team",
+    ylabel="Shots per 90",
+    tick_size=10,
+)
+
+TEAM_SOT = charts.BarChart(
+    name="team_sot",
+    header="Shots On Target Percentage (SoT%)",
+    title="Direct measure of accuracy",
+    y=("SoT%",),
+    sort="SoT%",
+    colors=("#1f77b4",),
+    ylabel="SoT%",
+    labels="%d",
+)
+
+plot_team_shots = ui.bar_chart(TEAM_SHOTS, __name__)
+plot_team_acc = ui.bar_chart(TEAM_ACC, __name__)
+plot_shots_per_90_vs_sot_per_90 = ui.bar_chart(SHOTS_PER_90_VS_SOT_PER_90, __name__)
+plot_team_sot = ui.bar_chart(TEAM_SOT, __name__)
+
+
+def render():
+    st.title("Football Shooting Stats")
+    league_view()
+
+
+# Picking another league reruns only this section, not the whole app
+@ui.fragment
+def league_view():
+    # Dropdown menu for selecting league
+    selected_league = st.selectbox("Select a League", list(urls.keys()))
+    metrics.annotate(league=selected_league)
+
+    st.subheader(f"Loading data from: **{selected_league}**")
+
+    #Loading Data from the url
+    pd.set_option('display.max_columns', None)
+    # Shared, read-only table: every page and session gets the same parsed frame,
+    # already renamed and downcast by its schema
+    try:
+        dataset = datasets.get_source(sources.shooting(selected_league))
+    except Exception as e:
+        st.error(f"Error loading data for {selected_league}: {e}")
+        return
+    df = dataset.frame
+    ui.show_freshness(dataset)
+
+    #raw dataframe
+    #st.dataframe(df)
+
+    # Display Dataframe in an interactive table....Clean dataframe
+    ui.show_table(df)
+    st.markdown("---")
 
-# Calling functions to generate each plot
+    # Calling functions to generate each plot
 
-if df is not None:
+    if df is not None:
  
-    plot_team_shots(df)
-    st.markdown("---")
-    plot_team_acc(df)
-    st.markdown("---")
-    plot_shots_per_90_vs_sot_per_90(df)
-    st.markdown("---")
-    plot_team_sot(df)
-    st.markdown("---")
-   
-
+        plot_team_shots(df)
+        st.markdown("---")
+        plot_team_acc(df)
+        st.markdown("---")
+        plot_shots_per_90_vs_sot_per_90(df)
+        st.markdown("---")
+        plot_team_sot(df)
+        st.markdown("---")
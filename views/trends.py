@@ -0,0 +1,65 @@
+import streamlit as st
+
+from core import figures, history, interactive, metrics, sources
+from views import ui
+
+# Squad tables offered in the menu, with the leagues configured for each
+STAT_TYPES = {
+    "Squad passing": ("passing", sources.PASSING_URLS),
+    "Squad shooting": ("shooting", sources.SHOOTING_URLS),
+}
+
+# Squads drawn when none are picked: the leaders on the chosen column
+DEFAULT_SQUADS = 5
+
+
+def draw_trend(trend, column, title, ylabel):
+    fig, ax = figures.subplots(figsize=(12, 6))
+    for squad, rows in trend.groupby('Squad', sort=False):
+        ax.plot(rows['Week'], rows[column], marker='o', label=squad)
+    ax.set_xlabel('Matchweek')
+    ax.set_ylabel(ylabel)
+    ax.set_title(title)
+    ax.legend(fontsize=8)
+    fig.tight_layout()
+    return fig
+
+
+def spec_trend(trend, column, title, ylabel):
+    return interactive.line(trend, 'Week', column, 'Squad', title, xlabel='Matchweek', ylabel=ylabel)
+
+
+@metrics.timed("plot")
+def plot_trend(trends, column, kind, squads):
+    # A slice of the precomputed (squad x week) arrays, not a pass over the history
+    trend = trends.frame(column, kind, squads)
+    title = f"{column}: {history.KINDS[kind].lower()}"
+    ui.show_chart(draw_trend, spec_trend, trend, column=column, title=title, ylabel=history.KINDS[kind])
+
+
+def render():
+    st.title("Season Trends")
+    st.write("Every refresh of a league table is stored as the matchweek it was taken at.")
+    trends_view()
+
+
+# Picking another league, column or squad reruns only this section
+@ui.fragment
+def trends_view():
+    label = st.selectbox("Table", list(STAT_TYPES))
+    stat_type, urls = STAT_TYPES[label]
+    selected_league = st.selectbox("Select a League", list(urls))
+    metrics.annotate(league=selected_league, stat_type=stat_type)
+
+    trends = history.trends(selected_league, stat_type)
+    if trends is None:
+        st.info(f"No history stored yet for {selected_league}. Each refresh of the table adds its matchweek.")
+        return
+    st.caption(f"Season {trends.season}, matchweeks {', '.join(map(str, trends.weeks))}")
+
+    column = st.selectbox("Column", trends.columns)
+    kind = st.radio("Show", list(history.KINDS), format_func=history.KINDS.get, horizontal=True)
+    leaders = [trends.keys[i] for i in (-trends.latest(column)).argsort(kind="stable")[:DEFAULT_SQUADS]]
+    squads = st.multiselect("Squads", trends.keys, default=leaders)
+    if squads:
+        plot_trend(trends, column, kind, sorted(squads))
@@ -0,0 +1,139 @@
+"""Streamlit output helpers shared by the views, instrumented with core.metrics.
+
+Images and tables go through show_image() / show_table() so the time spent
+handing them to Streamlit and the bytes sent to the browser are recorded per
+rerun. Inside capture(), images are collected instead of sent, so the same
+plot_* functions can produce charts outside Streamlit (see tools.report).
+
+show_chart() sends a chart either as a PNG from its draw_* function or, with
+the plotly backend (see settings.CHART_BACKEND), as a Plotly spec from its
+spec_* function, drawn in the browser. bar_chart() makes the plot_* function
+of a bar chart declared as a core.charts.BarChart.
+
+Page sections are wrapped with fragment(), so a widget inside a section
+reruns only that section (and the sections nested in it), with the inputs it
+was last called with, instead of the whole app.
+"""
+import functools
+import json
+import threading
+from contextlib import contextmanager
+
+import streamlit as st
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+from core import charts, metrics, render_cache, settings, telemetry
+
+BACKENDS = ("matplotlib", "plotly")
+
+
+_local = threading.local()
+
+
+def fragment(func):
+    """st.fragment that keeps the performance trace and also runs outside Streamlit.
+
+    During a full rerun the section is timed as a "fragment" span of the
+    page's trace. When a widget reruns only this section, it gets a trace of
+    its own, recorded as "<view>.<function> (fragment)" by telemetry.record_rerun().
+    Outside a Streamlit run (reports, benchmarks) the function is simply called.
+    """
+    name = f"{func.__module__.removeprefix('views.')}.{func.__name__}"
+
+    @functools.wraps(func)
+    def traced(*args, **kwargs):
+        if metrics.current_trace() is not None:
+            with metrics.span("fragment", name):
+                return func(*args, **kwargs)
+        with metrics.trace() as trace:
+            with metrics.span("rerun", name):
+                result = func(*args, **kwargs)
+        telemetry.record_rerun(f"{name} (fragment)", trace)
+        return result
+
+    section = st.fragment(traced)
+
+    @functools.wraps(func)
+    def run(*args, **kwargs):
+        if get_script_run_ctx(suppress_warning=True) is None:
+            return func(*args, **kwargs)
+        return section(*args, **kwargs)
+    return run
+
+
+@contextmanager
+def capture():
+    """Collect the images shown on this thread instead of sending them; yields the list."""
+    _local.images = images = []
+    try:
+        yield images
+    finally:
+        _local.images = None
+
+
+def show_image(image):
+    captured = getattr(_local, "images", None)
+    if captured is not None:
+        captured.append(image)
+        return
+    with metrics.span("send", "image"):
+        st.image(image, width="stretch")
+    metrics.add_bytes("image", len(image))
+
+
+def show_plotly(spec):
+    with metrics.span("send", "plotly"):
+        st.plotly_chart(spec, width="stretch")
+    metrics.add_bytes("plotly", len(json.dumps(spec, separators=(",", ":"))))
+
+
+def chart_backend(name):
+    """Backend for the chart drawn by draw_<name>: the session's ?charts=, then the settings."""
+    override = st.query_params.get("charts")
+    if override in BACKENDS:
+        return override
+    return settings.CHART_BACKENDS.get(name, settings.CHART_BACKEND)
+
+
+def show_chart(draw, spec, frame, **params):
+    """Show draw(frame, **params) as a cached PNG, or spec(frame, **params) with the plotly backend.
+
+    spec is None for charts that only have a matplotlib version; captured
+    charts (reports) are always PNGs.
+    """
+    _show_chart(draw.__name__.removeprefix("draw_"), draw, spec, frame, params)
+
+
+def _show_chart(name, draw, spec, frame, params):
+    if spec is not None and getattr(_local, "images", None) is None and chart_backend(name) == "plotly":
+        with metrics.span("spec", name):
+            figure = spec(frame, **params)
+        show_plotly(figure)
+    else:
+        show_image(render_cache.render(draw, frame, **params))
+
+
+def bar_chart(chart, module):
+    """The plot_<name> function of a core.charts.BarChart declared in a view module.
+
+    It shows the chart's header and the chart, timed like the hand-written
+    plot_* functions.
+    """
+    def plot(df):
+        st.header(chart.header)
+        _show_chart(chart.name, charts.draw, charts.spec, charts.prepare(df, chart), {"chart": chart})
+
+    plot.__name__ = plot.__qualname__ = f"plot_{chart.name}"
+    plot.__module__ = module
+    return metrics.timed("plot")(plot)
+
+
+def show_table(df):
+    with metrics.span("send", "dataframe"):
+        st.dataframe(df)
+    # In-memory size as a proxy for the Arrow payload Streamlit sends
+    metrics.add_bytes("dataframe", int(df.memory_usage(deep=True).sum()))
+
+
+def show_freshness(dataset):
+    st.caption(f"Data as of {dataset.as_of}" + (" (refreshing in the background)" if dataset.stale else ""))